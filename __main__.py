@@ -6,9 +6,19 @@ in various environments including simulation and physical robot scenarios.
 """
 
 import argparse
-import threading
+import time
+from concurrent.futures import Executor, Future, TimeoutError
+from functools import partial
 from networking.networker import TeamInfo, GameState, Networker
+from networking.backends import uses
+from networking.socket_utils import SIM_CLIENT_ADDR, SIM_TRAINER_ADDR
 from ai_interface.naive import SoccerAI
+from ai_interface.executors import EXECUTOR_KINDS, StrategyProcessPool, create_executor
+from networking.metrics import CycleProfiler
+from networking.state_log import GameStateLogger
+from networking.scheduler import CycleScheduler
+from networking.tracking import StateTracker
+from networking.data_utils import SIM_TIMESTEP
 
 UCSD_ROBOCUP_TEAM_NAME = "TritonBots"
 
@@ -20,6 +30,45 @@ parser.add_argument("--env", choices=[
     "field-practice",  # one or both teams - camera + physical robots
     "field-tournament" # our team only - camera + physical robots
 ], default="sim-only")
+parser.add_argument("--asyncio", action="store_true",
+                    help="run networking on an asyncio event loop")
+parser.add_argument("--record", type=str, default=None, metavar="PATH",
+                    help="record every received game state datagram to a match log")
+parser.add_argument("--replay", type=str, default=None, metavar="PATH",
+                    help="replay a match log instead of connecting to a game")
+parser.add_argument("--replay-speed", type=float, default=1.0,
+                    help="replay speed relative to the recording, 0 for as fast as possible")
+parser.add_argument("--executor", choices=EXECUTOR_KINDS, default=None,
+                    help="how team decisions run each cycle "
+                         "(default: the strategy's choice)")
+parser.add_argument("--track", action="store_true",
+                    help="estimate velocities and predict positions at command execution time")
+parser.add_argument("--lookahead", type=float, default=SIM_TIMESTEP, metavar="SECONDS",
+                    help="time from deciding until commands take effect, for --track")
+parser.add_argument("--robot-protocol", choices=["text", "binary"], default="text",
+                    help="encoding of commands multicast to physical robots")
+parser.add_argument("--schedule", action="store_true",
+                    help="send commands only while they can land in their server cycle, "
+                         "falling back to the previous decision when the strategy is late")
+parser.add_argument("--synch", action="store_true",
+                    help="step a simulator in synchronous mode, one cycle as soon as "
+                         "both teams have sent their commands")
+parser.add_argument("--sim-host", type=str, default=SIM_CLIENT_ADDR[0],
+                    help="host of the simulator")
+parser.add_argument("--sim-port", type=int, default=SIM_CLIENT_ADDR[1],
+                    help="simulator port players connect to")
+parser.add_argument("--sim-trainer-port", type=int, default=SIM_TRAINER_ADDR[1],
+                    help="simulator trainer port game states come from")
+parser.add_argument("--state-log", type=str, default=None, metavar="PATH",
+                    help="file game states are logged to (default: stdout)")
+parser.add_argument("--log-every", type=int, default=1, metavar="N",
+                    help="log every Nth server cycle or camera frame, 0 for none")
+parser.add_argument("--log-on-change", action="store_true",
+                    help="log only game states that differ from the last logged one")
+parser.add_argument("--profile", type=str, default=None, metavar="PATH",
+                    help="time every pipeline stage and write latency reports to PATH")
+parser.add_argument("--profile-interval", type=float, default=10.0, metavar="SECONDS",
+                    help="seconds between latency report dumps")
 
 
 def main():
@@ -30,38 +79,156 @@ def main():
     and runs the main game loop that processes game states and executes AI decisions.
     """
     args = parser.parse_args()
+    if args.asyncio and args.replay:
+        parser.error("--replay cannot be combined with --asyncio")
+    if args.asyncio and args.schedule:
+        parser.error("--schedule cannot be combined with --asyncio")
+    if args.synch and (args.env != "sim-only" or args.replay or args.asyncio or args.schedule):
+        parser.error("--synch needs --env sim-only without --replay, --asyncio or --schedule")
     team_infos = [TeamInfo(args.teamname, 6), TeamInfo("TeamB", 6)]
     soccer_ai = SoccerAI()
 
-    networker = Networker(team_infos, args.env)
+    networker = Networker(team_infos, args.env, args.record, args.replay,
+                          args.replay_speed, args.robot_protocol,
+                          (args.sim_host, args.sim_port),
+                          (args.sim_host, args.sim_trainer_port))
+    if args.profile is not None:
+        networker.set_profiler(CycleProfiler(args.profile, args.profile_interval))
+    if args.synch:
+        networker.set_synch_mode()
+    state_log = None
+    if args.log_every > 0:
+        state_log = GameStateLogger(args.state_log, args.log_every, args.log_on_change)
+    if args.track:
+        # SSL vision reports millimeters, the simulator meters
+        scale = 1000.0 if networker.game_watcher.source == "camera" else 1.0
+        networker.set_tracker(StateTracker([team_info.name for team_info in team_infos],
+                                           args.lookahead, scale))
 
+    if args.env == "field-tournament":
+        # In tournament mode, we only control our own team
+        team_names = [args.teamname]
+    else:
+        team_names = [team_info.name for team_info in team_infos]
+
+    scheduler = None
+    if args.schedule:
+        scheduler = CycleScheduler()
+        # Lets in-process strategies query their time budget
+        soccer_ai.scheduler = scheduler
+    deciding = {}
+    # Cycles decided and when the first was, shared with the asyncio loop
+    throughput = {"decided": 0, "started": None}
+
+    processes = None
     try:
-        while True:
-            game_state = networker.get_game_state()
-            if game_state is None:
-                continue
-            print("Current Game State:", game_state)
-
-            if args.env == "field-tournament":
-                # In tournament mode, we only control our own team
-                process_team(soccer_ai, networker, game_state, args.teamname)
+        if args.asyncio:
+            import asyncio    # only loaded in asyncio mode
+            asyncio.run(run_async(soccer_ai, networker, team_names, state_log, throughput))
+        else:
+            kind = args.executor or getattr(soccer_ai, "executor", "thread")
+            executor = None
+            if kind == "process":
+                # Started before the receiver thread, since workers are forked
+                processes = StrategyProcessPool(
+                    type(soccer_ai), [team_info.name for team_info in team_infos], team_names)
             else:
-                # Process both teams with threading
-                threads = []
-                for team_info in team_infos:
-                    t_args = (soccer_ai, networker, game_state, team_info.name)
-                    thread = threading.Thread(target=process_team, args=t_args)
-                    threads.append(thread)
-                    thread.start()
-                
-                for thread in threads:
-                    thread.join()
-
-
-    except KeyboardInterrupt:
+                executor = create_executor(kind, len(team_names))
+            if not args.synch and (args.replay is None or args.replay_speed > 0):
+                # Synchronous mode and replaying as fast as possible decide
+                # on every frame instead
+                networker.start_receiver()
+            while True:
+                game_state = networker.get_game_state()
+                if game_state is None:
+                    if args.synch and throughput["started"] is not None:
+                        # A lost datagram would stall the server and this loop
+                        print("No game state before the receive timeout, resending (done).")
+                        networker.resend_done()
+                    continue
+                _count_cycle(throughput)
+                if state_log is not None:
+                    state_log.log(game_state)
+
+                if scheduler is not None:
+                    process_teams_on_schedule(scheduler, soccer_ai, networker, game_state,
+                                              team_names, executor, processes, deciding)
+                    continue
+                if processes is not None:
+                    process_teams_in_workers(processes, networker, game_state)
+                    continue
+
+                # Process the teams on the executor reused across cycles
+                futures = [
+                    executor.submit(process_team, soccer_ai, networker, game_state, team_name)
+                    for team_name in team_names
+                ]
+                for future in futures:
+                    future.result()
+
+    except (KeyboardInterrupt, EOFError):
         print("\nShutting down...please patiently wait for a few seconds.")
-        if args.env in ["sim-only", "sim-mixed"]:
+        if state_log is not None:
+            state_log.close()
+            print(state_log.report(), end="")
+        if processes is not None:
+            processes.shutdown()
+        print(f"Skipped {networker.frames_skipped} stale game state frames.")
+        if networker.game_watcher.buffer.truncated:
+            print(f"Dropped {networker.game_watcher.buffer.truncated} game state datagrams "
+                  f"larger than {networker.game_watcher.buffer.size} bytes.")
+        if networker.done_resent:
+            print(f"Resent (done) after {networker.done_resent} receive timeouts.")
+        if throughput["started"] is not None:
+            decided = throughput["decided"]
+            elapsed = time.perf_counter() - throughput["started"]
+            print(f"Decided {decided} cycles in {elapsed:.1f} s "
+                  f"({decided / elapsed:.0f} cycles/s).")
+        if uses(args.env, "simulator"):
             networker.disconnect_from_sim()
+        networker.close()
+        if networker.profiler is not None:
+            networker.profiler.dump()
+            print(networker.profiler.report(), end="")
+        if scheduler is not None:
+            print(scheduler.report(), end="")
+
+
+async def run_async(soccer_ai: SoccerAI, networker: Networker, team_names: list[str],
+                    state_log: GameStateLogger | None = None,
+                    throughput: dict | None = None):
+    """
+    Main game loop in asyncio mode.
+
+    Game states are awaited from the event loop and commands are sent without
+    blocking, so the teams are processed one after another on the loop.
+    
+    Args:
+        soccer_ai: The AI instance that makes decisions
+        networker: The networking component for command execution
+        team_names: Names of the teams to process
+        state_log: Logger sampling the game states, if any
+        throughput: Counters of the cycles decided, updated as in the
+            synchronous loop, if any
+    """
+    await networker.start_async()
+    try:
+        async for game_state in networker.game_states():
+            if throughput is not None:
+                _count_cycle(throughput)
+            if state_log is not None:
+                state_log.log(game_state)
+            for team_name in team_names:
+                process_team(soccer_ai, networker, game_state, team_name)
+    finally:
+        networker.stop_async()
+
+
+def _count_cycle(throughput: dict):
+    """Count a decided cycle, starting the clock on the first one."""
+    if throughput["started"] is None:
+        throughput["started"] = time.perf_counter()
+    throughput["decided"] += 1
 
 
 def process_team(soccer_ai: SoccerAI, networker: Networker,
@@ -75,9 +242,126 @@ def process_team(soccer_ai: SoccerAI, networker: Networker,
         game_state: Current state of the game
         team_name: Name of the team to process
     """
+    translated = decide_team(soccer_ai, networker, game_state, team_name)
+    send_team_output(networker, game_state, team_name, translated)
+
+
+def decide_team(soccer_ai: SoccerAI, networker: Networker,
+                game_state: GameState, team_name: str):
+    """
+    Decide for a specific team without sending anything.
+    
+    Args:
+        soccer_ai: The AI instance that makes decisions
+        networker: The networking component, for its profiler
+        game_state: Current state of the game
+        team_name: Name of the team to decide for
+
+    Returns:
+        Translated AI output
+    """
+    profiler = networker.profiler
+    start = profiler.clock() if profiler is not None else 0
     ai_output = soccer_ai.decide_action(game_state, team_name)
     translated = soccer_ai.translate_ai_output(ai_output)
-    networker.execute_ai_output(translated, team_name)
+    if profiler is not None:
+        profiler.record("decide", start, team_name)
+    return translated
+
+
+def send_team_output(networker: Networker, game_state: GameState, team_name: str,
+                     translated):
+    """
+    Send a team's translated AI output for a game state.
+    
+    Args:
+        networker: The networking component for command execution
+        game_state: Game state the output was decided on
+        team_name: Name of the team sending
+        translated: Translated AI output
+    """
+    networker.execute_ai_output(translated, team_name, game_state.count)
+    if networker.profiler is not None:
+        networker.profiler.end_cycle(game_state.count, team_name)
+
+
+def process_teams_in_workers(processes: StrategyProcessPool, networker: Networker,
+                             game_state: GameState):
+    """
+    Process AI decisions for all teams in worker processes, sending each
+    team's commands as soon as its worker finishes.
+    
+    Args:
+        processes: Worker processes deciding for the controlled teams
+        networker: The networking component for command execution
+        game_state: Current state of the game
+    """
+    profiler = networker.profiler
+    start = profiler.clock() if profiler is not None else 0
+    for team_name, translated in processes.decide(game_state):
+        if profiler is not None:
+            profiler.record("decide", start, team_name)
+        send_team_output(networker, game_state, team_name, translated)
+
+
+def process_teams_on_schedule(scheduler: CycleScheduler, soccer_ai: SoccerAI,
+                              networker: Networker, game_state: GameState,
+                              team_names: list[str], executor: Executor,
+                              processes: StrategyProcessPool, deciding: dict):
+    """
+    Process AI decisions for all teams within the time budget of the game
+    state's server cycle.
+
+    Decisions still running when the budget runs out are left to finish in
+    the background, and the scheduler's fallback is sent instead. A team is
+    not given new game states until its running decision finishes.
+    
+    Args:
+        scheduler: Scheduler tracking the server cycle deadlines
+        soccer_ai: The AI instance that makes decisions
+        networker: The networking component for command execution
+        game_state: Current state of the game
+        team_names: Names of the teams to process
+        executor: Executor running the decisions, if processes is None
+        processes: Worker processes deciding for the teams, or None
+        deciding: Team name -> (GameState.count, future) of its latest
+            decision, kept across cycles
+    """
+    deadline = scheduler.observe(game_state)
+    count = game_state.count
+    if processes is not None:
+        for team_name, translated in processes.decide(game_state,
+                                                      scheduler.remaining(deadline)):
+            output = scheduler.resolve(team_name, count, translated, deadline)
+            if output is not None:
+                send_team_output(networker, game_state, team_name, output)
+        return
+
+    for team_name in team_names:
+        if team_name not in deciding or deciding[team_name][1].done():
+            future = executor.submit(decide_team, soccer_ai, networker, game_state, team_name)
+            deciding[team_name] = (count, future)
+
+    for team_name in team_names:
+        decided_count, future = deciding[team_name]
+        translated = None
+        if decided_count == count:
+            try:
+                translated = future.result(timeout=scheduler.remaining(deadline))
+            except TimeoutError:
+                # Remember the late decision as the fallback once it finishes
+                future.add_done_callback(
+                    partial(_remember_decision, scheduler, team_name, count))
+        output = scheduler.resolve(team_name, count, translated, deadline)
+        if output is not None:
+            send_team_output(networker, game_state, team_name, output)
+
+
+def _remember_decision(scheduler: CycleScheduler, team_name: str, count: int,
+                       future: Future):
+    """Store a decision that finished after its deadline as a fallback."""
+    if future.exception() is None:
+        scheduler.completed(team_name, count, future.result())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,193 @@
+"""
+Executors that run per-team AI decisions each cycle.
+
+An executor is created once at startup and reused for every cycle, so no
+threads are spawned in the control loop. Strategies choose the executor kind
+through their ``executor`` class attribute.
+
+Thread-based executors share the GIL, so compute-bound strategies should use
+StrategyProcessPool instead, which decides for each team in its own process.
+multiprocessing is only imported once such a pool is created, so the serial
+and thread executors start without it.
+"""
+
+import signal
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from networking.data_utils import GameState
+
+EXECUTOR_KINDS = ["serial", "thread", "process"]
+
+
+class SerialExecutor(Executor):
+    """Runs submitted calls immediately in the calling thread."""
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """
+        Run a call and return a future that is already resolved.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments for the call
+            **kwargs: Keyword arguments for the call
+
+        Returns:
+            Completed future holding the call's result or exception
+        """
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def create_executor(kind: str, n_workers: int) -> Executor:
+    """
+    Create a long-lived executor for per-team decisions.
+
+    Args:
+        kind: "serial" to decide in the main thread, or "thread" for a pool
+            of persistent worker threads. "process" is not an Executor, use
+            StrategyProcessPool instead.
+        n_workers: Number of workers, normally the number of controlled teams
+
+    Returns:
+        Executor to be reused across cycles
+    """
+    if kind == "serial":
+        return SerialExecutor()
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="team")
+    raise ValueError(f"Unknown executor kind: {kind}")
+
+
+def _strategy_worker(strategy_cls: type, shm_name: str, all_team_names: tuple[str, ...],
+                     team_name: str, conn):
+    """
+    Worker process loop deciding for one team.
+
+    Waits for a signal on conn for every published game state, decides on
+    the state read from the worker's own shared memory slot and sends back
+    (True, translated output) or (False, exception). None stops the worker.
+    """
+    from networking.shared_state import SharedGameState
+    # Ctrl+C reaches the whole process group; the main process stops workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shared = SharedGameState(all_team_names, shm_name)
+    strategy = strategy_cls()
+    try:
+        while conn.recv() is not None:
+            game_state = shared.read()
+            try:
+                ai_output = strategy.decide_action(game_state, team_name)
+                conn.send((True, strategy.translate_ai_output(ai_output)))
+            except Exception as e:
+                conn.send((False, e))
+    except EOFError:
+        pass    # the main process went away
+    finally:
+        shared.close()
+
+
+class StrategyProcessPool:
+    """
+    Decides for each team in a persistent worker process.
+
+    Every cycle the game state is published to each idle worker's own shared
+    memory slot and the worker is signalled over its own pipe; only the
+    translated actions are sent back. Decisions of different teams
+    therefore run in parallel on separate cores, without pickling game
+    states. A busy worker's slot is left alone, so a slow worker never reads
+    a slot while it is overwritten.
+    """
+    def __init__(self, strategy_cls: type, all_team_names: tuple[str, ...],
+                 team_names: list[str]):
+        """
+        Start one worker process per controlled team.
+
+        Args:
+            strategy_cls: Strategy class, instantiated without arguments in
+                every worker
+            all_team_names: Names of all teams in the game, in GameState order
+            team_names: Names of the teams to decide for
+        """
+        import multiprocessing
+        from networking.shared_state import SharedGameState
+        self.workers = {}    # connection -> (team name, process)
+        self.slots = {}    # connection -> SharedGameState read by that worker
+        self.busy = set()    # connections of workers deciding on an older state
+        for team_name in team_names:
+            conn, worker_conn = multiprocessing.Pipe()
+            shared = SharedGameState(all_team_names)
+            process = multiprocessing.Process(
+                target=_strategy_worker, name=f"team-{team_name}", daemon=True,
+                args=(strategy_cls, shared.name, shared.team_names, team_name, worker_conn))
+            process.start()
+            worker_conn.close()
+            self.workers[conn] = (team_name, process)
+            self.slots[conn] = shared
+
+    def decide(self, game_state: GameState, timeout: float | None = None):
+        """
+        Decide on a game state for every team in parallel.
+
+        Args:
+            game_state: Current game state
+            timeout: Seconds to wait for the decisions, or None to wait for
+                all of them. A worker still deciding when the timeout runs
+                out is busy: it is skipped for new game states until it is
+                done, and its late decision is discarded.
+
+        Yields:
+            (team name, translated AI output) as each worker finishes, with
+            None as output for busy workers
+
+        Raises:
+            Exception: Re-raises an exception raised by a strategy
+        """
+        for conn in list(self.busy):
+            if conn.poll():
+                conn.recv()
+                self.busy.discard(conn)
+        waiting = [conn for conn in self.workers if conn not in self.busy]
+        for conn in waiting:
+            self.slots[conn].publish(game_state)
+            conn.send(game_state.count)
+        for conn in list(self.busy):
+            yield self.workers[conn][0], None
+
+        from multiprocessing.connection import wait
+        end = None if timeout is None else time.monotonic() + timeout
+        try:
+            while waiting:
+                left = None if end is None else max(end - time.monotonic(), 0.0)
+                ready = wait(waiting, left)
+                if not ready:
+                    break
+                for conn in ready:
+                    waiting.remove(conn)
+                    ok, result = conn.recv()
+                    if not ok:
+                        raise result
+                    yield self.workers[conn][0], result
+        finally:
+            # Workers that have not replied are busy until they do
+            self.busy.update(waiting)
+        for conn in waiting:
+            yield self.workers[conn][0], None
+
+    def shutdown(self):
+        """Stop the worker processes and free their shared memory."""
+        for conn, (_, process) in self.workers.items():
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+            self.slots[conn].close()
+        self.workers.clear()
+        self.slots.clear()
@@ -5,7 +5,9 @@ This module provides a simple AI strategy that demonstrates basic robot behavior
 like kicking and movement in a RoboCup soccer environment.
 """
 
-from networking.data_utils import GameState
+import numpy as np
+
+from networking.data_utils import GameState, CommandBatch, DASH, KICK
 
 class SoccerAI:
     """
@@ -14,7 +16,12 @@ class SoccerAI:
     This AI uses basic heuristics: the first robot alternates between kicking
     and dashing, while other robots perform simple movement.
     """
-    
+    # Decisions are too cheap to gain from worker threads
+    executor = "serial"
+    # CycleScheduler set by the main loop with --schedule; its budget()
+    # gives the seconds left to decide on a game state
+    scheduler = None
+
     def __init__(self):
         """Initialize the AI system."""
         pass
@@ -28,19 +35,20 @@ class SoccerAI:
             teamname: Name of the team to generate actions for
             
         Returns:
-            Raw output from AI decision making
+            CommandBatch with one command per robot, in team order
         """
-        actions = []
         kick = game_state.count % 2 == 0
-        for robot in game_state.robot_poses[teamname]:
-            unum = int(next(iter(robot.keys())))
-            if unum == 1:
-                actions.append("kick 100 0" if kick else "dash 100 0")
-            else:
-                actions.append("dash 20 0")
-        return actions
+        unums, _ = game_state.team_robots(teamname)
+        codes = np.full(len(unums), DASH)
+        args = np.zeros((len(unums), 2))
+        args[:, 0] = 20
+        first = unums == 1
+        args[first, 0] = 100
+        if kick:
+            codes[first] = KICK
+        return CommandBatch(codes, args)
 
-    def translate_ai_output(self, ai_output) -> list[str]:
+    def translate_ai_output(self, ai_output) -> CommandBatch:
         """
         Translate AI output to command format.
         
@@ -48,6 +56,7 @@ class SoccerAI:
             ai_output: Raw output from AI decision making
             
         Returns:
-            Translated commands ready for execution
+            Translated commands ready for execution, as a CommandBatch or a
+            list of command strings
         """
         return ai_output
@@ -1,13 +1,13 @@
-import sys
-import os
-
-from numpy._typing._array_like import NDArray
-sys.path.append(os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
-
-from typing import Iterable, List, Tuple
+from typing import List, Tuple
+import math
 import numpy as np
-from constants.player_constants import KICKABLE_MARGIN
-from constants.field_constants import GOAL_L, GOAL_R
+from ai_interface.constants.player_constants import KICKABLE_MARGIN
+# Command codes returned by the batch functions, one per robot
+from networking.data_utils import CommandBatch, DONE, FAILED, DASH, TURN, KICK
+
+KICK_POWER = 80
+# Largest angle in degrees between body direction and ball direction to kick
+KICK_ANGLE_TOLERANCE = 5
 
 def _normalize_angle(angle: float) -> float:
     """Normalize angle to be within [-180, 180] degrees."""
@@ -15,29 +15,151 @@ def _normalize_angle(angle: float) -> float:
 
 def goto(self_pose: np.ndarray | Tuple | List, x: float, y: float, margin: float = KICKABLE_MARGIN,
          theta: float | None = None, speed: float = 100.0) -> str:
-    destination = np.array([x, y])
-    distance = np.linalg.norm(destination - np.array(self_pose[:2]))
-    angle = np.degrees(np.arctan2(destination[1] - self_pose[1], destination[0] - self_pose[0])) - self_pose[4]
+    dx, dy = x - float(self_pose[0]), y - float(self_pose[1])
+    distance = math.hypot(dx, dy)
     if distance < margin:
         if theta is not None:
-            angle_diff = _normalize_angle(theta - self_pose[2])
+            angle_diff = _normalize_angle(theta - float(self_pose[2]))
             return f"turn {angle_diff}" if abs(angle_diff) > 1 else "done"
         else:
             return "done"
+    angle = _normalize_angle(math.degrees(math.atan2(dy, dx)) - float(self_pose[2]))
     return f"dash {min(speed, distance * 10)} {angle}"
 
 def shoot(self_pose: np.ndarray | Tuple | List, ball_pose: np.ndarray | Tuple | List, goal: np.ndarray | Tuple | List) -> str: 
-    if not np.isclose(self_pose[:2], ball_pose[:2], atol=KICKABLE_MARGIN):
+    x, y, body = float(self_pose[0]), float(self_pose[1]), float(self_pose[2])
+    dx, dy = float(ball_pose[0]) - x, float(ball_pose[1]) - y
+    if abs(dx) > KICKABLE_MARGIN or abs(dy) > KICKABLE_MARGIN:
         return "failed"
-    ball_dir = _normalize_angle(np.arctan2(ball_pose[1] - self_pose[1], ball_pose[0] - self_pose[0]))
-    if not np.isclose(ball_dir, self_pose[2], atol=5):
+    ball_dir = math.degrees(math.atan2(dy, dx))
+    if abs(_normalize_angle(ball_dir - body)) > KICK_ANGLE_TOLERANCE:
         return "failed"
-    angle_to_goal = np.degrees(np.arctan2(goal[1] - self_pose[1], goal[0] - self_pose[0]))
-    angle_diff = _normalize_angle(angle_to_goal - self_pose[2])
-    return f"kick 80 {angle_diff}"
+    angle_to_goal = math.degrees(math.atan2(float(goal[1]) - y, float(goal[0]) - x))
+    angle_diff = _normalize_angle(angle_to_goal - body)
+    return f"kick {KICK_POWER} {angle_diff}"
 
 def calculate_shooting_pose(ball_pose: np.ndarray | Tuple | List, goal: np.ndarray | Tuple | List) -> np.ndarray:
-    vec = np.array(ball_pose[:2]) - np.array(goal)
-    destination = np.array(goal) + vec + (vec / np.linalg.norm(vec)) * KICKABLE_MARGIN / 2
-    destination_theta = _normalize_angle(np.degrees(np.arctan2(vec[1], vec[0])))
-    return np.array([destination[0], destination[1], destination_theta])
\ No newline at end of file
+    # Stand behind the ball on the line from the goal, facing the goal
+    vx, vy = float(ball_pose[0]) - float(goal[0]), float(ball_pose[1]) - float(goal[1])
+    distance = math.hypot(vx, vy)
+    # A ball on the goal point has no line to stand on: NaN, as in the batch version
+    offset = KICKABLE_MARGIN / 2 / distance if distance else math.nan
+    destination_theta = math.degrees(math.atan2(-vy, -vx))
+    return np.array([float(ball_pose[0]) + vx * offset,
+                     float(ball_pose[1]) + vy * offset,
+                     destination_theta])
+
+def _normalize_angles(angles: np.ndarray) -> np.ndarray:
+    """Normalize an array of angles to be within [-180, 180] degrees, in place."""
+    angles += 180
+    np.mod(angles, 360, out=angles)
+    angles -= 180
+    return angles
+
+def goto_batch(poses: np.ndarray, targets: np.ndarray, margin: float = KICKABLE_MARGIN,
+               thetas: np.ndarray | None = None, speed: float = 100.0) -> CommandBatch:
+    """
+    Vectorized goto for N robots at once.
+
+    Args:
+        poses: (N, 3) array of robot (x, y, theta) poses
+        targets: (N, 2) or (2,) array of destinations
+        margin: Distance at which a robot has arrived
+        thetas: (N,) array of final headings, NaN or None for no heading
+        speed: Maximum dash power
+
+    Returns:
+        CommandBatch of (codes, args): (N,) command codes out of DONE, DASH and TURN,
+        and (N, 2) command arguments (power and direction for DASH, angle in
+        the first column for TURN)
+    """
+    poses = np.asarray(poses, dtype=float)
+    delta = np.asarray(targets, dtype=float) - poses[:, :2]
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+
+    args = np.empty((len(poses), 2))
+    np.minimum(distance * 10, speed, out=args[:, 0])
+    np.degrees(np.arctan2(delta[:, 1], delta[:, 0]), out=args[:, 1])
+    args[:, 1] -= poses[:, 2]
+    _normalize_angles(args[:, 1])
+    codes = np.full(len(poses), DASH)
+
+    arrived = distance < margin
+    codes[arrived] = DONE
+    if thetas is not None:
+        turn = _normalize_angles(np.asarray(thetas, dtype=float) - poses[:, 2])
+        turning = arrived & (np.abs(turn) > 1)    # NaN headings never turn
+        codes[turning] = TURN
+        args[turning, 0] = turn[turning]
+    return CommandBatch(codes, args)
+
+def shoot_batch(poses: np.ndarray, ball_pose: np.ndarray, goal: np.ndarray) -> CommandBatch:
+    """
+    Vectorized shoot for N robots at once.
+
+    Args:
+        poses: (N, 3) array of robot (x, y, theta) poses
+        ball_pose: (N, 2) or (2,) array of ball positions
+        goal: (N, 2) or (2,) array of goal positions
+
+    Returns:
+        CommandBatch of (codes, args): (N,) command codes out of KICK and FAILED, and
+        (N, 2) kick power and direction
+    """
+    poses = np.asarray(poses, dtype=float)
+    to_ball = np.asarray(ball_pose, dtype=float)[..., :2] - poses[:, :2]
+    to_goal = np.asarray(goal, dtype=float) - poses[:, :2]
+
+    in_reach = np.all(np.abs(to_ball) <= KICKABLE_MARGIN, axis=1)
+    ball_dir = _normalize_angles(np.degrees(np.arctan2(to_ball[:, 1], to_ball[:, 0])) - poses[:, 2])
+    facing = np.abs(ball_dir) <= KICK_ANGLE_TOLERANCE
+
+    args = np.empty((len(poses), 2))
+    args[:, 0] = KICK_POWER
+    np.degrees(np.arctan2(to_goal[:, 1], to_goal[:, 0]), out=args[:, 1])
+    args[:, 1] -= poses[:, 2]
+    _normalize_angles(args[:, 1])
+    codes = np.where(in_reach & facing, KICK, FAILED)
+    return CommandBatch(codes, args)
+
+def calculate_shooting_pose_batch(ball_pose: np.ndarray, goal: np.ndarray) -> np.ndarray:
+    """
+    Vectorized calculate_shooting_pose for N balls or goals at once.
+
+    Args:
+        ball_pose: (N, 2) or (2,) array of ball positions
+        goal: (N, 2) or (2,) array of goal positions
+
+    Returns:
+        (N, 3) array of (x, y, theta) shooting poses
+    """
+    ball = np.atleast_2d(np.asarray(ball_pose, dtype=float)[..., :2])
+    vec = ball - np.asarray(goal, dtype=float)
+    norm = np.hypot(vec[:, 0], vec[:, 1])
+    shooting_poses = np.empty((len(vec), 3))
+    shooting_poses[:, :2] = ball + vec * (KICKABLE_MARGIN / 2 / norm)[:, None]
+    np.degrees(np.arctan2(-vec[:, 1], -vec[:, 0]), out=shooting_poses[:, 2])
+    return shooting_poses
+
+def format_commands(codes: np.ndarray, args: np.ndarray) -> List[str]:
+    """
+    Format batch results as the command strings the scalar functions return.
+
+    Args:
+        codes: (N,) command codes
+        args: (N, 2) command arguments
+
+    Returns:
+        List of N command strings
+    """
+    commands = []
+    for code, (a, b) in zip(codes.tolist(), args.tolist()):
+        if code == DASH:
+            commands.append(f"dash {a} {b}")
+        elif code == TURN:
+            commands.append(f"turn {a}")
+        elif code == KICK:
+            commands.append(f"kick {a} {b}")
+        else:
+            commands.append("failed" if code == FAILED else "done")
+    return commands
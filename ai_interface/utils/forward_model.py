@@ -0,0 +1,211 @@
+"""
+Batched forward model of the simulator dynamics for lookahead search.
+
+ForwardModel predicts the outcome of candidate commands for one team by
+simulating the next cycles of a game state the way rcssserver does: dash
+acceleration with its side and back dash rates, turns slowed by inertia,
+kicks whose power drops with the ball's distance and angle, velocity limits
+and decay, with robots and the ball stopped at the field bounds. Stamina,
+noise, wind and collisions between objects are left out.
+
+All rollouts run at once on arrays with a leading rollout axis, so a
+strategy can score hundreds of candidate CommandBatches within a cycle:
+
+    model = ForwardModel(game_state, teamname)
+    final = model.rollout(codes, args, n_steps=10)    # codes (B, N), args (B, N, 2)
+    scores = -np.hypot(*(final.ball - GOAL_R).T)
+
+Rows of the state arrays are the robots present in the game state, ordered
+by team and robot id like SpatialIndex; ``teams`` and ``ids`` map rows back
+to robots, and the team's robots are the contiguous rows ``team_rows``.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from ai_interface.constants.field_constants import FIELD_X, FIELD_Y
+from ai_interface.constants.player_constants import KICKABLE_MARGIN
+from networking.data_utils import GameState, SIM_TIMESTEP, DASH, TURN, KICK
+
+# rcssserver default player parameters
+PLAYER_SIZE = 0.3
+PLAYER_DECAY = 0.4
+PLAYER_SPEED_MAX = 1.05
+PLAYER_ACCEL_MAX = 1.0
+DASH_POWER_RATE = 0.006
+# Dash power multipliers for dashing sideways (90 degrees) and backwards
+SIDE_DASH_RATE = 0.4
+BACK_DASH_RATE = 0.7
+INERTIA_MOMENT = 5.0
+# rcssserver default ball parameters
+BALL_SIZE = 0.085
+BALL_DECAY = 0.94
+BALL_SPEED_MAX = 3.0
+BALL_ACCEL_MAX = 2.7
+KICK_POWER_RATE = 0.027
+# Largest distance between player and ball centers at which a kick works
+KICKABLE_DISTANCE = PLAYER_SIZE + BALL_SIZE + KICKABLE_MARGIN
+
+# State of B rollouts of the M robots present: ball (B, 2), ball_velocity
+# (B, 2), positions (B, M, 2), velocities (B, M, 2) per cycle and bodies
+# (B, M) in degrees
+RolloutState = namedtuple(
+    "RolloutState", ["ball", "ball_velocity", "positions", "velocities", "bodies"])
+
+
+def _clamp_norm(vectors: np.ndarray, limit: float):
+    """Scale (..., 2) vectors longer than limit down to it, in place."""
+    norms = np.hypot(vectors[..., 0], vectors[..., 1])
+    scale = np.minimum(1.0, limit / np.maximum(norms, 1e-12))
+    vectors *= scale[..., None]
+
+
+class ForwardModel:
+    """Batched rollouts of one team's candidate commands from a game state."""
+    def __init__(self, game_state: GameState, teamname: str):
+        """
+        Take the initial state of the rollouts from a game state.
+
+        Velocities are those of the StateTracker if the game state went
+        through it, and zero otherwise.
+
+        Args:
+            game_state: Game state the rollouts start from
+            teamname: Team whose commands are rolled out
+        """
+        self.teams, self.ids = np.nonzero(game_state.valid)
+        rows = np.flatnonzero(self.teams == game_state.team_index(teamname))
+        self.team_rows = slice(rows[0], rows[-1] + 1) if len(rows) else slice(0, 0)
+
+        self.ball = game_state.ball.astype(float)
+        self.positions = game_state.poses[self.teams, self.ids, :2]
+        self.bodies = game_state.poses[self.teams, self.ids, 2]
+        self.ball_velocity = np.zeros(2)
+        self.velocities = np.zeros_like(self.positions)
+        # Tracker velocities are per second, the model steps per cycle
+        if game_state.ball_velocity is not None:
+            self.ball_velocity = np.nan_to_num(game_state.ball_velocity * SIM_TIMESTEP)
+        if game_state.velocities is not None:
+            self.velocities = np.nan_to_num(
+                game_state.velocities[self.teams, self.ids] * SIM_TIMESTEP)
+        self._low = np.array([FIELD_X[0], FIELD_Y[0]], dtype=float)
+        self._high = np.array([FIELD_X[1], FIELD_Y[1]], dtype=float)
+
+    def initial_state(self, n_rollouts: int) -> RolloutState:
+        """New state arrays holding n_rollouts copies of the game state."""
+        def repeat(array):
+            return np.repeat(array[None], n_rollouts, axis=0)
+        return RolloutState(repeat(self.ball), repeat(self.ball_velocity),
+                            repeat(self.positions), repeat(self.velocities),
+                            repeat(self.bodies))
+
+    def step(self, state: RolloutState, codes: np.ndarray | None = None,
+             args: np.ndarray | None = None):
+        """
+        Advance every rollout by one cycle, in place.
+
+        Args:
+            state: Rollouts to advance
+            codes: (B, N) command kinds of the team's robots in team order,
+                or None for a cycle without commands; MOVE only works
+                before kick-off and does nothing here
+            args: (B, N, 2) command arguments laid out as in CommandBatch,
+                with TURN angles and DASH directions in degrees, as produced
+                by basic_commands and PathPlanner
+        """
+        ball, ball_velocity, positions, velocities, bodies = state
+        if codes is not None:
+            self._kick(state, codes, args)
+            # Views of the team's rows, updated in place
+            team_velocities = velocities[:, self.team_rows]
+            team_bodies = bodies[:, self.team_rows]
+            power, direction = args[..., 0], args[..., 1]
+
+            # Turns are slowed by the speed the robot is moving at
+            turning = codes == TURN
+            speed = np.hypot(team_velocities[..., 0], team_velocities[..., 1])
+            moment = np.clip(power, -180.0, 180.0) / (1.0 + INERTIA_MOMENT * speed)
+            team_bodies += np.where(turning, moment, 0.0)
+
+            # Dashes off the body direction are weaker, down to SIDE_DASH_RATE
+            # at 90 degrees and back up to BACK_DASH_RATE at 180 degrees
+            dashing = codes == DASH
+            off_body = np.abs(direction)
+            rate = np.where(off_body > 90.0,
+                            BACK_DASH_RATE - (BACK_DASH_RATE - SIDE_DASH_RATE)
+                            * (1.0 - (off_body - 90.0) / 90.0),
+                            SIDE_DASH_RATE + (1.0 - SIDE_DASH_RATE) * (1.0 - off_body / 90.0))
+            accel = np.where(dashing, np.clip(power, -100.0, 100.0) * DASH_POWER_RATE * rate, 0.0)
+            angle = np.radians(team_bodies + direction)
+            dash = np.stack([accel * np.cos(angle), accel * np.sin(angle)], axis=-1)
+            _clamp_norm(dash, PLAYER_ACCEL_MAX)
+            team_velocities += dash
+            bodies[:, self.team_rows] = (team_bodies + 180.0) % 360.0 - 180.0
+
+        _clamp_norm(velocities, PLAYER_SPEED_MAX)
+        positions += velocities
+        velocities *= PLAYER_DECAY
+        _clamp_norm(ball_velocity, BALL_SPEED_MAX)
+        ball += ball_velocity
+        ball_velocity *= BALL_DECAY
+
+        # Robots stop at the field bounds and a ball leaving the field is dead
+        for points, moving in ((positions, velocities), (ball, ball_velocity)):
+            outside = (points < self._low) | (points > self._high)
+            np.clip(points, self._low, self._high, out=points)
+            moving[outside] = 0.0
+
+    def _kick(self, state: RolloutState, codes: np.ndarray, args: np.ndarray):
+        """
+        Accelerate the ball by every kick of a robot that can reach it.
+
+        The kick power drops by up to a quarter each with the angle of the
+        ball off the body direction and with its distance beyond touching.
+        """
+        ball, ball_velocity, positions, _, bodies = state
+        team_positions = positions[:, self.team_rows]
+        team_bodies = bodies[:, self.team_rows]
+        offset = ball[:, None, :] - team_positions
+        distance = np.hypot(offset[..., 0], offset[..., 1])
+        kicking = (codes == KICK) & (distance <= KICKABLE_DISTANCE)
+        if not kicking.any():
+            return
+
+        ball_angle = np.degrees(np.arctan2(offset[..., 1], offset[..., 0]))
+        off_body = np.abs((ball_angle - team_bodies + 180.0) % 360.0 - 180.0)
+        gap = np.maximum(distance - PLAYER_SIZE - BALL_SIZE, 0.0)
+        efficiency = 1.0 - 0.25 * off_body / 180.0 - 0.25 * gap / KICKABLE_MARGIN
+        power = np.clip(args[..., 0], 0.0, 100.0) * KICK_POWER_RATE * efficiency
+        power = np.where(kicking, power, 0.0)
+        angle = np.radians(team_bodies + args[..., 1])
+        accel = np.stack([(power * np.cos(angle)).sum(axis=1),
+                          (power * np.sin(angle)).sum(axis=1)], axis=-1)
+        _clamp_norm(accel, BALL_ACCEL_MAX)
+        ball_velocity += accel
+
+    def rollout(self, codes: np.ndarray, args: np.ndarray, n_steps: int = 1) -> RolloutState:
+        """
+        Simulate a batch of candidate commands for the team.
+
+        Args:
+            codes: (B, N) command kinds of one cycle, or (B, T, N) for T
+                cycles, of the team's robots in team order
+            args: (B, N, 2) or (B, T, N, 2) command arguments, as in step
+            n_steps: Cycles to simulate; cycles after the commands run out
+                have no commands
+
+        Returns:
+            State of every rollout after n_steps cycles
+        """
+        codes = np.asarray(codes)
+        args = np.asarray(args, dtype=float)
+        if codes.ndim == 2:
+            codes, args = codes[:, None], args[:, None]
+        state = self.initial_state(len(codes))
+        for t in range(n_steps):
+            if t < codes.shape[1]:
+                self.step(state, codes[:, t], args[:, t])
+            else:
+                self.step(state)
+        return state
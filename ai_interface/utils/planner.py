@@ -0,0 +1,319 @@
+"""
+Obstacle-aware path planning for a whole team.
+
+CostMap rasterizes every robot in a game state onto a grid over FIELD_X and
+FIELD_Y, adding a cost penalty to the cells within OBSTACLE_RADIUS of each
+robot. It is updated incrementally: only robots that moved to another cell
+have their footprint moved.
+
+PathPlanner runs A* over the cost map for each robot of a team and turns the
+paths into dash and turn commands with goto_batch. Obstacles are soft costs,
+so a path always exists, even to a target next to another robot. Plans are
+reused across cycles while the target stays put, the robot stays on its
+path and no cell along the rest of the path became more expensive, so most
+cycles plan nothing at all.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from ai_interface.constants.field_constants import FIELD_X, FIELD_Y
+from ai_interface.constants.player_constants import KICKABLE_MARGIN
+from ai_interface.utils.basic_commands import goto_batch
+from networking.data_utils import CommandBatch, GameState, DONE, DASH
+
+# Side length of a cost map cell in meters
+PLANNER_RESOLUTION = 1.0
+# Distance around robot centers that other robots should keep clear of
+OBSTACLE_RADIUS = 1.0
+# Extra cost of crossing a cell near one robot, relative to a free cell
+OBSTACLE_COST = 20
+# Target or deviation distance in meters after which a plan is discarded
+REPLAN_DISTANCE = 1.0
+# Distance along the path to the point a robot steers toward
+LOOKAHEAD = 2.0
+# Weight of the A* heuristic; above 1 trades up to that factor of path cost
+# for far fewer expanded cells around obstacles
+HEURISTIC_WEIGHT = 1.5
+
+_SQRT2 = math.sqrt(2)
+
+
+class CostMap:
+    """Grid of traversal costs from the robots of a game state."""
+    def __init__(self, resolution: float = PLANNER_RESOLUTION,
+                 radius: float = OBSTACLE_RADIUS):
+        """
+        Initialize an empty cost map.
+
+        Args:
+            resolution: Side length of a cell in meters
+            radius: Distance around each robot that costs extra
+        """
+        self.resolution = resolution
+        self.origin = np.array([FIELD_X[0], FIELD_Y[0]], dtype=float)
+        self.nx = math.ceil((FIELD_X[1] - FIELD_X[0]) / resolution)
+        self.ny = math.ceil((FIELD_Y[1] - FIELD_Y[0]) / resolution)
+        self.reach = reach = int(radius / resolution)    # footprint radius in cells
+        self.footprint = [(dx, dy) for dx in range(-reach, reach + 1)
+                          for dy in range(-reach, reach + 1)
+                          if math.hypot(dx, dy) * resolution <= radius]
+        self.counts = np.zeros((self.nx, self.ny), dtype=np.int16)
+        self.robot_cells = None    # (n_teams, MAX_ROBOTS) flat cell per robot, -1 if absent
+        self.moved = 0    # robots whose footprint moved in the last update
+
+    def cells(self, points: np.ndarray) -> np.ndarray:
+        """
+        Flat indices of the cells holding points, clipped to the field, and
+        -1 for points with a NaN or infinite coordinate.
+        """
+        points = np.asarray(points, dtype=float)[..., :2]
+        finite = np.isfinite(points).all(axis=-1)
+        # Non-finite points are moved to the origin before the integer cast
+        scaled = np.floor((np.where(finite[..., None], points, self.origin) - self.origin)
+                          / self.resolution)
+        index = scaled.astype(np.intp)
+        np.clip(index[..., 0], 0, self.nx - 1, out=index[..., 0])
+        np.clip(index[..., 1], 0, self.ny - 1, out=index[..., 1])
+        return np.where(finite, index[..., 0] * self.ny + index[..., 1], -1)
+
+    def center(self, cell: int) -> tuple[float, float]:
+        """Field position of the center of a cell."""
+        ix, iy = divmod(cell, self.ny)
+        return (self.origin[0] + (ix + 0.5) * self.resolution,
+                self.origin[1] + (iy + 0.5) * self.resolution)
+
+    def footprint_cells(self, cell: int) -> list[int]:
+        """Cells within the obstacle radius of a cell."""
+        ix, iy = divmod(cell, self.ny)
+        return [(ix + dx) * self.ny + iy + dy for dx, dy in self.footprint
+                if 0 <= ix + dx < self.nx and 0 <= iy + dy < self.ny]
+
+    def _stamp(self, cell: int, delta: int):
+        """Add delta to the counts of a robot footprint."""
+        counts = self.counts.reshape(-1)
+        for footprint_cell in self.footprint_cells(cell):
+            counts[footprint_cell] += delta
+
+    def update(self, game_state: GameState) -> int:
+        """
+        Move the footprints of the robots that changed cells.
+
+        Args:
+            game_state: Newly received game state
+
+        Returns:
+            Number of robots whose footprint moved, appeared or disappeared
+        """
+        cells = np.where(game_state.valid, self.cells(game_state.poses), -1)
+        if self.robot_cells is None or self.robot_cells.shape != cells.shape:
+            self.counts[:] = 0
+            self.robot_cells = np.full(cells.shape, -1)
+        changed = np.flatnonzero(cells != self.robot_cells)
+        old, new = self.robot_cells.reshape(-1), cells.reshape(-1)
+        for robot in changed.tolist():
+            if old[robot] >= 0:
+                self._stamp(int(old[robot]), -1)
+            if new[robot] >= 0:
+                self._stamp(int(new[robot]), 1)
+        self.robot_cells = cells
+        self.moved = len(changed)
+        return self.moved
+
+    def costs(self) -> np.ndarray:
+        """(nx * ny,) cost of entering each cell."""
+        return 1 + OBSTACLE_COST * self.counts.reshape(-1).astype(np.int32)
+
+
+class PathPlanner:
+    """Plans obstacle-avoiding paths for the robots of one team."""
+    def __init__(self, teamname: str, resolution: float = PLANNER_RESOLUTION,
+                 radius: float = OBSTACLE_RADIUS):
+        """
+        Initialize the planner.
+
+        Args:
+            teamname: Team to plan for
+            resolution: Side length of a cost map cell in meters
+            radius: Distance around each robot that costs extra
+        """
+        self.teamname = teamname
+        self.costmap = CostMap(resolution, radius)
+        self._neighbors = self._build_neighbors()
+        self.plans = {}    # robot id -> (target, cells, points, planned costs)
+        self.planned = 0    # paths searched
+        self.reused = 0    # cycles a robot followed an existing plan
+
+    def _build_neighbors(self) -> tuple[tuple[tuple[int, float], ...], ...]:
+        """
+        8-connected (cell, step length) neighbors of every cell.
+
+        Tuples of numbers are untracked by the garbage collector, so unlike
+        lists these tens of thousands of entries do not slow down every
+        full collection.
+        """
+        nx, ny = self.costmap.nx, self.costmap.ny
+        steps = [(dx, dy, _SQRT2 if dx and dy else 1.0)
+                 for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+        return tuple(tuple(((ix + dx) * ny + iy + dy, step) for dx, dy, step in steps
+                           if 0 <= ix + dx < nx and 0 <= iy + dy < ny)
+                     for ix in range(nx) for iy in range(ny))
+
+    def _search(self, costs: list, start: int, goal: int) -> list[int]:
+        """
+        Weighted A* from start to goal with an octile distance heuristic.
+
+        Args:
+            costs: Cost of entering each cell, at least 1
+            start: Start cell
+            goal: Goal cell
+
+        Returns:
+            Cells of the cheapest path, from start to goal
+        """
+        ny = self.costmap.ny
+        gx, gy = divmod(goal, ny)
+        neighbors = self._neighbors
+        came_from = {start: start}
+        best = {start: 0.0}
+        frontier = [(0.0, 0.0, start)]
+        while frontier:
+            _, cost, cell = heapq.heappop(frontier)
+            if cell == goal:
+                break
+            if cost > best[cell]:
+                continue
+            for neighbor, step in neighbors[cell]:
+                new_cost = cost + step * costs[neighbor]
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = cell
+                    ix, iy = divmod(neighbor, ny)
+                    dx, dy = abs(ix - gx), abs(iy - gy)
+                    heuristic = dx + dy + (_SQRT2 - 2) * min(dx, dy)
+                    heapq.heappush(frontier, (new_cost + HEURISTIC_WEIGHT * heuristic,
+                                              new_cost, neighbor))
+        path = [goal]
+        while path[-1] != start:
+            path.append(came_from[path[-1]])
+        path.reverse()
+        return path
+
+    def _plan(self, cost_list: list, start: np.ndarray, target: np.ndarray) -> tuple:
+        """
+        Search a path for one robot.
+
+        Robots whose footprint covers the start or the goal cell cannot be
+        kept clear of, the planning robot itself included, so their
+        footprints cost nothing in this search. Without that, A* would
+        expand every cell cheaper than the unavoidable penalty.
+        """
+        costmap = self.costmap
+        start_cell, goal_cell = int(costmap.cells(start)), int(costmap.cells(target))
+        near = costmap.footprint_cells(start_cell) + costmap.footprint_cells(goal_cell)
+        covering = costmap.robot_cells[np.isin(costmap.robot_cells, near)]
+        released = [cell for robot_cell in covering.tolist()
+                    for cell in costmap.footprint_cells(robot_cell)]
+        for cell in released:
+            cost_list[cell] -= OBSTACLE_COST
+        try:
+            cells = self._search(cost_list, start_cell, goal_cell)
+            planned = np.array([cost_list[cell] for cell in cells])
+        finally:
+            for cell in released:
+                cost_list[cell] += OBSTACLE_COST
+        points = np.array([costmap.center(cell) for cell in cells])
+        points[0], points[-1] = start, target
+        self.planned += 1
+        return target.copy(), np.array(cells), points, planned
+
+    def _still_valid(self, plan: tuple, costs: np.ndarray, robot_cell: int,
+                     position: np.ndarray, target: np.ndarray) -> tuple[bool, int]:
+        """Whether a plan can be followed, and the index of the closest path point."""
+        planned_target, cells, points, planned = plan
+        if np.hypot(*(target - planned_target)) > REPLAN_DISTANCE:
+            return False, 0
+        distances = np.hypot(*(points - position).T)
+        closest = int(np.argmin(distances))
+        if distances[closest] > REPLAN_DISTANCE:
+            return False, 0
+        ahead = cells[closest + 1:]
+        current = costs[ahead]
+        current[np.isin(ahead, self.costmap.footprint_cells(robot_cell))] -= OBSTACLE_COST
+        # Robots around the goal were free when planning and stay ignored
+        ix, iy = np.divmod(ahead, self.costmap.ny)
+        gx, gy = divmod(int(cells[-1]), self.costmap.ny)
+        near_goal = np.maximum(abs(ix - gx), abs(iy - gy)) <= 2 * self.costmap.reach
+        return not np.any((current > planned[closest + 1:]) & ~near_goal), closest
+
+    def _waypoint(self, points: np.ndarray, closest: int) -> np.ndarray:
+        """Point LOOKAHEAD meters along the path past its closest point."""
+        steps = np.hypot(*np.diff(points[closest:], axis=0).T)
+        along = np.cumsum(steps)
+        index = int(np.searchsorted(along, LOOKAHEAD))
+        return points[min(closest + index + 1, len(points) - 1)]
+
+    def plan(self, game_state: GameState, targets: np.ndarray,
+             thetas: np.ndarray | None = None, margin: float = KICKABLE_MARGIN,
+             speed: float = 100.0) -> CommandBatch:
+        """
+        Plan paths for the team's robots and get commands to follow them.
+
+        Args:
+            game_state: Current game state
+            targets: (N, 2) destinations, one per robot in team order; NaN
+                rows get no command
+            thetas: (N,) final headings, NaN or None for no heading
+            margin: Distance at which a robot has arrived
+            speed: Maximum dash power
+
+        Returns:
+            CommandBatch of DASH, TURN and DONE commands, in team order
+        """
+        self.costmap.update(game_state)
+        robot_ids, poses = game_state.team_robots(self.teamname)
+        targets = np.asarray(targets, dtype=float).reshape(len(robot_ids), 2)
+        team = game_state.team_index(self.teamname)
+        costs = self.costmap.costs()
+        cost_list = None
+
+        waypoints = targets.copy()
+        for i, robot_id in enumerate(robot_ids.tolist()):
+            target = targets[i]
+            if np.isnan(target[0]):
+                self.plans.pop(robot_id, None)
+                continue
+            position = poses[i, :2]
+            if np.hypot(*(target - position)) < margin:
+                continue
+            robot_cell = int(self.costmap.robot_cells[team, robot_id])
+            plan = self.plans.get(robot_id)
+            valid, closest = (self._still_valid(plan, costs, robot_cell, position, target)
+                              if plan is not None else (False, 0))
+            if valid:
+                self.reused += 1
+            else:
+                if cost_list is None:
+                    cost_list = costs.tolist()
+                plan = self.plans[robot_id] = self._plan(cost_list, position, target)
+                closest = 0
+            waypoints[i] = self._waypoint(plan[2], closest)
+
+        batch = goto_batch(poses, np.nan_to_num(waypoints, nan=0.0), margin, thetas, speed)
+        # Dash at the speed for the distance left to the target, not to the waypoint
+        remaining = np.hypot(*(targets - poses[:, :2]).T)
+        dashing = batch.codes == DASH
+        batch.args[dashing, 0] = np.minimum(remaining[dashing] * 10, speed)
+        no_target = np.isnan(targets[:, 0])
+        batch.codes[no_target] = DONE
+        batch.args[no_target] = 0.0
+        return batch
+
+    def report(self) -> str:
+        """Summarize how often plans were searched and reused."""
+        total = self.planned + self.reused
+        rate = self.reused / total if total else 0.0
+        return (f"{self.teamname}: {self.planned} paths planned, {self.reused} "
+                f"robot cycles followed an existing plan ({rate:.1%} reused)\n")
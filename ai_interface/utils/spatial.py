@@ -0,0 +1,239 @@
+"""
+Spatial queries over the robots and ball of one game state.
+
+SpatialIndex is built once per frame and answers batched nearest-neighbour,
+radius and segment-obstruction queries for every robot's decision in that
+cycle. A game has at most 2 * MAX_ROBOTS robots, so the index keeps them in
+a dense array and answers queries with broadcast distance matrices, which is
+faster in NumPy than a grid or KD-tree at this size.
+
+Rows of the index are the robots present in the frame, ordered by team and
+robot id; ``teams`` and ``ids`` map rows back to robots.
+"""
+
+import numpy as np
+
+from ai_interface.constants.field_constants import GOAL_L, GOAL_R
+from networking.data_utils import GameState
+
+# Robot radius used by default for obstruction queries
+ROBOT_RADIUS = 0.3
+
+
+class SpatialIndex:
+    """Index over the robots present in one game state."""
+    def __init__(self, game_state: GameState):
+        """
+        Build the index.
+
+        Args:
+            game_state: Game state to index
+        """
+        self.game_state = game_state
+        self.team_names = game_state.team_names
+        self.teams, self.ids = np.nonzero(game_state.valid)
+        self.points = game_state.poses[self.teams, self.ids, :2]
+        self.ball = game_state.ball
+        self._distances = None
+
+    @property
+    def distances(self) -> np.ndarray:
+        """(M, M) distances between all indexed robots, computed once."""
+        if self._distances is None:
+            delta = self.points[:, None, :] - self.points[None, :, :]
+            self._distances = np.hypot(delta[..., 0], delta[..., 1])
+        return self._distances
+
+    def team_rows(self, teamname: str) -> np.ndarray:
+        """Rows of the robots of one team."""
+        return np.flatnonzero(self.teams == self.team_names.index(teamname))
+
+    def row(self, teamname: str, robot_id: int) -> int:
+        """
+        Row of one robot.
+
+        Raises:
+            Exception: If the robot is not present in the frame
+        """
+        rows = np.flatnonzero((self.teams == self.team_names.index(teamname))
+                              & (self.ids == robot_id))
+        if len(rows) == 0:
+            raise Exception(f"Robot {robot_id} of {teamname} is not in the frame")
+        return int(rows[0])
+
+    def _candidates(self, teamname: str | None) -> np.ndarray:
+        """Rows a query searches: one team's robots, or all of them."""
+        if teamname is None:
+            return np.arange(len(self.points))
+        return self.team_rows(teamname)
+
+    @staticmethod
+    def _exclude(rows: np.ndarray, distances: np.ndarray, exclude: np.ndarray | None):
+        """Set the distances of excluded rows to inf, per query."""
+        if exclude is None:
+            return
+        exclude = np.asarray(exclude).reshape(len(distances), -1)
+        distances[np.any(rows[None, None, :] == exclude[:, :, None], axis=1)] = np.inf
+
+    def point_distances(self, points: np.ndarray, teamname: str | None = None
+                        ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Distances from query points to robots.
+
+        Args:
+            points: (K, 2) query points
+            teamname: Only measure to this team's robots, or None for all
+
+        Returns:
+            Tuple of (rows, distances) with shapes (C,) and (K, C)
+        """
+        rows = self._candidates(teamname)
+        delta = np.atleast_2d(points)[:, None, :2] - self.points[None, rows]
+        return rows, np.hypot(delta[..., 0], delta[..., 1])
+
+    def nearest(self, points: np.ndarray, teamname: str | None = None,
+                exclude: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest robot to each query point.
+
+        Args:
+            points: (K, 2) query points
+            teamname: Only search this team's robots, or None for all
+            exclude: (K,) or (K, E) rows to skip for each query, e.g. the
+                querying robot itself, or None
+
+        Returns:
+            Tuple of (rows, distances), both (K,); row -1 and distance inf
+            where no robot qualifies
+        """
+        rows, distances = self.point_distances(points, teamname)
+        self._exclude(rows, distances, exclude)
+        if len(rows) == 0:
+            k = len(distances)
+            return np.full(k, -1), np.full(k, np.inf)
+        best = np.argmin(distances, axis=1)
+        best_distances = distances[np.arange(len(distances)), best]
+        return np.where(np.isinf(best_distances), -1, rows[best]), best_distances
+
+    def nearest_to_ball(self, teamname: str | None = None) -> tuple[int, float]:
+        """
+        Robot nearest to the ball.
+
+        Args:
+            teamname: Only search this team's robots, or None for all
+
+        Returns:
+            Tuple of (row, distance), (-1, inf) if there is no robot or ball
+        """
+        if np.isnan(self.ball[0]):
+            return -1, np.inf
+        rows, distances = self.nearest(self.ball[None], teamname)
+        return int(rows[0]), float(distances[0])
+
+    def within(self, points: np.ndarray, radius: float | np.ndarray,
+               teamname: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Robots within a radius of each query point.
+
+        Args:
+            points: (K, 2) query points
+            radius: Radius, or (K,) radius per query point
+            teamname: Only search this team's robots, or None for all
+
+        Returns:
+            Tuple of (rows, mask) with shapes (C,) and (K, C), mask[k, c]
+            telling whether robot rows[c] is within radius of point k
+        """
+        rows, distances = self.point_distances(points, teamname)
+        return rows, distances <= np.asarray(radius, dtype=float).reshape(-1, 1)
+
+    def segment_distances(self, starts: np.ndarray, ends: np.ndarray,
+                          teamname: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Distances from robots to line segments, such as pass or shot lines.
+
+        Args:
+            starts: (K, 2) or (2,) segment start points
+            ends: (K, 2) or (2,) segment end points
+            teamname: Only measure to this team's robots, or None for all
+
+        Returns:
+            Tuple of (rows, distances) with shapes (C,) and (K, C)
+        """
+        rows = self._candidates(teamname)
+        starts, ends = np.broadcast_arrays(np.atleast_2d(starts)[:, :2],
+                                           np.atleast_2d(ends)[:, :2])
+        direction = ends - starts
+        length2 = np.maximum(np.einsum("ki,ki->k", direction, direction), 1e-12)
+        to_robot = self.points[None, rows] - starts[:, None]
+        t = np.einsum("kci,ki->kc", to_robot, direction) / length2[:, None]
+        np.clip(t, 0.0, 1.0, out=t)
+        closest = starts[:, None] + t[..., None] * direction[:, None]
+        delta = self.points[None, rows] - closest
+        return rows, np.hypot(delta[..., 0], delta[..., 1])
+
+    def segment_obstructed(self, starts: np.ndarray, ends: np.ndarray,
+                           teamname: str | None = None, radius: float = ROBOT_RADIUS,
+                           exclude: np.ndarray | None = None) -> np.ndarray:
+        """
+        Whether any robot lies within a radius of each line segment.
+
+        Args:
+            starts: (K, 2) or (2,) segment start points
+            ends: (K, 2) or (2,) segment end points
+            teamname: Only consider this team's robots, e.g. the opponents,
+                or None for all
+            radius: Clearance the segment needs from robot centers
+            exclude: (K,) or (K, E) rows to ignore for each segment, e.g. the
+                passer and the receiver, or None
+
+        Returns:
+            (K,) boolean array, True where the segment is obstructed
+        """
+        rows, distances = self.segment_distances(starts, ends, teamname)
+        self._exclude(rows, distances, exclude)
+        return np.any(distances <= radius, axis=1)
+
+    def shot_lanes_clear(self, shooters: np.ndarray, teamname: str | None = None,
+                         goal: str = "R", radius: float = ROBOT_RADIUS,
+                         exclude: np.ndarray | None = None) -> np.ndarray:
+        """
+        Whether the lanes from shooting points to the center of a goal are
+        free of robots.
+
+        Args:
+            shooters: (K, 2) or (2,) points to shoot from, e.g. the ball
+            teamname: Only consider this team's robots, e.g. the opponents,
+                or None for all
+            goal: "R" for GOAL_R or "L" for GOAL_L
+            radius: Clearance the lane needs from robot centers
+            exclude: (K,) or (K, E) rows to ignore for each lane, e.g. the
+                shooter, or None
+
+        Returns:
+            (K,) boolean array, True where the lane is clear
+        """
+        target = np.asarray(GOAL_R if goal == "R" else GOAL_L, dtype=float)
+        return ~self.segment_obstructed(shooters, target, teamname, radius, exclude)
+
+
+_last_index = (None, None)
+
+
+def spatial_index(game_state: GameState) -> SpatialIndex:
+    """
+    Get the SpatialIndex of a game state, building it only once per frame
+    even when every team's decision asks for it.
+
+    Args:
+        game_state: Game state to index
+
+    Returns:
+        Index over the game state
+    """
+    global _last_index
+    state, index = _last_index
+    if state is not game_state:
+        index = SpatialIndex(game_state)
+        _last_index = (game_state, index)
+    return index
@@ -0,0 +1,106 @@
+"""
+Benchmark for the per-cycle overhead of running team decisions and sends.
+
+Compares the old scheme (a new thread per team every cycle, and a new thread
+per robot command inside Commander.send_to_sim) with executors reused across
+cycles and thread-free sends. Commands go to a local UDP sink socket, and the
+strategy is the naive AI, so the numbers are dominated by the overhead.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_cycle
+"""
+
+import socket
+import threading
+import timeit
+
+from ai_interface.executors import create_executor
+from ai_interface.naive import SoccerAI
+from benchmarks.bench_parse import make_see_global, TEAM_NAMES
+from networking.data_utils import Deserializer, Serializer, TeamInfo, SIM_TIMESTEP
+from networking.socket_utils import Client, Commander, LOCALHOST_IP
+
+
+def make_commander(team_infos: list[TeamInfo], sink_addr: tuple) -> Commander:
+    """Build a Commander whose clients send to a local sink instead of a server."""
+    commander = Commander.__new__(Commander)
+    commander.team_infos = team_infos
+    commander.environment = "sim-only"
+    commander.socks, commander.addrs = {}, {}
+    commander.sim_clients = {}
+    for team_info in team_infos:
+        clients = []
+        for _ in range(team_info.n_players):
+            client = Client.__new__(Client)
+            client.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            client.addr = sink_addr
+            clients.append(client)
+        commander.sim_clients[team_info.name] = clients
+    return commander
+
+
+def spawn_send_to_sim(commander: Commander, teamname: str, commands: list[bytes]):
+    """The previous Commander.send_to_sim: one thread per robot command."""
+    threads = []
+    for (client, command) in zip(commander.sim_clients[teamname], commands):
+        if command is None:
+            continue
+        thread = threading.Thread(target=client.send_command, args=(command,))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+
+def bench(n_players: int, number: int = 500):
+    """Time one control cycle for both teams under each scheme."""
+    team_infos = [TeamInfo(name, n_players) for name in TEAM_NAMES]
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind((LOCALHOST_IP, 0))
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 16)
+    commander = make_commander(team_infos, sink.getsockname())
+
+    soccer_ai = SoccerAI()
+    serializer = Serializer()
+    game_state = Deserializer(team_infos).sim_deserialize(make_see_global(1, n_players))
+
+    def process_team(team_name, send):
+        ai_output = soccer_ai.decide_action(game_state, team_name)
+        translated = soccer_ai.translate_ai_output(ai_output)
+        send(commander, team_name, serializer.sim_serialize(translated))
+
+    def spawn_cycle():
+        threads = [threading.Thread(target=process_team, args=(name, spawn_send_to_sim))
+                   for name in TEAM_NAMES]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def executor_cycle(executor):
+        futures = [executor.submit(process_team, name, Commander.send_to_sim)
+                   for name in TEAM_NAMES]
+        for future in futures:
+            future.result()
+
+    thread_pool = create_executor("thread", len(TEAM_NAMES))
+    serial = create_executor("serial", len(TEAM_NAMES))
+    for label, stmt in [
+        ("spawned threads", spawn_cycle),
+        ("thread pool", lambda: executor_cycle(thread_pool)),
+        ("serial", lambda: executor_cycle(serial)),
+    ]:
+        best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+        print(f"{n_players:2d}v{n_players:<2d} {label:16s} {best * 1e6:8.1f} us/cycle "
+              f"({best / SIM_TIMESTEP * 100:.3f}% of cycle)")
+
+    thread_pool.shutdown()
+    for clients in commander.sim_clients.values():
+        for client in clients:
+            client.sock.close()
+    sink.close()
+
+
+if __name__ == "__main__":
+    for n_players in (6, 11):
+        bench(n_players)
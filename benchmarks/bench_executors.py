@@ -0,0 +1,77 @@
+"""
+Benchmark of decision throughput for each executor kind.
+
+Runs a compute-bound strategy (pure-Python work under the GIL) for two teams
+on serial, thread and process executors, and reports cycles per second. The
+process executor should scale with the number of cores; the thread executor
+cannot.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_executors [--work N] [--cycles N]
+"""
+
+import argparse
+import os
+import time
+
+from ai_interface.executors import StrategyProcessPool, create_executor
+from ai_interface.naive import SoccerAI
+from benchmarks.bench_parse import make_see_global, TEAM_NAMES
+from networking.data_utils import Deserializer, TeamInfo
+
+WORK = 200_000
+
+
+class BusySoccerAI(SoccerAI):
+    """Naive strategy that burns CPU in Python before every decision."""
+    work = WORK
+
+    def decide_action(self, game_state, teamname):
+        total = 0
+        for i in range(self.work):
+            total += i * i
+        return super().decide_action(game_state, teamname)
+
+
+def run(kind: str, states: list, work: int) -> float:
+    """Decide for both teams on every state and return cycles per second."""
+    BusySoccerAI.work = work
+    if kind == "process":
+        processes = StrategyProcessPool(BusySoccerAI, TEAM_NAMES, list(TEAM_NAMES))
+        start = time.perf_counter()
+        for game_state in states:
+            for _ in processes.decide(game_state):
+                pass
+        elapsed = time.perf_counter() - start
+        processes.shutdown()
+    else:
+        soccer_ai = BusySoccerAI()
+        executor = create_executor(kind, len(TEAM_NAMES))
+        start = time.perf_counter()
+        for game_state in states:
+            futures = [
+                executor.submit(lambda name: soccer_ai.translate_ai_output(
+                    soccer_ai.decide_action(game_state, name)), team_name)
+                for team_name in TEAM_NAMES
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+        executor.shutdown()
+    return len(states) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--work", type=int, default=WORK,
+                        help="loop iterations per decision")
+    parser.add_argument("--cycles", type=int, default=50)
+    args = parser.parse_args()
+
+    deserializer = Deserializer([TeamInfo(name, 11) for name in TEAM_NAMES])
+    states = [deserializer.sim_deserialize(make_see_global(count, 11, seed=count))
+              for count in range(args.cycles)]
+
+    print(f"{os.cpu_count()} cores, {args.work} iterations per decision")
+    for kind in ["serial", "thread", "process"]:
+        print(f"{kind:8s} {run(kind, states, args.work):8.1f} cycles/s")
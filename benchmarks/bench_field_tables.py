@@ -0,0 +1,147 @@
+"""
+Benchmark for precomputed goal geometry lookup tables.
+
+Checks whether reading goal distances, angles and shooting poses from a
+quantized grid over FIELD_X and FIELD_Y beats computing them exactly with
+NumPy, as calculate_shooting_pose_batch and shoot_batch do, after checking
+that the scalar and batch shooting poses agree:
+    - exact and table lookups for 11, 1000 and 100000 points
+    - worst quantization error of the tables
+    - hit rate of a bounded LRU cache of exact scalar shooting poses, keyed
+      on ball coordinates rounded to the centimeter, over a ball trajectory
+      that rests for stretches of cycles, as during set pieces, and its
+      cost per query and per hit against calling calculate_shooting_pose
+
+Usage (from the repository root):
+    python -m benchmarks.bench_field_tables [--resolution R]
+"""
+
+import argparse
+import math
+import timeit
+from functools import lru_cache
+
+import numpy as np
+
+from ai_interface.constants.field_constants import FIELD_X, FIELD_Y, GOAL_R
+from ai_interface.constants.player_constants import KICKABLE_MARGIN
+from ai_interface.utils.basic_commands import calculate_shooting_pose, calculate_shooting_pose_batch
+
+
+class GoalTable:
+    """Distance, angle and unit direction to one goal for every grid cell."""
+    def __init__(self, goal, resolution: float):
+        self.resolution = resolution
+        self.origin = np.array([FIELD_X[0], FIELD_Y[0]], dtype=float)
+        self.shape = np.array([math.ceil((FIELD_X[1] - FIELD_X[0]) / resolution),
+                               math.ceil((FIELD_Y[1] - FIELD_Y[0]) / resolution)])
+        xs = self.origin[0] + (np.arange(self.shape[0]) + 0.5) * resolution
+        ys = self.origin[1] + (np.arange(self.shape[1]) + 0.5) * resolution
+        cx, cy = np.meshgrid(xs, ys, indexing="ij")
+        dx, dy = goal[0] - cx, goal[1] - cy
+        distance = np.hypot(dx, dy)
+        self.table = np.stack([distance, np.degrees(np.arctan2(dy, dx)),
+                               dx / distance, dy / distance], axis=-1
+                              ).reshape(-1, 4).astype(np.float32)
+        self.strides = np.array([self.shape[1], 1])
+
+    def lookup(self, points: np.ndarray) -> np.ndarray:
+        """(N, 4) rows of (distance, angle, ux, uy) for the cells of points."""
+        index = ((points - self.origin) / self.resolution).astype(np.intp)
+        np.clip(index, 0, self.shape - 1, out=index)
+        return self.table[index @ self.strides]
+
+    def shooting_pose(self, balls: np.ndarray) -> np.ndarray:
+        """(N, 3) shooting poses behind balls, from the table directions."""
+        rows = self.lookup(balls)
+        poses = np.empty((len(balls), 3))
+        poses[:, :2] = balls - rows[:, 2:] * (KICKABLE_MARGIN / 2)
+        poses[:, 2] = rows[:, 1]
+        return poses
+
+
+def exact_geometry(points: np.ndarray, goal) -> tuple[np.ndarray, np.ndarray]:
+    """Exact distances and angles from points to a goal."""
+    delta = np.asarray(goal, dtype=float) - points
+    return np.hypot(delta[:, 0], delta[:, 1]), np.degrees(np.arctan2(delta[:, 1], delta[:, 0]))
+
+
+# Decimals the ball coordinates are rounded to for the cache key, since
+# measured positions rarely repeat exactly
+CACHE_DECIMALS = 2
+
+
+@lru_cache(maxsize=4096)
+def _cached_shooting_pose(x: float, y: float) -> np.ndarray:
+    """calculate_shooting_pose toward GOAL_R behind an LRU cache."""
+    return calculate_shooting_pose((x, y), GOAL_R)
+
+
+def cached_shooting_pose(x: float, y: float) -> np.ndarray:
+    """Cached shooting pose of the ball rounded to CACHE_DECIMALS."""
+    return _cached_shooting_pose(round(x, CACHE_DECIMALS), round(y, CACHE_DECIMALS))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolution", type=float, default=0.25,
+                        help="table cell size in meters")
+    args = parser.parse_args()
+
+    table = GoalTable(GOAL_R, args.resolution)
+    rng = np.random.default_rng(0)
+    low, high = [FIELD_X[0], FIELD_Y[0]], [FIELD_X[1], FIELD_Y[1]]
+
+    # The scalar and batch shooting poses agree, also for a ball on the goal point
+    balls = np.vstack([rng.uniform(low, high, (100, 2)), GOAL_R])
+    scalar = np.array([calculate_shooting_pose(ball, GOAL_R) for ball in balls])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        batch = calculate_shooting_pose_batch(balls, GOAL_R)
+    np.testing.assert_allclose(scalar, batch, equal_nan=True)
+    assert np.isnan(scalar[-1, :2]).all()
+
+    for n in (11, 1000, 100000):
+        points = rng.uniform(low, high, (n, 2))
+        number = max(1, 200000 // n)
+        times = {}
+        for label, stmt in [
+            ("exact geometry", lambda: exact_geometry(points, GOAL_R)),
+            ("table geometry", lambda: table.lookup(points)),
+            ("exact shooting pose", lambda: calculate_shooting_pose_batch(points, GOAL_R)),
+            ("table shooting pose", lambda: table.shooting_pose(points)),
+        ]:
+            times[label] = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+        print(f"{n:>6} points: " + ", ".join(f"{label} {t * 1e6:.1f} us"
+                                             for label, t in times.items()))
+
+    points = rng.uniform(low, high, (100000, 2))
+    exact = calculate_shooting_pose_batch(points, GOAL_R)
+    quantized = table.shooting_pose(points)
+    heading_error = np.abs((exact[:, 2] - quantized[:, 2] + 180) % 360 - 180)
+    far = exact_geometry(points, GOAL_R)[0] > 5
+    print(f"worst table error at {args.resolution} m cells: "
+          f"{np.abs(exact[:, :2] - quantized[:, :2]).max() * 100:.1f} cm position, "
+          f"{heading_error.max():.1f} deg heading ({heading_error[far].max():.1f} deg "
+          f"beyond 5 m of the goal), {table.table.nbytes / 1e6:.1f} MB per goal")
+
+    # A ball that moves for 20 cycles, then rests for 30
+    ball = np.zeros(2)
+    trajectory = []
+    for cycle in range(6000):
+        if cycle % 50 < 20:
+            ball = np.clip(ball + rng.normal(0, 0.5, 2), low, high)
+        trajectory.append((float(ball[0]), float(ball[1])))
+    exact_time = min(timeit.repeat(
+        lambda: [calculate_shooting_pose(b, GOAL_R) for b in trajectory], number=1, repeat=5))
+    # Each run starts from an empty cache
+    cached_time = min(timeit.repeat(
+        lambda: [cached_shooting_pose(*b) for b in trajectory],
+        setup=_cached_shooting_pose.cache_clear, number=1, repeat=5))
+    info = _cached_shooting_pose.cache_info()
+    # The ball at rest, so every query after the first hits
+    hit_time = min(timeit.repeat(lambda: cached_shooting_pose(*trajectory[-1]),
+                                 number=100000, repeat=5)) / 100000
+    print(f"LRU cache of exact poses: {info.hits / (info.hits + info.misses):.1%} hit rate, "
+          f"{cached_time / len(trajectory) * 1e6:.2f} us per query "
+          f"({hit_time * 1e6:.2f} us per hit) vs "
+          f"{exact_time / len(trajectory) * 1e6:.2f} us uncached")
@@ -0,0 +1,74 @@
+"""
+Benchmark for the batched forward model.
+
+Rolls out batches of random candidate commands for an 11-robot team from a
+synthetic 11v11 frame, with the ball at the feet of robot 1, and reports
+rollouts per second and the time to score a whole batch by the ball's
+distance to the goal, against the SIM_TIMESTEP cycle budget. Also checks a
+full-power dash from rest against the rcssserver dynamics.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_forward_model [--steps N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ai_interface.constants.field_constants import GOAL_R
+from ai_interface.utils.forward_model import (
+    ForwardModel, DASH_POWER_RATE, PLAYER_DECAY)
+from benchmarks.bench_parse import make_see_global, TEAM_NAMES
+from networking.data_utils import Deserializer, TeamInfo, DASH, TURN, KICK, SIM_TIMESTEP
+
+
+def random_candidates(rng: np.random.Generator, n_rollouts: int, n_robots: int):
+    """Random dash, turn and kick commands for every robot of every rollout."""
+    codes = rng.choice([DASH, TURN, KICK], size=(n_rollouts, n_robots))
+    args = np.stack([rng.uniform(0, 100, (n_rollouts, n_robots)),
+                     rng.uniform(-180, 180, (n_rollouts, n_robots))], axis=-1)
+    return codes, args
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=10, help="cycles per rollout")
+    args = parser.parse_args()
+
+    deserializer = Deserializer([TeamInfo(name, 11) for name in TEAM_NAMES])
+    game_state = deserializer.sim_deserialize(make_see_global(1, 11))
+    team = game_state.team_index(TEAM_NAMES[0])
+    game_state.ball[:] = game_state.poses[team, 1, :2] + [0.5, 0.0]
+    model = ForwardModel(game_state, TEAM_NAMES[0])
+    n_robots = model.team_rows.stop - model.team_rows.start
+
+    # A dash of 100 straight ahead from rest moves 0.6 m, keeping 40% of it
+    codes = np.full((1, n_robots), DASH)
+    dash = np.zeros((1, n_robots, 2))
+    dash[..., 0] = 100
+    state = model.rollout(codes, dash)
+    row = model.team_rows.start + 1
+    moved = state.positions[0, row] - model.positions[row]
+    heading = np.radians(model.bodies[row])
+    expected = 100 * DASH_POWER_RATE * np.array([np.cos(heading), np.sin(heading)])
+    assert np.allclose(moved, expected) and np.allclose(
+        state.velocities[0, row], expected * PLAYER_DECAY)
+
+    rng = np.random.default_rng(0)
+    for n_rollouts in (64, 256, 1024):
+        codes, candidate_args = random_candidates(rng, n_rollouts, n_robots)
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            state = model.rollout(codes, candidate_args, args.steps)
+            scores = -np.hypot(*(state.ball - GOAL_R).T)
+            best = int(np.argmax(scores))
+            times.append(time.perf_counter() - start)
+        elapsed = min(times)
+        kicked = np.count_nonzero(np.any(state.ball != game_state.ball, axis=1))
+        print(f"{n_rollouts:5d} rollouts x {args.steps} cycles  {elapsed * 1e3:7.2f} ms "
+              f"({elapsed / SIM_TIMESTEP * 100:5.1f}% of cycle), "
+              f"{n_rollouts / elapsed:9,.0f} rollouts/s, "
+              f"{n_rollouts * args.steps / elapsed:10,.0f} cycles/s, "
+              f"ball moved in {kicked}, best {scores[best]:.1f} m")
@@ -0,0 +1,48 @@
+"""
+Fairness check and throughput of parallel matches.
+
+Plays an even number of matches of one strategy against itself through
+networking.orchestrator, with the home team on alternating sides of fake
+servers in synchronous mode. Identical teams must come out even: as many
+wins as losses, as many goals for as against, and a mean ball x near zero.
+A side advantage of the server or the client formation that the side
+alternation fails to cancel fails the check.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_matches [--matches N] [--cycles C] [--strategy MODULE]
+"""
+
+import argparse
+
+from networking.orchestrator import make_configs, report, run_matches
+
+# Meters the mean ball x of identical teams may be off zero
+BALL_X_TOLERANCE = 1.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--matches", type=int, default=4)
+    parser.add_argument("--cycles", type=int, default=1500)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--strategy", type=str, default="ai_interface.naive")
+    args = parser.parse_args()
+    if args.matches % 2:
+        parser.error("--matches must be even to play both sides equally often")
+
+    configs = make_configs(args.matches, (args.strategy, args.strategy), args.players,
+                           args.cycles, synch=True)
+    results, elapsed = run_matches(configs)
+    print(report(results, elapsed), end="")
+
+    assert all(result.error is None for result in results), "a match failed"
+    scores = [result.goals for result in results]
+    wins = sum(home > away for home, away in scores)
+    losses = sum(home < away for home, away in scores)
+    assert wins == losses, f"{wins} wins but {losses} losses for identical teams"
+    goals_for = sum(home for home, _ in scores)
+    goals_against = sum(away for _, away in scores)
+    assert goals_for == goals_against, f"goals {goals_for}-{goals_against} for identical teams"
+    ball_x = sum(result.ball_x for result in results) / len(results)
+    assert abs(ball_x) < BALL_X_TOLERANCE, f"mean ball x {ball_x:+.1f} for identical teams"
+    print("identical teams came out even")
@@ -0,0 +1,66 @@
+"""
+Benchmark for parsing simulator see_global messages.
+
+Measures the per-frame cost of Deserializer.sim_parse (single-pass parse into
+preallocated arrays) and Deserializer.sim_deserialize (array-backed
+GameState) for 6v6 and 11v11 frames.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parse
+"""
+
+import random
+import timeit
+
+from networking.data_utils import Deserializer, TeamInfo, SIM_TIMESTEP
+
+TEAM_NAMES = ("TritonBots", "TeamB")
+
+
+def make_see_global(count: int, n_players: int, seed: int = 0) -> bytes:
+    """
+    Build a synthetic see_global message like the ones sent by rcssserver.
+
+    Args:
+        count: Server cycle number
+        n_players: Number of players per team
+        seed: Random seed for object positions
+
+    Returns:
+        Null-terminated see_global message bytes
+    """
+    rng = random.Random(seed)
+    parts = [f"(see_global {count} ((g l) -52.5 0) ((g r) 52.5 0)"]
+    parts.append(f"((b) {rng.uniform(-50, 50):.4f} {rng.uniform(-30, 30):.4f} 0 0)")
+    for teamname in TEAM_NAMES:
+        for unum in range(1, n_players + 1):
+            goalie = " goalie" if unum == 1 else ""
+            x, y = rng.uniform(-50, 50), rng.uniform(-30, 30)
+            vx, vy = rng.uniform(-1, 1), rng.uniform(-1, 1)
+            body, neck = rng.uniform(-180, 180), rng.uniform(-90, 90)
+            parts.append(f'((p "{teamname}" {unum}{goalie}) {x:.4f} {y:.4f} '
+                         f'{vx:.4f} {vy:.4f} {body:.4f} {neck:.4f})')
+    return (" ".join(parts) + ")\0").encode()
+
+
+def bench(n_players: int, number: int = 5000):
+    """Time both parsing entry points for the given team size."""
+    team_infos = [TeamInfo(name, n_players) for name in TEAM_NAMES]
+    deserializer = Deserializer(team_infos)
+    data = make_see_global(1, n_players)
+
+    assert deserializer.sim_deserialize(data) is not None
+    assert deserializer.valid.sum() == 2 * n_players
+
+    for label, stmt in [
+        ("sim_parse", lambda: deserializer.sim_parse(data)),
+        ("sim_deserialize", lambda: deserializer.sim_deserialize(data)),
+    ]:
+        best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+        print(f"{n_players:2d}v{n_players:<2d} {label:16s} {best * 1e6:8.1f} us/frame "
+              f"({best / SIM_TIMESTEP * 100:.3f}% of cycle, {len(data)} bytes)")
+
+
+if __name__ == "__main__":
+    for n_players in (6, 11):
+        bench(n_players)
@@ -0,0 +1,111 @@
+"""
+Load test of the whole Networker pipeline against the fake server.
+
+Runs networking.fake_server.FakeServer in a separate process at 1x, 10x and
+100x the normal cycle rate, connects a Networker with both teams to it and
+runs the naive AI on the latest frame, as the main loop does. Reports how many
+server cycles were decided on, how many frames were skipped as stale, and the
+latency from each cycle's see_global to the arrival of commands in that cycle.
+First checks that the fake server mirrors a right player's move the way
+rcssserver does, so both teams' formations end up in their own halves.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline [--players N] [--duration S]
+"""
+
+import argparse
+import multiprocessing
+import socket
+import time
+
+from ai_interface.naive import SoccerAI
+from networking.data_utils import TeamInfo, SIM_TIMESTEP
+from networking.fake_server import FakeServer
+from networking.networker import Networker
+from networking.socket_utils import LOCALHOST_IP
+
+TEAM_NAMES = ("TritonBots", "TeamB")
+
+
+def check_move_mirroring():
+    """Move one player per side to the same spot and check they land in opposite halves."""
+    server = FakeServer(1, SIM_TIMESTEP, (LOCALHOST_IP, 0), (LOCALHOST_IP, 0))
+    server.start()
+    client_addr = server.client_sock.getsockname()
+    clients = []
+    for teamname in TEAM_NAMES:
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.settimeout(1.0)
+        client.sendto(b"(init %b (version 19))\0" % teamname.encode(), client_addr)
+        _, player_addr = client.recvfrom(64)
+        client.sendto(b"(move -9.5 5)\0", player_addr)
+        clients.append(client)
+    time.sleep(0.1)
+    server.stop()
+    for client in clients:
+        client.close()
+    left, right = server.players[("l", 1)], server.players[("r", 1)]
+    assert (left.x, left.y) == (-9.5, 5.0), (left.x, left.y)
+    assert (right.x, right.y) == (9.5, -5.0), (right.x, right.y)
+    print("move mirroring: left player at (-9.5, 5), right player at (9.5, -5)")
+
+
+def serve(n_players: int, step: float, ready, stop, results):
+    """Run a fake server until told to stop, then report its statistics."""
+    server = FakeServer(n_players, step)
+    server.start()
+    ready.set()
+    stop.wait()
+    server.stop()
+    results.put((server.cycle, server.n_commands, server.command_latencies()))
+
+
+def run(n_players: int, speedup: float, duration: float):
+    """Play against a fake server for a while and print pipeline statistics."""
+    step = SIM_TIMESTEP / speedup
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    results = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(n_players, step, ready, stop, results))
+    server.start()
+    ready.wait()
+
+    team_infos = [TeamInfo(name, n_players) for name in TEAM_NAMES]
+    soccer_ai = SoccerAI()
+    networker = Networker(team_infos, "sim-only")
+    networker.start_receiver()
+    decided = set()
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        game_state = networker.get_game_state()
+        if game_state is None:
+            continue
+        decided.add(game_state.count)
+        for team_name in TEAM_NAMES:
+            actions = soccer_ai.decide_action(game_state, team_name)
+            networker.execute_ai_output(soccer_ai.translate_ai_output(actions), team_name)
+    networker.disconnect_from_sim()
+    networker.close()
+
+    stop.set()
+    cycles, n_commands, latencies = results.get()
+    server.join()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e3 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3 if latencies else float("nan")
+    print(f"{n_players:2d}v{n_players:<2d} {speedup:5.0f}x ({1 / step:6.0f} cycles/s): "
+          f"decided {len(decided)}/{cycles} cycles, skipped {networker.frames_skipped} frames, "
+          f"{n_commands} commands, latency p50 {p50:.2f} ms p99 {p99:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, nargs="+", default=[6, 11])
+    parser.add_argument("--speedups", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    check_move_mirroring()
+    for n_players in args.players:
+        for speedup in args.speedups:
+            run(n_players, speedup, args.duration)
@@ -0,0 +1,67 @@
+"""
+Benchmark for the path planner.
+
+Plans paths for all 11 robots of a team through synthetic 11v11 frames,
+each robot following its commands to its own target across the field
+while the opponents move at constant velocity, and reports the time of the first cycle (every path
+searched from scratch), the time per cycle after that and how often plans
+were reused. The cycle budget is SIM_TIMESTEP.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_planner [--frames N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ai_interface.constants.field_constants import FIELD_X, FIELD_Y
+from ai_interface.utils.planner import PathPlanner
+from benchmarks.bench_parse import TEAM_NAMES
+from benchmarks.bench_tracking import make_frames
+from networking.data_utils import DASH, SIM_TIMESTEP
+
+# Speed of a robot dashing at full power, in meters per second
+MAX_SPEED = 2.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=1000)
+    args = parser.parse_args()
+
+    frames, _, _, _ = make_frames(args.frames, 11, noise=0.01)
+    rng = np.random.default_rng(1)
+    targets = rng.uniform([FIELD_X[0], FIELD_Y[0]], [FIELD_X[1], FIELD_Y[1]], (11, 2))
+
+    begin = time.perf_counter()
+    planner = PathPlanner(TEAM_NAMES[0])
+    setup = time.perf_counter() - begin
+
+    # The team follows its dash commands at up to MAX_SPEED; opponents keep
+    # their constant velocities
+    team_poses = frames[0].poses[0].copy()
+    times = []
+    for frame in frames:
+        poses = frame.poses.copy()
+        poses[0] = team_poses
+        frame = frame._replace(poses=poses)
+        begin = time.perf_counter()
+        batch = planner.plan(frame, targets)
+        times.append(time.perf_counter() - begin)
+        robot_ids, _ = frame.team_robots(TEAM_NAMES[0])
+        dashing = batch.codes == DASH
+        direction = np.radians(batch.args[:, 1] + team_poses[robot_ids, 2])
+        step = MAX_SPEED * SIM_TIMESTEP * batch.args[:, 0] / 100 * dashing
+        team_poses[robot_ids, 0] += step * np.cos(direction)
+        team_poses[robot_ids, 1] += step * np.sin(direction)
+    assert len(batch.codes) == 11
+
+    steady = np.array(times[1:]) * 1e3
+    print(f"planner setup            {setup * 1e3:.1f} ms (once)")
+    print(f"first cycle, 11 paths    {times[0] * 1e3:.2f} ms")
+    print(f"following cycles         mean {steady.mean():.3f} ms, "
+          f"p99 {np.percentile(steady, 99):.3f} ms, max {steady.max():.3f} ms "
+          f"of a {SIM_TIMESTEP * 1e3:.0f} ms cycle")
+    print(planner.report(), end="")
@@ -0,0 +1,103 @@
+"""
+Benchmark for memory allocated while ingesting simulator frames.
+
+Sends 11v11 see_global datagrams over a local UDP socket and traces, with
+tracemalloc, the memory allocated per frame by:
+    - recvfrom: a new bytes object per datagram, then parsed
+    - ReceiveBuffer: recvfrom_into the reusable buffer, parsed from a view
+    - ReceiveBuffer + snapshot: as above, plus the GameState handed to the AI
+
+For each it reports the transient peak above the memory in use before the
+frame, the memory still held after all frames and the time per frame.
+Tracing slows everything down, so the times are only comparable with each
+other. Also checks that an oversized datagram and one from another sender
+are dropped, and that neither overwrites the previous datagram, which
+Listener.watch_latest still holds while it drains the next one.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_receive [--frames N]
+"""
+
+import argparse
+import socket
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_parse import make_see_global, TEAM_NAMES
+from networking.data_utils import Deserializer, TeamInfo
+from networking.socket_utils import ReceiveBuffer, BUFFER_SIZE, LOCALHOST_IP
+
+
+def ingest(frames: int, receive, parse) -> tuple[float, float, float]:
+    """
+    Receive and parse frames one at a time under tracemalloc.
+
+    Returns:
+        Tuple of (mean peak bytes per frame, bytes retained after all
+        frames, microseconds per frame)
+    """
+    peaks = np.zeros(frames)    # filled in place, so it is not traced per frame
+    tracemalloc.start()
+    for count in range(10):    # warm up caches and free lists
+        parse(receive(count))
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for count in range(frames):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        parse(receive(count))
+        peaks[count] = tracemalloc.get_traced_memory()[1] - current
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return peaks.mean(), retained, elapsed / frames * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind((LOCALHOST_IP, 0))
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = receiver.getsockname()
+    messages = [make_see_global(count, 11, seed=count % 16) for count in range(16)]
+    deserializer = Deserializer([TeamInfo(name, 11) for name in TEAM_NAMES])
+    buffer = ReceiveBuffer()
+
+    def receive_bytes(count: int) -> bytes:
+        sender.sendto(messages[count % 16], address)
+        return receiver.recvfrom(BUFFER_SIZE)[0]
+
+    def receive_view(count: int) -> memoryview:
+        sender.sendto(messages[count % 16], address)
+        return buffer.receive(receiver)[0]
+
+    print(f"11v11 see_global, {len(messages[0])} bytes, {args.frames} frames")
+    for label, receive, parse in [
+        ("recvfrom", receive_bytes, deserializer.sim_parse),
+        ("ReceiveBuffer", receive_view, deserializer.sim_parse),
+        ("ReceiveBuffer + snapshot", receive_view, deserializer.sim_deserialize),
+    ]:
+        peak, retained, per_frame = ingest(args.frames, receive, parse)
+        print(f"{label:<25} peak {peak:7.0f} B/frame, retained {retained:6d} B, "
+              f"{per_frame:6.1f} us/frame traced")
+
+    # A good datagram, then a truncated one and one from another sender,
+    # then a good one: the first view must survive until the last arrives
+    stranger = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.sendto(b"AAAA-first", address)
+    first, source = buffer.receive(receiver)
+    sender.sendto(b"x" * (BUFFER_SIZE + 1), address)
+    assert buffer.receive(receiver, source)[0] is None and buffer.truncated == 1
+    stranger.sendto(b"BBBB-stranger", address)
+    assert buffer.receive(receiver, source)[0] is None
+    sender.sendto(b"CCCC-third", address)
+    third, _ = buffer.receive(receiver, source)
+    assert bytes(first) == b"AAAA-first" and bytes(third) == b"CCCC-third"
+    print(f"datagrams of {BUFFER_SIZE + 1} bytes and from other senders dropped "
+          f"without overwriting the previous datagram")
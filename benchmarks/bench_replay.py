@@ -0,0 +1,74 @@
+"""
+Benchmark for replaying a recorded match without any network I/O.
+
+Writes a synthetic 11v11 match log, then replays it as fast as possible
+through the Listener, the naive AI and the Serializer, reporting frames per
+second for each stage combination.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_replay [--frames N] [--log PATH]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ai_interface.naive import SoccerAI
+from benchmarks.bench_parse import make_see_global, TEAM_NAMES
+from networking.data_utils import Serializer, TeamInfo, SIM_TIMESTEP
+from networking.recording import MatchRecorder
+from networking.socket_utils import Listener
+
+
+def write_log(path: str, n_frames: int, n_players: int):
+    """Write a synthetic simulator match log with one frame per cycle."""
+    recorder = MatchRecorder(path, "simulator")
+    start = time.time()
+    for count in range(n_frames):
+        data = make_see_global(count, n_players, seed=count)
+        recorder.record(data, start + count * SIM_TIMESTEP)
+    recorder.close()
+
+
+def replay(path: str, team_infos: list[TeamInfo], decide: bool) -> tuple[int, float]:
+    """Replay a log as fast as possible, optionally running the AI on each frame."""
+    listener = Listener(team_infos, "sim-only", replay_path=path, replay_speed=0)
+    soccer_ai = SoccerAI()
+    serializer = Serializer()
+    n_frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            game_state = listener.watch_game()
+            n_frames += 1
+            if decide:
+                for team_name in TEAM_NAMES:
+                    actions = soccer_ai.decide_action(game_state, team_name)
+                    serializer.sim_serialize(soccer_ai.translate_ai_output(actions))
+    except EOFError:
+        pass
+    elapsed = time.perf_counter() - start
+    listener.close()
+    return n_frames, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=6000)
+    parser.add_argument("--players", type=int, default=11)
+    parser.add_argument("--log", type=str, default=None,
+                        help="replay this log instead of a synthetic one")
+    args = parser.parse_args()
+
+    team_infos = [TeamInfo(name, args.players) for name in TEAM_NAMES]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.log
+        if path is None:
+            path = os.path.join(tmp, "match.log")
+            write_log(path, args.frames, args.players)
+
+        for label, decide in [("parse", False), ("parse+decide+serialize", True)]:
+            n_frames, elapsed = replay(path, team_infos, decide)
+            print(f"{label:24s} {n_frames} frames in {elapsed:.2f} s "
+                  f"({n_frames / elapsed:,.0f} frames/s)")
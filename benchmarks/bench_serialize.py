@@ -0,0 +1,77 @@
+"""
+Benchmark for serializing one team's commands.
+
+Compares command strings, which the strategy formats and the Serializer then
+splits and re-parses to convert turn and dash angles, with CommandBatch arrays
+encoded in one pass, and the text robot protocol with binary robot packets,
+including what it costs the robots to parse each.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_serialize
+"""
+
+import timeit
+
+import numpy as np
+
+from networking.data_utils import Serializer, CommandBatch, DASH, TURN, KICK
+from networking.robot_protocol import decode_robot_packet
+
+
+def make_batch(n_robots: int) -> CommandBatch:
+    """A mix of dash, turn and kick commands."""
+    rng = np.random.default_rng(0)
+    codes = np.array([(DASH, TURN, KICK)[i % 3] for i in range(n_robots)])
+    args = rng.uniform(-3, 3, (n_robots, 2))
+    args[codes != TURN, 0] = 100
+    return CommandBatch(codes, args)
+
+
+def format_strings(batch: CommandBatch) -> list[str]:
+    """Format a batch as command strings, as string-based strategies do."""
+    strings = []
+    for code, (a, b) in zip(batch.codes.tolist(), batch.args.tolist()):
+        if code == DASH:
+            strings.append(f"dash {a} {b}")
+        elif code == TURN:
+            strings.append(f"turn {a}")
+        else:
+            strings.append(f"kick {a} {b}")
+    return strings
+
+
+def parse_line(line: str) -> tuple:
+    """Parse one text protocol line as a robot would."""
+    name, *args = line.split()
+    return (name, *map(float, args))
+
+
+def bench(n_robots: int, number: int = 20000):
+    """Print per-team serialization times for strings and batches."""
+    serializer = Serializer()
+    batch = make_batch(n_robots)
+    for target in ["sim_serialize", "robot_serialize"]:
+        serialize = getattr(serializer, target)
+        for label, encode in [("strings", lambda: serialize(format_strings(batch))),
+                              ("batch", lambda: serialize(batch))]:
+            elapsed = timeit.timeit(encode, number=number)
+            print(f"{n_robots:2d} robots {target:16s} {label:8s} "
+                  f"{elapsed / number * 1e6:7.2f} us per team")
+
+    text = serializer.robot_serialize(batch)
+    packet = serializer.robot_serialize_binary(batch, 1, 0)
+    encoders = [("text", lambda: serializer.robot_serialize(batch)),
+                ("binary", lambda: serializer.robot_serialize_binary(batch, 1, 0))]
+    decoders = [("text", lambda: [parse_line(line) for line in text.decode().splitlines()]),
+                ("binary", lambda: decode_robot_packet(packet))]
+    for (label, encode), (_, decode) in zip(encoders, decoders):
+        encode_time = timeit.timeit(encode, number=number) / number
+        decode_time = timeit.timeit(decode, number=number) / number
+        size = len(text if label == "text" else packet)
+        print(f"{n_robots:2d} robots robot protocol   {label:8s} {size:4d} bytes, "
+              f"encode {encode_time * 1e6:6.2f} us, decode {decode_time * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    for n_robots in (6, 11):
+        bench(n_robots)
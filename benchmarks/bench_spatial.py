@@ -0,0 +1,90 @@
+"""
+Benchmark for the spatial index.
+
+Answers the queries a strategy asks every cycle on an 11v11 frame, once with
+per-robot Python loops and once with SpatialIndex, and reports the time per
+frame of each:
+    - nearest opponent of every teammate
+    - whether the shot lane from every teammate to GOAL_R is clear
+    - which pass lanes between teammates are free of opponents
+
+Usage (from the repository root):
+    python -m benchmarks.bench_spatial
+"""
+
+import math
+import timeit
+
+import numpy as np
+
+from ai_interface.constants.field_constants import GOAL_R
+from ai_interface.utils.spatial import ROBOT_RADIUS, SpatialIndex
+from benchmarks.bench_parse import TEAM_NAMES, make_see_global
+from networking.data_utils import Deserializer, TeamInfo
+
+
+def segment_distance(start, end, point) -> float:
+    """Distance from a point to a line segment."""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length2 = max(dx * dx + dy * dy, 1e-12)
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length2
+    t = min(max(t, 0.0), 1.0)
+    return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+
+def loop_queries(game_state):
+    """The queries written as loops over the legacy robot_poses dictionaries."""
+    robot_poses = game_state.robot_poses
+    mine = {i: pose for robot in robot_poses[TEAM_NAMES[0]] for i, pose in robot.items()}
+    theirs = {i: pose for robot in robot_poses[TEAM_NAMES[1]] for i, pose in robot.items()}
+    nearest = {}
+    for robot_id, pose in mine.items():
+        nearest[robot_id] = min(theirs, key=lambda other: math.hypot(
+            theirs[other][0] - pose[0], theirs[other][1] - pose[1]))
+    shots = {robot_id: all(segment_distance(pose, GOAL_R, other) > ROBOT_RADIUS
+                           for other in theirs.values())
+             for robot_id, pose in mine.items()}
+    passes = {}
+    for passer, start in mine.items():
+        for receiver, end in mine.items():
+            if passer != receiver:
+                passes[passer, receiver] = all(
+                    segment_distance(start, end, other) > ROBOT_RADIUS
+                    for other in theirs.values())
+    return nearest, shots, passes
+
+
+def index_queries(game_state):
+    """The same queries answered in batches by a SpatialIndex."""
+    index = SpatialIndex(game_state)
+    mine = index.team_rows(TEAM_NAMES[0])
+    points = index.points[mine]
+    nearest = index.nearest(points, TEAM_NAMES[1])
+    shots = index.shot_lanes_clear(points, TEAM_NAMES[1])
+    passers, receivers = np.meshgrid(mine, mine, indexing="ij")
+    passes = ~index.segment_obstructed(index.points[passers.ravel()],
+                                       index.points[receivers.ravel()], TEAM_NAMES[1])
+    return nearest, shots, passes
+
+
+if __name__ == "__main__":
+    deserializer = Deserializer([TeamInfo(name, 11) for name in TEAM_NAMES])
+    game_state = deserializer.sim_deserialize(make_see_global(1, 11))
+
+    # Both versions must agree
+    nearest, shots, passes = loop_queries(game_state)
+    (rows, _), index_shots, index_passes = index_queries(game_state)
+    index = SpatialIndex(game_state)
+    ids = index.ids[index.team_rows(TEAM_NAMES[0])]
+    assert [nearest[i] for i in ids] == list(index.ids[rows])
+    assert [shots[i] for i in ids] == list(index_shots)
+    clear = index_passes.reshape(len(ids), len(ids))
+    assert all(passes[ids[a], ids[b]] == clear[a, b]
+               for a in range(len(ids)) for b in range(len(ids)) if a != b)
+
+    number = 500
+    for label, stmt in [("python loops", lambda: loop_queries(game_state)),
+                        ("SpatialIndex", lambda: index_queries(game_state))]:
+        best = min(timeit.repeat(stmt, number=number, repeat=5)) / number
+        print(f"{label:<14} {best * 1e6:8.1f} us per frame (11v11, "
+              f"{len(ids)} nearest, {len(ids)} shot lanes, {len(ids) ** 2} pass lanes)")
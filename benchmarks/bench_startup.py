@@ -0,0 +1,105 @@
+"""
+Benchmark for startup time and memory per environment.
+
+Runs the main program on short recorded matches, once per mode, and reports
+the best wall time from launch until it exits at the end of the log, the peak
+resident memory and the modules it imported. Replays need no server, vision
+feed or robots, so only the imports and initialization of each mode are
+measured:
+    - sim-only: a simulator log
+    - field-practice: an SSL vision log
+    - sim-only --executor process: a simulator log with worker processes
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_parse import make_see_global
+from networking.recording import MatchRecorder
+
+# Modules that only some modes need
+OPTIONAL_MODULES = ["sslclient", "google.protobuf", "asyncio", "multiprocessing"]
+
+
+def write_camera_log(path: str, n_frames: int):
+    """Write a log of SSL vision packets from a single camera."""
+    from sslclient.messages_robocup_ssl_wrapper_pb2 import SSL_WrapperPacket
+    recorder = MatchRecorder(path, "camera")
+    for frame_number in range(n_frames):
+        packet = SSL_WrapperPacket()
+        detection = packet.detection
+        detection.frame_number = frame_number
+        detection.t_capture = detection.t_sent = frame_number * 0.016
+        detection.camera_id = 0
+        ball = detection.balls.add()
+        ball.confidence, ball.x, ball.y, ball.pixel_x, ball.pixel_y = 0.9, 10.0, 20.0, 0, 0
+        for robot_id in range(6):
+            robot = detection.robots_yellow.add()
+            robot.confidence, robot.robot_id = 0.9, robot_id
+            robot.x, robot.y, robot.orientation = robot_id * 100.0, 0.0, 0.0
+            robot.pixel_x = robot.pixel_y = 0
+        recorder.record(packet.SerializeToString(), frame_number * 0.016)
+    recorder.close()
+
+
+def write_sim_log(path: str, n_frames: int):
+    """Write a log of simulator see_global messages."""
+    recorder = MatchRecorder(path, "simulator")
+    for count in range(n_frames):
+        recorder.record(make_see_global(count, 6), count * 0.1)
+    recorder.close()
+
+
+def run(args: list[str]) -> tuple[float, int, set]:
+    """
+    Run the main program once.
+
+    Returns:
+        Tuple of (wall seconds, peak RSS in KiB, imported module names)
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "__main__.py", *args],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read().decode()
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise Exception(f"{args} failed:\n{stderr[-2000:]}")
+    modules = {line.split("|")[-1].strip() for line in stderr.splitlines()
+               if line.startswith("import time:") and not line.endswith("package")}
+    return elapsed, usage.ru_maxrss, modules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sim_log = os.path.join(directory, "sim.log")
+        camera_log = os.path.join(directory, "camera.log")
+        write_sim_log(sim_log, 3)
+        write_camera_log(camera_log, 3)
+
+        modes = [
+            ("sim-only", ["--env", "sim-only", "--replay", sim_log]),
+            ("field-practice", ["--env", "field-practice", "--replay", camera_log]),
+            ("sim-only process", ["--env", "sim-only", "--replay", sim_log,
+                                  "--executor", "process"]),
+        ]
+        for label, mode_args in modes:
+            results = [run([*mode_args, "--replay-speed", "0"]) for _ in range(args.runs)]
+            wall = min(result[0] for result in results)
+            rss = statistics.median(result[1] for result in results)
+            modules = results[0][2]
+            loaded = [name for name in OPTIONAL_MODULES if name in modules]
+            print(f"{label:<17} {wall * 1e3:6.0f} ms, {rss / 1024:5.1f} MiB peak RSS, "
+                  f"{len(modules):4d} modules, optional: {', '.join(loaded) or 'none'}")
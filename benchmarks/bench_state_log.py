@@ -0,0 +1,64 @@
+"""
+Benchmark for game state logging.
+
+Compares the time the control loop spends per 11v11 frame printing the
+whole game state, as the main loop used to, with handing it to
+GameStateLogger at several sampling settings, and reports the cost of
+formatting a line in the writer thread. All output goes to
+/dev/null. Then logs a burst of frames much faster than the writer drains
+them into a small buffer and reports how many were dropped.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_state_log [--frames N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.bench_tracking import make_frames
+from networking.state_log import GameStateLogger, format_game_state
+
+
+def per_frame(frames: list, log) -> float:
+    """Mean microseconds per call of log on every frame."""
+    start = time.perf_counter()
+    for frame in frames:
+        log(frame)
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    frames, _, _, _ = make_frames(args.frames, 11, noise=0.01)
+    # Every other frame repeats its predecessor, as when the ball is dead
+    repeated = [frames[i - i % 2]._replace(count=i) for i in range(args.frames)]
+
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        printed = per_frame(frames, lambda frame: print("Current Game State:", frame))
+        sys.stdout = stdout
+    print(f"print every frame          {printed:7.1f} us/frame")
+
+    formatted = per_frame(frames, format_game_state)
+    print(f"formatting a log line      {formatted:7.1f} us/frame, in the writer thread")
+
+    for label, every, on_change, inputs in [
+        ("logger, every frame", 1, False, frames),
+        ("logger, every 10th frame", 10, False, frames),
+        ("logger, on change", 1, True, repeated),
+    ]:
+        logger = GameStateLogger(os.devnull, every, on_change)
+        elapsed = per_frame(inputs, logger.log)
+        logger.close()
+        print(f"{label:<26} {elapsed:7.1f} us/frame in the loop, "
+              f"{logger.written}/{len(inputs)} written")
+
+    logger = GameStateLogger(os.devnull, capacity=64)
+    per_frame(frames, logger.log)
+    logger.close()
+    print(f"burst of {len(frames)} into 64 slots: {logger.report()}", end="")
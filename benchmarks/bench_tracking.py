@@ -0,0 +1,67 @@
+"""
+Benchmark for the state tracker.
+
+Feeds synthetic 11v11 frames of robots and a ball moving at constant
+velocity with measurement noise through StateTracker, and reports the time
+per frame along with the velocity and prediction errors.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_tracking [--frames N] [--noise M]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_parse import TEAM_NAMES
+from networking.data_utils import GameState, MAX_ROBOTS, SIM_TIMESTEP
+from networking.tracking import StateTracker
+
+
+def make_frames(n_frames: int, n_players: int, noise: float, seed: int = 0):
+    """Noisy frames of constant-velocity robots and ball, with their true velocities."""
+    rng = np.random.default_rng(seed)
+    n_teams = len(TEAM_NAMES)
+    start = rng.uniform(-30, 30, (n_teams, MAX_ROBOTS, 2))
+    velocity = rng.uniform(-1, 1, (n_teams, MAX_ROBOTS, 2))
+    ball_start, ball_velocity = np.array([0.0, 0.0]), np.array([2.0, -1.0])
+    valid = np.zeros((n_teams, MAX_ROBOTS), dtype=bool)
+    valid[:, 1:n_players + 1] = True
+
+    frames = []
+    for count in range(n_frames):
+        t = count * SIM_TIMESTEP
+        poses = np.zeros((n_teams, MAX_ROBOTS, 3))
+        poses[..., :2] = start + velocity * t + rng.normal(0, noise, start.shape)
+        ball = ball_start + ball_velocity * t + rng.normal(0, noise, 2)
+        frames.append(GameState(count, t, ball, poses, valid, TEAM_NAMES))
+    return frames, velocity, ball_velocity, start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=0.01,
+                        help="measurement noise in meters")
+    args = parser.parse_args()
+
+    frames, velocity, ball_velocity, start = make_frames(args.frames, 11, args.noise)
+    valid = frames[0].valid
+    tracker = StateTracker(TEAM_NAMES, lookahead=SIM_TIMESTEP)
+    begin = time.perf_counter()
+    for frame in frames:
+        tracked = tracker.update(frame, now=frame.timestamp)
+    elapsed = time.perf_counter() - begin
+
+    t = frames[-1].timestamp + SIM_TIMESTEP
+    velocity_error = np.linalg.norm(tracked.velocities - velocity, axis=-1)[valid]
+    position_error = np.linalg.norm(tracked.poses[..., :2] - (start + velocity * t), axis=-1)[valid]
+    raw_error = np.linalg.norm(frames[-1].poses[..., :2] - (start + velocity * t), axis=-1)[valid]
+    print(f"robot velocity error      mean {velocity_error.mean():.3f} m/s, "
+          f"max {velocity_error.max():.3f} m/s")
+    print(f"ball velocity error       {np.linalg.norm(tracked.ball_velocity - ball_velocity):.3f} m/s")
+    print(f"position error at t+step  predicted {position_error.mean() * 100:.2f} cm, "
+          f"unfiltered frame {raw_error.mean() * 100:.2f} cm")
+    print(f"update + predict          {elapsed / len(frames) * 1e6:.1f} us per frame "
+          f"({int(valid.sum())} robots and the ball)")
@@ -0,0 +1,167 @@
+"""
+asyncio-based networking for the soccer AI system.
+
+This module attaches the sockets opened by Listener and Commander to a single
+asyncio event loop, so game states are received and commands are sent without
+blocking receives or a thread per send.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from .data_utils import GameState
+from .recording import MatchRecorder
+from .socket_utils import Listener, Commander
+
+
+class GameStateProtocol(asyncio.DatagramProtocol):
+    """Queues datagrams arriving from the game state source."""
+    def __init__(self, source_addr: tuple | None = None,
+                 recorder: MatchRecorder | None = None):
+        """
+        Initialize the protocol.
+
+        Args:
+            source_addr: Only accept datagrams from this address, or from
+                anywhere if None
+            recorder: Match recorder to append every accepted datagram to
+        """
+        self.source_addr = source_addr
+        self.recorder = recorder
+        self.queue = asyncio.Queue()
+
+    def datagram_received(self, data: bytes, addr: tuple):
+        if self.source_addr is None or addr == self.source_addr:
+            if self.recorder is not None:
+                self.recorder.record(data)
+            self.queue.put_nowait(data)
+
+    def error_received(self, exc: Exception):
+        print(f"Error receiving game state: {exc}")
+
+
+class CommandProtocol(asyncio.DatagramProtocol):
+    """
+    Endpoint for sockets that only send commands.
+
+    The simulator keeps sending sensor messages to every player client; they
+    are drained and discarded here instead of piling up in the socket buffer.
+    """
+    def datagram_received(self, data: bytes, addr: tuple):
+        pass
+
+    def error_received(self, exc: Exception):
+        print(f"Error on command socket: {exc}")
+
+
+async def _open_endpoint(sock, protocol: asyncio.DatagramProtocol):
+    """
+    Attach a duplicate of an already configured socket to the running loop.
+
+    The original socket stays usable for the blocking disconnect handshake
+    after the transport has been closed.
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: protocol, sock=sock.dup())
+    return transport
+
+
+class AsyncListener:
+    """Async iterator of game states received by a Listener."""
+    def __init__(self, listener: Listener):
+        """
+        Initialize the async listener.
+
+        Args:
+            listener: Connected listener whose socket will be watched
+        """
+        self.listener = listener
+        self.transport = None
+        self.protocol = None
+        self.frames_skipped = 0    # superseded before they were parsed
+
+    async def open(self):
+        """Attach the listener socket to the running event loop."""
+        source_addr = self.listener.addr if self.listener.source == "simulator" else None
+        self.protocol = GameStateProtocol(source_addr, self.listener.recorder)
+        self.transport = await _open_endpoint(self.listener.game_socket, self.protocol)
+
+    def __aiter__(self) -> AsyncIterator[GameState]:
+        return self
+
+    async def __anext__(self) -> GameState:
+        queue = self.protocol.queue
+        while True:
+            # Latest frame wins: skip datagrams that newer ones superseded
+            data = await queue.get()
+            profiler = self.listener.profiler
+            received_ns = profiler.clock() if profiler is not None else 0
+            while not queue.empty():
+                self.listener.supersede(data)
+                data = queue.get_nowait()
+                self.frames_skipped += 1
+            game_state = self.listener.deserialize_timed(data, received_ns)
+            if game_state is not None:
+                return game_state
+
+    def close(self):
+        """Detach from the event loop."""
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+class AsyncCommander:
+    """Sends commands through a Commander's sockets without blocking."""
+    def __init__(self, commander: Commander):
+        """
+        Initialize the async commander.
+
+        Args:
+            commander: Commander whose client and multicast sockets will be used
+        """
+        self.commander = commander
+        self.sim_transports = {}
+        self.robot_transports = {}
+
+    async def open(self):
+        """Attach every simulator client and robot multicast socket to the loop."""
+        for teamname, clients in getattr(self.commander, "sim_clients", {}).items():
+            self.sim_transports[teamname] = [
+                await _open_endpoint(client.sock, CommandProtocol())
+                for client in clients
+            ]
+        for teamname, sock in self.commander.socks.items():
+            self.robot_transports[teamname] = await _open_endpoint(sock, CommandProtocol())
+
+    def send_to_sim(self, teamname: str, commands: list[bytes]):
+        """
+        Queue commands for simulated robots.
+
+        Args:
+            teamname: Name of team to send commands to
+            commands: List of command bytes for each robot
+        """
+        clients = self.commander.sim_clients[teamname]
+        for client, transport, command in zip(clients, self.sim_transports[teamname], commands):
+            if command is not None:
+                transport.sendto(command, client.addr)
+
+    def send_to_robots(self, teamname: str, command: bytes):
+        """
+        Queue a command datagram for physical robots.
+
+        Args:
+            teamname: Name of team to send commands to
+            command: Command bytes to send
+        """
+        self.robot_transports[teamname].sendto(command, self.commander.addrs[teamname])
+
+    def close(self):
+        """Detach all command sockets from the event loop."""
+        for transports in self.sim_transports.values():
+            for transport in transports:
+                transport.close()
+        for transport in self.robot_transports.values():
+            transport.close()
+        self.sim_transports, self.robot_transports = {}, {}
@@ -0,0 +1,50 @@
+"""
+Environment backends and their lazily loaded dependencies.
+
+Each --env value uses only some of the backends: the simulator (game states
+from rcssserver and commands to its player clients), the SSL camera (game
+states from SSL vision) and the robots (commands multicast to physical
+robots). Backends are looked up here instead of comparing environment names
+throughout the networking layer, and the SSL vision client with its protobuf
+messages is imported only when a camera backend is actually created, so the
+simulator modes never load them.
+"""
+
+# Backends used by each environment
+ENVIRONMENT_BACKENDS = {
+    "sim-only": ("simulator",),
+    "sim-mixed": ("simulator", "robots"),
+    "field-practice": ("camera", "robots"),
+    "field-tournament": ("camera", "robots"),
+}
+
+
+def uses(environment: str, backend: str) -> bool:
+    """
+    Whether an environment uses a backend.
+
+    Args:
+        environment: Environment name, one of ENVIRONMENT_BACKENDS
+        backend: "simulator", "camera" or "robots"
+
+    Returns:
+        True if the environment uses the backend
+
+    Raises:
+        Exception: If the environment is unknown
+    """
+    if environment not in ENVIRONMENT_BACKENDS:
+        raise Exception(f"Unknown environment: {environment}")
+    return backend in ENVIRONMENT_BACKENDS[environment]
+
+
+def load_ssl_vision():
+    """
+    Import the SSL vision client on first use.
+
+    Returns:
+        Tuple of (sslclient module, SSL_WrapperPacket message class)
+    """
+    import sslclient
+    from sslclient.messages_robocup_ssl_wrapper_pb2 import SSL_WrapperPacket
+    return sslclient, SSL_WrapperPacket
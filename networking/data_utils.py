@@ -9,24 +9,218 @@ import re
 import time
 import math
 from collections import namedtuple
+from itertools import chain
+
+import numpy as np
+
+from .robot_protocol import encode_robot_packet
 
 SIM_TIMESTEP = 0.1    # seconds
-# Matches "(see_global <digits> <content>)" to capture
-# server cycle number and remaining data until " ((b"
-SIM_COUNT_REGEX = r"\(see_global (\d+) (.*?)(?=\s\(\(b)"
-# Matches " ((b) <data>)" and captures ball position data between 
-# ((b) and  " ((p" markers
-SIM_BALL_POS_REGEX = r"\s\(\(b\) (.*?)(?=\s\(\(p)"
-# Matches " ((p "<team>" <uniform_num>) <pose_data>)" capturing team name, 
-# uniform number (1-11), and pose coordinates
-SIM_ROBOT_POSE_REGEX = r"\s\(\(p \"(\w*)\" (1[0-1]|[1-9])\) ([^\)]+)\)"
-
-GameState = namedtuple(
-    "GameState", ["count", "timestamp", "ball_pos", "robot_poses"]
+# Command kinds of a CommandBatch. DONE and FAILED send no command.
+DONE, FAILED, DASH, TURN, KICK, MOVE = range(6)
+COMMAND_KINDS = {"done": DONE, "failed": FAILED, "dash": DASH,
+                 "turn": TURN, "kick": KICK, "move": MOVE}
+# Simulator command templates by kind. Arguments are formatted with 6
+# significant digits, which is below the noise of both simulator and robots.
+SIM_COMMAND_FORMATS = {
+    DASH: b"(dash %.6g %.6g)\0",
+    TURN: b"(turn %.6g)\0",
+    KICK: b"(kick %.6g %.6g)\0",
+    MOVE: b"(move %.6g %.6g)\0",
+}
+# Robot command line templates by kind, same arguments as the simulator
+ROBOT_COMMAND_FORMATS = {
+    DASH: b"dash %.6g %.6g\n",
+    TURN: b"turn %.6g\n",
+    KICK: b"kick %.6g %.6g\n",
+    MOVE: b"move %.6g %.6g\n",
+}
+# Cameras that sent nothing for this long are no longer waited for when fusing
+CAMERA_TIMEOUT = 0.2    # seconds
+# Robot slots per team, indexed by robot id: uniform numbers 1-11 in the
+# simulator, pattern ids 0-15 on the SSL vision camera
+MAX_ROBOTS = 16
+# Matches "(see_global <digits> " to capture the server cycle number. The
+# simulator patterns are bytes patterns, so datagrams are parsed straight
+# from the receive buffer without decoding.
+SIM_COUNT_REGEX = re.compile(rb"\(see_global (\d+) ")
+# Matches either a ball " ((b) <x> <y> ...)" or a player
+# " ((p "<team>" <uniform_num>[ goalie]) <x> <y> <vx> <vy> <body> ...)",
+# capturing ball position, or team name, uniform number, position and body angle
+SIM_OBJECT_REGEX = re.compile(
+    rb"\(\((?:b\) ([^\s)]+) ([^\s)]+)"
+    rb"|p \"(\w*)\" (\d+)(?: goalie)?\) "
+    rb"([^\s)]+) ([^\s)]+) [^\s)]+ [^\s)]+ ([^\s)]+))"
 )
 
+
+class GameState(namedtuple(
+    "GameState",
+    ["count", "timestamp", "ball", "poses", "valid", "team_names",
+     "ball_velocity", "velocities"],
+    defaults=(None, None)
+)):
+    """
+    Snapshot of the game at one server cycle or fused camera frame.
+
+    Robot data is stored in fixed-shape arrays so strategies can work on all
+    robots at once:
+
+    - ``ball``: (2,) array with the ball (x, y), NaN when the ball is not seen
+    - ``poses``: (n_teams, MAX_ROBOTS, 3) array of (x, y, theta) poses,
+      indexed by team (order of ``team_names``) and robot id
+    - ``valid``: (n_teams, MAX_ROBOTS) mask of robots present in the frame
+    - ``ball_velocity``, ``velocities``: (2,) and (n_teams, MAX_ROBOTS, 2)
+      arrays of (vx, vy) per second, or None unless the state went through
+      the StateTracker
+    """
+    __slots__ = ()
+
+    @property
+    def ball_pos(self) -> tuple:
+        """Ball position as an (x, y) tuple, or None if the ball is not seen."""
+        x, y = self.ball.tolist()
+        if math.isnan(x):
+            return None
+        return (x, y)
+
+    @property
+    def robot_poses(self) -> dict[str, list]:
+        """
+        Robot poses in the legacy format, kept for older strategies.
+
+        Returns:
+            Dictionary mapping team names to lists of {robot_id: pose} dicts
+        """
+        robot_poses = {}
+        for teamname, poses, valid in zip(self.team_names, self.poses.tolist(),
+                                          self.valid.tolist()):
+            robot_poses[teamname] = [{i: tuple(pose)}
+                                     for i, pose in enumerate(poses) if valid[i]]
+        return robot_poses
+
+    def team_index(self, teamname: str) -> int:
+        """Return the row of ``poses`` and ``valid`` holding the given team."""
+        return self.team_names.index(teamname)
+
+    def team_robots(self, teamname: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the robots of one team that are present in the frame.
+
+        Args:
+            teamname: Name of the team
+
+        Returns:
+            Tuple of (robot_ids, poses) with shapes (N,) and (N, 3)
+        """
+        team = self.team_index(teamname)
+        ids = np.flatnonzero(self.valid[team])
+        return ids, self.poses[team, ids]
+
+
 TeamInfo = namedtuple("TeamInfo", ["name", "n_players"])
 
+class CommandBatch(namedtuple("CommandBatch", ["codes", "args"])):
+    """
+    Commands for a whole team, one row per robot in team order.
+
+    - ``codes``: (N,) array of command kinds out of DONE, FAILED, DASH,
+      TURN, KICK and MOVE
+    - ``args``: (N, 2) float array of command arguments, in the units of the
+      command strings: power and direction (rad/s) for DASH, angle (rad/s) in
+      the first column for TURN, power and direction for KICK, and x and y
+      for MOVE
+
+    The rad/s conversion is applied on the way out: Serializer scales DASH
+    directions and TURN angles by degrees(SIM_TIMESTEP) into the degrees the
+    simulator expects. Until then they are plain numbers, and
+    basic_commands, PathPlanner and ForwardModel treat them as degrees.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def empty(cls, n: int) -> "CommandBatch":
+        """Batch of n robots that send no command."""
+        return cls(np.full(n, DONE), np.zeros((n, 2)))
+
+    @classmethod
+    def from_strings(cls, actions: list[str]) -> "CommandBatch":
+        """
+        Parse command strings such as "dash 100 0" into a batch.
+
+        Args:
+            actions: Command strings, None for robots without a command
+
+        Returns:
+            Batch with one row per command string
+        """
+        batch = cls.empty(len(actions))
+        for i, action in enumerate(actions):
+            if action is None:
+                continue
+            name, *args = action.split()
+            batch.codes[i] = COMMAND_KINDS.get(name, DONE)
+            batch.args[i, :len(args)] = [float(arg) for arg in args[:2]]
+        return batch
+
+
+class CameraFusion:
+    """
+    Groups SSL vision detection frames from several cameras into fused frames.
+
+    Each camera sees part of the field, so a fused frame holds the newest
+    detection frame of every camera. It is complete once every active camera
+    has reported, or when a camera reports again before the others did.
+    Cameras that have been silent for CAMERA_TIMEOUT are no longer waited for.
+    """
+    def __init__(self, timeout: float = CAMERA_TIMEOUT):
+        """
+        Initialize frame fusion.
+
+        Args:
+            timeout: Seconds of capture time after which a silent camera is
+                considered gone
+        """
+        self.timeout = timeout
+        self.frames = {}    # camera_id -> detection frame of the pending fused frame
+        self.last_capture = {}    # camera_id -> t_capture of its newest frame
+        self.n_fused = 0
+
+    def add(self, detection) -> list | None:
+        """
+        Add one camera's detection frame.
+
+        Args:
+            detection: SSL_DetectionFrame of one camera
+
+        Returns:
+            Detection frames of the fused frame this completed, or None if
+            the fused frame is still waiting for other cameras
+        """
+        camera = detection.camera_id
+        completed = None
+        if camera in self.frames:
+            # The camera is a frame ahead of the others: emit what we have
+            completed = list(self.frames.values())
+            self.frames.clear()
+        self.frames[camera] = detection
+
+        newest = detection.t_capture
+        self.last_capture[camera] = newest
+        for other, t_capture in list(self.last_capture.items()):
+            if newest - t_capture > self.timeout:
+                del self.last_capture[other]
+                self.frames.pop(other, None)
+
+        if len(self.frames) >= len(self.last_capture):
+            # Newer than a fused frame completed by a repeat, if any
+            completed = list(self.frames.values())
+            self.frames.clear()
+        if completed is not None:
+            self.n_fused += 1
+        return completed
+
+
 class Deserializer:
     """Deserializes game data from various sources into GameState objects."""
     def __init__(self, team_infos: list[TeamInfo]):
@@ -36,110 +230,135 @@ class Deserializer:
         Args:
             team_infos: List of team information including names and player counts
         """
-        self.team_names = [team_info.name for team_info in team_infos]
+        self.team_names = tuple(team_info.name for team_info in team_infos)
+        self.team_index = {name: i for i, name in enumerate(self.team_names)}
+        # Team names as they appear in simulator messages
+        self._team_keys = {name.encode(): i for name, i in self.team_index.items()}
+
+        # Preallocated arrays filled in place by sim_parse. Values are staged
+        # in flat Python lists first, since one bulk copy into an array is
+        # much cheaper than a NumPy scalar assignment per value.
+        n_teams = len(self.team_names)
+        self.ball = np.full(2, np.nan)
+        self.poses = np.zeros((n_teams, MAX_ROBOTS, 3))
+        self.valid = np.zeros((n_teams, MAX_ROBOTS), dtype=bool)
+        self._pose_buffer = [0.0] * self.poses.size
+        self._n_slots = self.valid.size
+        self._ball_buffer = [np.nan, np.nan]
+        self._valid_buffer = [False] * self.valid.size
+        self._no_slots = (False,) * self.valid.size
+        self.fusion = CameraFusion()
+        # Stamp simulator frames with their simulated time, count * SIM_TIMESTEP,
+        # instead of the arrival time, for servers not running in real time
+        self.sim_time = False
+
+    def _game_state(self, count: int, timestamp: float) -> GameState:
+        """Snapshot the parse arrays into a new GameState."""
+        return GameState(count, timestamp, self.ball.copy(), self.poses.copy(),
+                         self.valid.copy(), self.team_names)
 
-    def sim_deserialize(self, data: bytes) -> GameState:
+    def sim_deserialize(self, data: bytes | memoryview) -> GameState:
         """
         Parse simulator data into a GameState object.
         
         Args:
-            data: Raw bytes from simulator
+            data: Raw bytes from simulator, or a view of the receive buffer
             
         Returns:
             Parsed GameState or None if parsing fails
         """
-        message = data.decode()
-        
-        # count (server cycle number)
-        if m := re.match(SIM_COUNT_REGEX, message):
-            count = int(m.group(1))
-            message = message[m.end():]
-        else:
+        count = self.sim_parse(data)
+        if count is None or np.isnan(self.ball[0]):
             return None
+        timestamp = count * SIM_TIMESTEP if self.sim_time else time.time()
+        return self._game_state(count, timestamp)
 
-        # timestamp
-        timestamp = time.time()
-
-        # ball position
-        if result := self.sim_get_ball_pos(message):
-            message, ball_pos = result
-        else:
-            return None
-
-        # robot poses
-        robot_poses = self.sim_get_robot_poses(message)
-        if robot_poses is None:
-            return None
-
-        return GameState(count, timestamp, ball_pos, robot_poses)
-
-    def sim_get_ball_pos(self, message: str) -> tuple:
+    def sim_parse(self, message: bytes | memoryview) -> int:
         """
-        Extract ball position from simulator message.
+        Parse a see_global message in a single pass into the preallocated
+        ``ball``, ``poses`` and ``valid`` arrays.
+
+        Player rows are indexed by team (order of ``team_names``) and by
+        uniform number. Players of unknown teams are ignored. The message is
+        matched as bytes, so a receive buffer can be parsed in place without
+        decoding or copying it.
         
         Args:
-            message: Simulator message string
+            message: Simulator message bytes or a view of them
             
         Returns:
-            Tuple of (remaining_message, ball_position) or None
+            Server cycle number, or None if the message is not a see_global
         """
-        if m := re.search(SIM_BALL_POS_REGEX, message):
-            description = m.group(1).split()
-            ball_pos = tuple(map(float, description[:2]))
-            return message[m.end():], ball_pos
-        return None
+        if not (m := SIM_COUNT_REGEX.match(message)):
+            return None
+        count = int(m.group(1))
 
-    def sim_get_robot_poses(self, message: str) -> dict[str, list]:
-        """
-        Extract robot poses from simulator message.
-        
-        Args:
-            message: Simulator message string
-            
-        Returns:
-            Dictionary mapping team names to lists of robot poses
-        """
-        robot_poses = {teamname: [] for teamname in self.team_names}
-        while m := re.match(SIM_ROBOT_POSE_REGEX, message):
-            teamname = m.group(1)
-            unum = int(m.group(2))
-            description = m.group(3).split()
-            pose = tuple(float(description[i]) for i in [0, 1, 4])
-            robot_poses[teamname].append({unum: pose})
-            message = message[m.end():]
-        
-        return robot_poses
+        ball = self._ball_buffer
+        ball[0] = ball[1] = np.nan
+        valid = self._valid_buffer
+        valid[:] = self._no_slots
+        poses = self._pose_buffer
+        team_index = self._team_keys
+        for bx, by, teamname, unum, x, y, body in \
+                SIM_OBJECT_REGEX.findall(message, m.end()):
+            if bx:
+                ball[0] = float(bx)
+                ball[1] = float(by)
+                continue
+
+            team = team_index.get(teamname)
+            i = int(unum)
+            if team is None or i >= MAX_ROBOTS:
+                continue
+            slot = team * MAX_ROBOTS + i
+            valid[slot] = True
+            slot *= 3
+            poses[slot] = float(x)
+            poses[slot + 1] = float(y)
+            poses[slot + 2] = float(body)
+
+        self.ball[:] = ball
+        self.poses.reshape(-1)[:] = poses
+        self.valid.reshape(-1)[:] = valid
+        return count
 
     def cam_deserialize(self, data) -> GameState:
         """
-        Parse camera detection data into a GameState object.
+        Merge one camera's detection data into the pending fused frame and
+        parse the fused frame into a GameState once it is complete.
+
+        Overlapping detections of the same robot or ball by several cameras
+        are deduplicated by keeping the most confident one.
         
         Args:
             data: Camera detection data containing frame info, balls, and robots
             
         Returns:
-            Parsed GameState or None if parsing fails
+            GameState of a completed fused frame, or None if the fused frame
+            is waiting for other cameras or parsing fails
         """
         try:
-            count = data.frame_number    # camera frame number
-            timestamp = data.t_sent    # time when camera detection was sent
-            ball_pos = self.cam_get_ball_pos(data.balls)
-            robot_data = (data.robots_yellow, data.robots_blue)
-            robot_poses = self.cam_get_robot_poses(robot_data)
-            return GameState(count, timestamp, ball_pos, robot_poses)
+            frames = self.fusion.add(data)
+            if frames is None:
+                return None
+            count = self.fusion.n_fused    # fused frame number
+            # time when the last camera detection was sent
+            timestamp = max(frame.t_sent for frame in frames)
+            self.cam_parse_ball(chain.from_iterable(frame.balls for frame in frames))
+            self.cam_parse_robots(
+                [(frame.robots_yellow, frame.robots_blue) for frame in frames])
+            return self._game_state(count, timestamp)
         except Exception as e:
             print(f"Error deserializing camera data: {e}")
         return None
 
-    def cam_get_ball_pos(self, ball_data) -> tuple:
+    def cam_parse_ball(self, ball_data):
         """
-        Extract ball position from camera detection data.
+        Write the highest confidence ball detection into ``ball``.
         
         Args:
-            ball_data: List of detected ball objects with confidence and position
-            
-        Returns:
-            Tuple of (x, y) position of highest confidence ball, or None if no balls
+            ball_data: Iterable of detected ball objects with confidence and
+                position, from any number of cameras
         """
         highest_confident_ball = None
         highest_confidence = 0.0
@@ -150,34 +369,54 @@ class Deserializer:
                 highest_confident_ball = ball
 
         if highest_confident_ball is not None:
-            return (highest_confident_ball.x, highest_confident_ball.y)
-        return None
+            self.ball[:] = (highest_confident_ball.x, highest_confident_ball.y)
+        else:
+            self.ball.fill(np.nan)
 
-    def cam_get_robot_poses(self, robot_data) -> dict[str, list]:
+    def cam_parse_robots(self, robot_data):
         """
-        Extract robot poses from camera detection data.
+        Write camera robot detections into ``poses`` and ``valid``, keeping
+        the most confident detection of robots seen by several cameras.
         
         Args:
-            robot_data: Tuple of (yellow_robots, blue_robots) detection data
-            
-        Returns:
-            Dictionary mapping team names to lists of robot poses with IDs
-        """
-        robot_poses = {teamname: [] for teamname in self.team_names}
-        for team_robots, teamname in zip(robot_data, self.team_names):
-            for robot in team_robots:
-                pattern_id = robot.robot_id
-                theta = robot.orientation
-                # Convert camera radians [-π, π] to simulator degrees [-180, 180]
-                # Camera and simulator have 180° reference difference, 
-                # both use clockwise direction
-                orientation = math.degrees(theta) + 180
-                # Normalize to [-180, 180] range
-                if orientation > 180:
-                    orientation -= 360
-                pose = (robot.x, robot.y, orientation)
-                robot_poses[teamname].append({pattern_id: pose})
-        return robot_poses
+            robot_data: List of (yellow_robots, blue_robots) detection data,
+                one per camera
+        """
+        valid = [False] * self._n_slots
+        confidences = [0.0] * self._n_slots
+        poses = self._pose_buffer
+        n_teams = len(self.team_names)
+        for camera_robots in robot_data:
+            for team, team_robots in enumerate(camera_robots[:n_teams]):
+                for robot in team_robots:
+                    pattern_id = robot.robot_id
+                    if pattern_id >= MAX_ROBOTS:
+                        continue
+                    slot = team * MAX_ROBOTS + pattern_id
+                    if valid[slot] and robot.confidence <= confidences[slot]:
+                        continue
+                    valid[slot] = True
+                    confidences[slot] = robot.confidence
+                    self._cam_write_pose(slot, robot)
+
+        self.poses.reshape(-1)[:] = poses
+        self.valid.reshape(-1)[:] = valid
+
+    def _cam_write_pose(self, slot: int, robot):
+        """Stage one camera robot detection into the pose buffer."""
+        theta = robot.orientation
+        # Convert camera radians [-π, π] to simulator degrees [-180, 180]
+        # Camera and simulator have 180° reference difference, 
+        # both use clockwise direction
+        orientation = math.degrees(theta) + 180
+        # Normalize to [-180, 180] range
+        if orientation > 180:
+            orientation -= 360
+        slot *= 3
+        poses = self._pose_buffer
+        poses[slot] = robot.x
+        poses[slot + 1] = robot.y
+        poses[slot + 2] = orientation
 
 
 class Serializer:
@@ -209,11 +448,14 @@ class Serializer:
         Serialize actions for simulator communication.
         
         Args:
-            actions: List of action strings
+            actions: CommandBatch, or list of action strings
             
         Returns:
-            List of serialized command bytes
+            List of serialized command bytes, None for robots without a command
         """
+        if isinstance(actions, CommandBatch):
+            return self._sim_serialize_batch(actions)
+
         messages = [None] * len(actions)
         for i, action in enumerate(actions):
             if action is None:
@@ -228,16 +470,47 @@ class Serializer:
             messages[i] = b"(" + action.encode() + b")\0"
         return messages
 
+    def _sim_serialize_batch(self, batch: CommandBatch) -> list[bytes]:
+        """Encode a CommandBatch for the simulator in one pass, without parsing."""
+        # rad/s to degrees per simulator step
+        scale = math.degrees(SIM_TIMESTEP)
+        formats = SIM_COMMAND_FORMATS
+        messages = []
+        for code, (a, b) in zip(np.asarray(batch.codes).tolist(),
+                                np.asarray(batch.args, dtype=float).tolist()):
+            if code == DASH:
+                messages.append(formats[DASH] % (a, (b * scale + 180) % 360 - 180))
+            elif code == TURN:
+                messages.append(formats[TURN] % ((a * scale + 180) % 360 - 180))
+            elif code in formats:
+                messages.append(formats[code] % (a, b))
+            else:
+                messages.append(None)
+        return messages
+
     def robot_serialize(self, actions) -> bytes:
         """
         Serialize actions for robot communication.
         
         Args:
-            actions: List of action strings
+            actions: CommandBatch, or list of action strings
             
         Returns:
             Serialized command bytes for robot transmission
         """
+        if isinstance(actions, CommandBatch):
+            formats = ROBOT_COMMAND_FORMATS
+            lines = []
+            for code, (a, b) in zip(np.asarray(actions.codes).tolist(),
+                                    np.asarray(actions.args, dtype=float).tolist()):
+                if code == TURN:
+                    lines.append(formats[TURN] % a)
+                elif code in formats:
+                    lines.append(formats[code] % (a, b))
+                else:
+                    lines.append(b"None\n")
+            return b"".join(lines)
+
         message = ""
         for action in actions:
             if action is None:
@@ -247,3 +520,19 @@ class Serializer:
         
         return message.encode()
 
+    def robot_serialize_binary(self, actions, sequence: int, count: int) -> bytes:
+        """
+        Serialize actions as a binary robot packet (see robot_protocol.py).
+        
+        Args:
+            actions: CommandBatch, or list of action strings
+            sequence: Packet sequence number of the team
+            count: GameState.count the commands were decided on
+            
+        Returns:
+            Packet bytes for robot transmission
+        """
+        if not isinstance(actions, CommandBatch):
+            actions = CommandBatch.from_strings(actions)
+        return encode_robot_packet(actions.codes, actions.args, sequence, count)
+
@@ -0,0 +1,419 @@
+"""
+Pure-Python stand-in for the RoboCup Soccer Simulation Server.
+
+FakeServer speaks the subset of the rcssserver UDP protocol that Listener and
+Client use: player init/move/turn/dash/kick/bye on the client port and
+init/eye on/change_mode/bye on the trainer port. Every cycle it sends
+sense_body to each player and see_global to the trainer, at a configurable
+cycle length and team size, and it records when each player command arrives.
+The ball stops at the touch and goal lines, and crossing the goal line
+between the posts scores a goal and puts the ball back on the center spot.
+It exists for load and latency testing without a real server:
+
+    python -m networking.fake_server --step 0.01 --players 11
+
+With --synch it mimics rcssserver's synch_mode: once players send (done),
+a cycle ends as soon as every one of them has sent (done) for it, so the
+match runs as fast as its clients decide.
+"""
+
+import argparse
+import math
+import re
+import selectors
+import socket
+import threading
+import time
+from collections import deque, namedtuple
+
+from .data_utils import SIM_TIMESTEP
+from .socket_utils import LOCALHOST_IP, SIM_CLIENT_ADDR, SIM_TRAINER_ADDR
+
+# Matches a player "(init <team> (version <v>))" and captures the team name
+PLAYER_INIT_REGEX = re.compile(rb"\(init (\w+)(?: \(version [\d.]+\))?(?: \(goalie\))?\)")
+# Matches a player command "(<name> <args>)" and captures name and arguments
+COMMAND_REGEX = re.compile(rb"\((\w+)((?: [^ ()]+)*)\)")
+RECV_SIZE = 8192
+# Most recent player commands, and cycles' see_global times, kept for
+# command_latencies
+COMMAND_HISTORY = 100000
+
+# Simplified player and ball dynamics
+DASH_POWER_RATE = 0.006
+PLAYER_DECAY = 0.4
+PLAYER_SPEED_MAX = 1.05
+KICKABLE_DISTANCE = 1.085    # player size + ball size + kickable margin
+KICK_POWER_RATE = 0.027
+BALL_DECAY = 0.94
+BALL_SPEED_MAX = 3.0
+
+# rcssserver pitch: half length and width, and half the goal width
+PITCH_HALF_LENGTH = 52.5
+PITCH_HALF_WIDTH = 34.0
+GOAL_HALF_WIDTH = 7.01
+# Meters players may move beyond the pitch lines
+PITCH_MARGIN = 5.0
+
+CommandRecord = namedtuple(
+    "CommandRecord", ["arrival", "cycle", "side", "unum", "name", "args"]
+)
+
+
+def _normalize_angle(angle: float) -> float:
+    """Normalize angle to be within [-180, 180] degrees."""
+    return (angle + 180) % 360 - 180
+
+
+class FakePlayer:
+    """A player slot on the fake field, optionally controlled by a client."""
+    def __init__(self, side: str, unum: int, x: float, y: float, body: float):
+        self.side = side
+        self.unum = unum
+        self.x, self.y, self.body = x, y, body
+        self.vx, self.vy = 0.0, 0.0
+        self.sock = None    # dedicated socket once a client has connected
+        self.addr = None
+        self.command_done = False    # one of move/turn/dash/kick per cycle
+        self.synch = False    # has sent (done), so cycles wait for it
+        self.done = False    # sent (done) for the current cycle
+
+    def move(self, x: float, y: float):
+        """
+        Place the player at a position given in its team's frame.
+
+        Like rcssserver, a move from the right side is mirrored through the
+        center spot, so both teams can send the same left-half formation;
+        the body direction turns with it.
+        """
+        if self.side == "r":
+            x, y = -x, -y
+            self.body = _normalize_angle(self.body + 180)
+        self.x, self.y = x, y
+
+    def dash(self, power: float, direction: float):
+        """Accelerate along the body direction plus a relative direction."""
+        angle = math.radians(self.body + direction)
+        accel = max(-100.0, min(100.0, power)) * DASH_POWER_RATE
+        self.vx += accel * math.cos(angle)
+        self.vy += accel * math.sin(angle)
+        speed = math.hypot(self.vx, self.vy)
+        if speed > PLAYER_SPEED_MAX:
+            self.vx *= PLAYER_SPEED_MAX / speed
+            self.vy *= PLAYER_SPEED_MAX / speed
+
+
+class FakeServer:
+    """Single-threaded UDP stand-in for rcssserver."""
+    def __init__(self, n_players: int = 11, step: float = SIM_TIMESTEP,
+                 client_addr: tuple = SIM_CLIENT_ADDR,
+                 trainer_addr: tuple = SIM_TRAINER_ADDR, synch: bool = False):
+        """
+        Initialize the server and bind its client and trainer ports.
+
+        Args:
+            n_players: Players per team in every see_global, connected or not
+            step: Seconds per simulation cycle
+            client_addr: Address players connect to
+            trainer_addr: Address the trainer connects to
+            synch: End a cycle once every player that sends (done) has sent
+                it for the cycle, instead of every step seconds. Cycles keep
+                their step pacing until the first (done) arrives, so that
+                clients can connect.
+        """
+        self.n_players = n_players
+        self.step = step
+        self.synch = synch
+        self.cycle = 0
+        self.team_names = {"l": "left", "r": "right"}
+        self.n_connected = {"l": 0, "r": 0}
+        self.players = {
+            (side, unum): FakePlayer(side, unum, sign * -3.0 * unum, 0.0,
+                                     0.0 if side == "l" else 180.0)
+            for side, sign in (("l", 1), ("r", -1))
+            for unum in range(1, n_players + 1)
+        }
+        self.ball = [0.0, 0.0, 0.0, 0.0]    # x, y, vx, vy
+        self.score = {"l": 0, "r": 0}    # goals per side; the left side attacks +x
+
+        self.trainer_addr = None
+        self.eye_on = False
+        self.commands = deque(maxlen=COMMAND_HISTORY)    # latest CommandRecords
+        self.n_commands = 0    # player commands received in total
+        self.see_global_times = {}    # recent cycle -> time see_global was sent
+
+        self.selector = selectors.DefaultSelector()
+        self.client_sock = self._bind(client_addr, self._on_client_init)
+        self.trainer_sock = self._bind(trainer_addr, self._on_trainer)
+        self._running = True
+        self._thread = None
+
+    def _bind(self, addr: tuple, handler) -> socket.socket:
+        """Open a UDP socket on addr and register its datagram handler."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(addr)
+        sock.setblocking(False)
+        self.selector.register(sock, selectors.EVENT_READ, handler)
+        return sock
+
+    def start(self):
+        """Run the server in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="fake-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the server thread and close every socket."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for key in list(self.selector.get_map().values()):
+            self.selector.unregister(key.fileobj)
+            key.fileobj.close()
+        self.selector.close()
+
+    def run(self):
+        """
+        Serve requests and advance one cycle every step seconds, or in
+        synchronous mode whenever all synchronized players are done, until
+        stopped.
+        """
+        next_step = time.monotonic() + self.step
+        while self._running:
+            waiting = self._synchronized()
+            if waiting:
+                # Wakes up every step only to notice stop()
+                timeout = self.step
+            else:
+                timeout = max(0.0, next_step - time.monotonic())
+            for key, _ in self.selector.select(timeout):
+                self._drain(key.fileobj, key.data)
+
+            waiting = self._synchronized()
+            if waiting:
+                if all(player.done for player in waiting):
+                    self.advance()
+                    next_step = time.monotonic() + self.step
+            elif time.monotonic() >= next_step:
+                self.advance()
+                next_step += self.step
+
+    def _synchronized(self) -> list[FakePlayer]:
+        """Connected players a cycle waits for in synchronous mode."""
+        if not self.synch:
+            return []
+        return [player for player in self.players.values()
+                if player.synch and player.sock is not None]
+
+    def _drain(self, sock: socket.socket, handler):
+        """Hand every datagram queued on a socket to its handler."""
+        while sock.fileno() >= 0:    # a bye closes the player's socket
+            try:
+                (data, address) = sock.recvfrom(RECV_SIZE)
+            except (BlockingIOError, ConnectionError):
+                return
+            handler(sock, data.rstrip(b"\0"), address)
+
+    def _on_client_init(self, sock: socket.socket, data: bytes, address: tuple):
+        """Handle a player init on the shared client port."""
+        if not (m := PLAYER_INIT_REGEX.fullmatch(data)):
+            sock.sendto(b"(error unknown_command)\0", address)
+            return
+        teamname = m.group(1).decode()
+        side = next((s for s, name in self.team_names.items() if name == teamname), None)
+        if side is None:
+            side = next((s for s, n in self.n_connected.items() if n == 0), None)
+        if side is None or self.n_connected[side] >= self.n_players:
+            sock.sendto(b"(error no_more_team_or_player_or_goalie)\0", address)
+            return
+
+        self.team_names[side] = teamname
+        self.n_connected[side] += 1
+        # The lowest uniform number free, including those freed by bye
+        player = next(player for (s, _), player in self.players.items()
+                      if s == side and player.sock is None)
+        # Like rcssserver, talk to each player from its own port from now on
+        player.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        player.sock.bind((sock.getsockname()[0], 0))
+        player.sock.setblocking(False)
+        player.addr = address
+        self.selector.register(
+            player.sock, selectors.EVENT_READ,
+            lambda s, d, a, player=player: self._on_player(player, d, a))
+        player.sock.sendto(b"(init %b %d before_kick_off)\0" % (side.encode(), player.unum), address)
+
+    def _on_player(self, player: FakePlayer, data: bytes, address: tuple):
+        """Handle a command from a connected player."""
+        if not (m := COMMAND_REGEX.fullmatch(data)):
+            player.sock.sendto(b"(error illegal_command_form)\0", address)
+            return
+        name = m.group(1).decode()
+        if name == "done":
+            # Not a player action, so it is not recorded
+            player.synch = player.done = True
+            return
+        args = [float(arg) for arg in m.group(2).split()] if name != "bye" else []
+        self.commands.append(CommandRecord(time.monotonic(), self.cycle, player.side,
+                                           player.unum, name, tuple(args)))
+        self.n_commands += 1
+
+        if name == "bye":
+            # Free the slot for the next player of the side
+            self.selector.unregister(player.sock)
+            player.sock.close()
+            player.sock = None
+            player.addr = None
+            player.synch = player.done = False
+            self.n_connected[player.side] -= 1
+            return
+        if name not in ("move", "turn", "dash", "kick") or player.command_done:
+            return
+        player.command_done = True
+        if name == "move" and len(args) >= 2:
+            player.move(args[0], args[1])
+        elif name == "turn" and args:
+            player.body = _normalize_angle(player.body + args[0])
+        elif name == "dash" and args:
+            player.dash(args[0], args[1] if len(args) > 1 else 0.0)
+        elif name == "kick" and len(args) >= 2:
+            self.kick(player, args[0], args[1])
+
+    def kick(self, player: FakePlayer, power: float, direction: float):
+        """Accelerate the ball if it is within the player's kickable area."""
+        if math.hypot(self.ball[0] - player.x, self.ball[1] - player.y) > KICKABLE_DISTANCE:
+            return
+        angle = math.radians(player.body + direction)
+        accel = max(0.0, min(100.0, power)) * KICK_POWER_RATE
+        self.ball[2] += accel * math.cos(angle)
+        self.ball[3] += accel * math.sin(angle)
+        speed = math.hypot(self.ball[2], self.ball[3])
+        if speed > BALL_SPEED_MAX:
+            self.ball[2] *= BALL_SPEED_MAX / speed
+            self.ball[3] *= BALL_SPEED_MAX / speed
+
+    def _on_trainer(self, sock: socket.socket, data: bytes, address: tuple):
+        """Handle a trainer command on the trainer port."""
+        if data.startswith(b"(init"):
+            self.trainer_addr = address
+            sock.sendto(b"(init ok)\0", address)
+        elif address != self.trainer_addr:
+            sock.sendto(b"(error illegal_client)\0", address)
+        elif data == b"(eye on)":
+            self.eye_on = True
+            sock.sendto(b"(ok eye on)\0", address)
+        elif data == b"(eye off)":
+            self.eye_on = False
+            sock.sendto(b"(ok eye off)\0", address)
+        elif data.startswith(b"(change_mode"):
+            sock.sendto(b"(ok change_mode)\0", address)
+        elif data == b"(bye)":
+            self.trainer_addr = None
+            self.eye_on = False
+        else:
+            sock.sendto(b"(error unknown_command)\0", address)
+
+    def advance(self):
+        """Simulate one cycle and send the cycle's sensor messages."""
+        self.cycle += 1
+        for player in self.players.values():
+            player.x += player.vx
+            player.y += player.vy
+            player.vx *= PLAYER_DECAY
+            player.vy *= PLAYER_DECAY
+            player.command_done = False
+            player.done = False
+        self.ball[0] += self.ball[2]
+        self.ball[1] += self.ball[3]
+        self.ball[2] *= BALL_DECAY
+        self.ball[3] *= BALL_DECAY
+        self._keep_on_field()
+
+        for player in self.players.values():
+            if player.sock is not None:
+                player.sock.sendto(b"(sense_body %d (view_mode high normal))\0" % self.cycle,
+                                   player.addr)
+        if self.eye_on and self.trainer_addr is not None:
+            self.trainer_sock.sendto(self.see_global(), self.trainer_addr)
+            self.see_global_times[self.cycle] = time.monotonic()
+            self.see_global_times.pop(self.cycle - COMMAND_HISTORY, None)
+
+    def _keep_on_field(self):
+        """
+        Score a ball that crossed a goal line between the posts, stop a ball
+        that left the pitch elsewhere on the line it crossed, and keep
+        players within PITCH_MARGIN of the pitch.
+        """
+        for player in self.players.values():
+            player.x = max(-PITCH_HALF_LENGTH - PITCH_MARGIN,
+                           min(PITCH_HALF_LENGTH + PITCH_MARGIN, player.x))
+            player.y = max(-PITCH_HALF_WIDTH - PITCH_MARGIN,
+                           min(PITCH_HALF_WIDTH + PITCH_MARGIN, player.y))
+
+        bx, by = self.ball[0], self.ball[1]
+        if abs(bx) > PITCH_HALF_LENGTH and abs(by) < GOAL_HALF_WIDTH:
+            self.score["l" if bx > 0 else "r"] += 1
+            self.ball = [0.0, 0.0, 0.0, 0.0]
+        elif abs(bx) > PITCH_HALF_LENGTH or abs(by) > PITCH_HALF_WIDTH:
+            self.ball = [max(-PITCH_HALF_LENGTH, min(PITCH_HALF_LENGTH, bx)),
+                         max(-PITCH_HALF_WIDTH, min(PITCH_HALF_WIDTH, by)), 0.0, 0.0]
+
+    def see_global(self) -> bytes:
+        """Build this cycle's see_global message."""
+        bx, by, bvx, bvy = self.ball
+        parts = [f"(see_global {self.cycle} ((g l) -52.5 0) ((g r) 52.5 0)",
+                 f"((b) {bx:.4f} {by:.4f} {bvx:.4f} {bvy:.4f})"]
+        for (side, unum), p in self.players.items():
+            goalie = " goalie" if unum == 1 else ""
+            parts.append(f'((p "{self.team_names[side]}" {unum}{goalie}) {p.x:.4f} {p.y:.4f} '
+                         f'{p.vx:.4f} {p.vy:.4f} {p.body:.4f} 0)')
+        return (" ".join(parts) + ")\0").encode()
+
+    def command_latencies(self) -> list[float]:
+        """
+        Seconds from each cycle's see_global to the arrival of every player
+        command during that cycle, excluding bye, over the last
+        COMMAND_HISTORY commands sent during the last COMMAND_HISTORY cycles.
+        """
+        return [record.arrival - self.see_global_times[record.cycle]
+                for record in self.commands
+                if record.cycle in self.see_global_times and record.name != "bye"]
+
+
+def main():
+    """Run the fake server until interrupted and print command statistics."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", type=str, default=LOCALHOST_IP)
+    parser.add_argument("--port", type=int, default=SIM_CLIENT_ADDR[1])
+    parser.add_argument("--trainer-port", type=int, default=SIM_TRAINER_ADDR[1])
+    parser.add_argument("--players", type=int, default=11, help="players per team")
+    parser.add_argument("--step", type=float, default=SIM_TIMESTEP,
+                        help="seconds per cycle")
+    parser.add_argument("--synch", action="store_true",
+                        help="end each cycle once all players sent (done), like synch_mode")
+    args = parser.parse_args()
+
+    server = FakeServer(args.players, args.step, (args.host, args.port),
+                        (args.host, args.trainer_port), args.synch)
+    pacing = "synchronous" if args.synch else f"{1 / args.step:.0f} cycles/s"
+    print(f"Fake server on {args.host}:{args.port} (trainer {args.trainer_port}), "
+          f"{args.players} players per team, {pacing}")
+    start = time.monotonic()
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.monotonic() - start
+    latencies = sorted(server.command_latencies())
+    print(f"\n{server.cycle} cycles in {elapsed:.1f} s ({server.cycle / elapsed:.0f} cycles/s), "
+          f"{server.n_commands} commands")
+    print(f"score: {server.team_names['l']} {server.score['l']} - "
+          f"{server.score['r']} {server.team_names['r']}")
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"command latency after see_global: p50 {p50 * 1e3:.2f} ms, "
+              f"p99 {p99 * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
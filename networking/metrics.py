@@ -0,0 +1,172 @@
+"""
+Opt-in per-stage cycle latency instrumentation.
+
+CycleProfiler keeps a latency histogram per pipeline stage (receive, parse,
+decide, serialize, send) and per team, plus the end-to-end latency of each
+cycle from receiving its game state to sending its commands. Recording a
+sample is a bucket increment, so the profiler can stay on in real matches.
+Reports with p50/p99 and deadline misses against SIM_TIMESTEP are written to
+a file periodically.
+"""
+
+import time
+from .data_utils import SIM_TIMESTEP
+
+STAGES = ["receive", "parse", "decide", "serialize", "send", "cycle"]
+# Each power of two is split into this many linear sub-buckets
+SUB_BUCKETS = 4
+N_BUCKETS = SUB_BUCKETS * 64
+
+
+def _bucket(ns: int) -> int:
+    """Histogram bucket of a duration in nanoseconds."""
+    if ns < 2 * SUB_BUCKETS:
+        return max(ns, 0)
+    shift = ns.bit_length() - 3
+    return SUB_BUCKETS * (shift + 1) + (ns >> shift) - SUB_BUCKETS
+
+
+def _bucket_upper_bound(bucket: int) -> int:
+    """Largest duration in nanoseconds that falls into a bucket."""
+    if bucket < 2 * SUB_BUCKETS:
+        return bucket
+    shift = bucket // SUB_BUCKETS - 1
+    return ((bucket % SUB_BUCKETS + SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations with about 25% resolution."""
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        """Add one duration in nanoseconds."""
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile.
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Upper bound of the bucket holding the percentile, in seconds
+        """
+        if self.count == 0:
+            return float("nan")
+        rank = max(1, round(self.count * q / 100))
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_upper_bound(bucket), self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+
+class CycleProfiler:
+    """Collects per-stage and per-team latency histograms for the control loop."""
+    def __init__(self, path: str | None = None, dump_interval: float = 10.0,
+                 deadline: float = SIM_TIMESTEP):
+        """
+        Initialize the profiler.
+
+        Args:
+            path: File the report is rewritten to every dump_interval seconds
+            dump_interval: Seconds between report dumps
+            deadline: Budget in seconds from receiving a game state to
+                sending its commands
+        """
+        self.path = path
+        self.dump_interval = dump_interval
+        self.deadline_ns = int(deadline * 1e9)
+        self.histograms = {}    # (stage, team) -> LatencyHistogram
+        self.deadline_misses = {}    # team -> number of late cycles
+        self.received = {}    # GameState.count -> receive time in ns
+        self._next_dump = time.monotonic() + dump_interval
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def record(self, stage: str, start_ns: int, team: str | None = None) -> int:
+        """
+        Record a stage that started at start_ns and ends now.
+
+        Args:
+            stage: One of STAGES
+            start_ns: Start time from CycleProfiler.clock()
+            team: Team the stage ran for, or None for shared stages
+
+        Returns:
+            Current clock, to be used as the start of the next stage
+        """
+        now = time.perf_counter_ns()
+        histogram = self.histograms.get((stage, team))
+        if histogram is None:
+            histogram = self.histograms.setdefault((stage, team), LatencyHistogram())
+        histogram.record(now - start_ns)
+        return now
+
+    def frame_received(self, count: int, start_ns: int):
+        """
+        Mark when the game state for a cycle started being received.
+
+        Args:
+            count: GameState.count of the frame
+            start_ns: Clock when its datagram was taken off the socket
+        """
+        if len(self.received) > 64:
+            # Forget frames whose cycles were never finished, e.g. skipped ones
+            for old in sorted(self.received)[:-32]:
+                del self.received[old]
+        self.received[count] = start_ns
+
+    def end_cycle(self, count: int, team: str):
+        """
+        Record the end-to-end latency of one team's cycle once its commands
+        are sent, and dump the report if it is due.
+
+        Args:
+            count: GameState.count the commands were decided on
+            team: Team whose commands were sent
+        """
+        start_ns = self.received.get(count)
+        if start_ns is not None:
+            now = self.record("cycle", start_ns, team)
+            if now - start_ns > self.deadline_ns:
+                self.deadline_misses[team] = self.deadline_misses.get(team, 0) + 1
+        if self.path is not None and time.monotonic() >= self._next_dump:
+            self._next_dump = time.monotonic() + self.dump_interval
+            self.dump()
+
+    def report(self) -> str:
+        """Format every histogram as a table of percentiles in milliseconds."""
+        lines = [f"{'stage':10s} {'team':14s} {'count':>8s} {'mean':>8s} "
+                 f"{'p50':>8s} {'p99':>8s} {'max':>8s}  (ms)"]
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        for (stage, team), hist in sorted(
+                self.histograms.items(),
+                key=lambda item: (order.get(item[0][0], len(STAGES)), str(item[0][1]))):
+            mean = hist.total_ns / hist.count / 1e6 if hist.count else float("nan")
+            line = (f"{stage:10s} {team or '-':14s} {hist.count:8d} {mean:8.3f} "
+                    f"{hist.percentile(50) * 1e3:8.3f} {hist.percentile(99) * 1e3:8.3f} "
+                    f"{hist.max_ns / 1e6:8.3f}")
+            if stage == "cycle":
+                misses = self.deadline_misses.get(team, 0)
+                line += (f"  deadline misses {misses} "
+                         f"({misses / hist.count * 100:.1f}% over "
+                         f"{self.deadline_ns / 1e6:.0f} ms)")
+            lines.append(line)
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Rewrite the report file with the current statistics."""
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                f.write(self.report())
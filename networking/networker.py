@@ -5,8 +5,13 @@ This module provides the Networker class which coordinates communication
 between the AI system and various game environments (simulators and real robots).
 """
 
-from .data_utils import GameState, TeamInfo, Serializer
-from .socket_utils import Listener, Commander
+from collections.abc import AsyncIterator
+from .data_utils import GameState, TeamInfo, Serializer, CommandBatch
+from .backends import uses
+from .socket_utils import Listener, Commander, SIM_CLIENT_ADDR, SIM_TRAINER_ADDR
+from .receiver import LatestFrameReceiver
+from .metrics import CycleProfiler
+from .tracking import StateTracker
 
 class Networker:
     """
@@ -16,18 +21,117 @@ class Networker:
     handling game state reception and command execution.
     """
     
-    def __init__(self, team_infos: list[TeamInfo], environment: str):
+    def __init__(self, team_infos: list[TeamInfo], environment: str,
+                 record_path: str | None = None, replay_path: str | None = None,
+                 replay_speed: float = 1.0, robot_protocol: str = "text",
+                 sim_addr: tuple = SIM_CLIENT_ADDR, trainer_addr: tuple = SIM_TRAINER_ADDR):
         """
         Initialize the networker with team information and environment settings.
         
         Args:
             team_infos: List of team information including names and player counts
             environment: Environment type for the game
+            record_path: File to record every received game state datagram to
+            replay_path: Match log to replay instead of connecting to a game;
+                commands are then serialized but not sent anywhere
+            replay_speed: Replay speed relative to the recording, 0 for as
+                fast as possible
+            robot_protocol: "text" for newline-separated command strings or
+                "binary" for packets from networking/robot_protocol.py
+            sim_addr: Simulator address players connect to
+            trainer_addr: Simulator trainer address game states come from
         """
         self.environment = environment
+        self.team_names = [team_info.name for team_info in team_infos]
         self.serializer = Serializer()
-        self.commander = Commander(team_infos, environment)
-        self.game_watcher = Listener(team_infos, environment)
+        self.robot_protocol = robot_protocol
+        self.robot_sequences = {team_info.name: 0 for team_info in team_infos}
+        if replay_path is None:
+            self.commander = Commander(team_infos, environment, sim_addr)
+        else:
+            self.commander = None
+        self.game_watcher = Listener(team_infos, environment, record_path,
+                                     replay_path, replay_speed, trainer_addr)
+        self.profiler = None
+        self.tracker = None
+        self.synch = False
+        self.done_resent = 0    # receive timeouts after which (done) was resent
+        self.receiver = None
+        self.async_watcher = None
+        self.async_commander = None
+
+    def set_profiler(self, profiler: CycleProfiler):
+        """
+        Time every pipeline stage with the given profiler from now on.
+        
+        Args:
+            profiler: Profiler collecting the stage latencies
+        """
+        self.profiler = profiler
+        self.game_watcher.profiler = profiler
+
+    def set_tracker(self, tracker: StateTracker):
+        """
+        Filter every game state with the given tracker from now on, adding
+        velocities and predicting positions at command execution time.
+        
+        Args:
+            tracker: Tracker over all teams of the game
+        """
+        self.tracker = tracker
+
+    def set_synch_mode(self):
+        """
+        Drive a simulator running in synchronous mode from now on.
+
+        Every player sends (done) after its team's commands, so the server
+        advances one cycle as soon as both teams have acted instead of on
+        its wall clock, and game states are stamped with simulated time.
+        get_game_state should then be called without the background
+        receiver, so that every cycle is decided.
+        """
+        self.synch = True
+        self.game_watcher.parser.sim_time = True
+
+    def resend_done(self):
+        """
+        Send (done) again for every team after a receive timeout in
+        synchronous mode.
+
+        The server waits for every player's (done) before the next cycle,
+        so a lost game state or (done) datagram would otherwise leave both
+        sides waiting for each other forever. If it was the game state that
+        was lost, the server then plays one cycle without the teams'
+        commands.
+        """
+        self.done_resent += 1
+        for team_name in self.team_names:
+            self.commander.send_done(team_name)
+
+    def start_receiver(self):
+        """
+        Receive game states in a background thread from now on.
+
+        get_game_state then always returns the newest frame and frames
+        superseded while the AI was busy are dropped.
+        """
+        self.receiver = LatestFrameReceiver(self.game_watcher)
+        self.receiver.start()
+
+    def stop_receiver(self):
+        """Stop the background receiver, if running."""
+        if self.receiver is not None:
+            self.receiver.stop()
+
+    @property
+    def frames_skipped(self) -> int:
+        """Number of game state frames dropped because newer ones arrived."""
+        skipped = 0
+        if self.receiver is not None:
+            skipped += self.receiver.frames_skipped
+        if self.async_watcher is not None:
+            skipped += self.async_watcher.frames_skipped
+        return skipped
 
     def get_game_state(self) -> GameState:
         """
@@ -36,25 +140,101 @@ class Networker:
         Returns:
             Current game state including ball position, robot poses, and timing information
         """
-        return self.game_watcher.watch_game()
+        if self.receiver is not None:
+            game_state = self.receiver.get(timeout=0.2)
+        else:
+            game_state = self.game_watcher.watch_game()
+        if game_state is not None and self.tracker is not None:
+            game_state = self.tracker.update(game_state)
+        return game_state
+
+    async def start_async(self):
+        """
+        Switch to asyncio mode on the running event loop.
+
+        All listener and commander sockets are attached to the loop; game
+        states are then read from game_states() and execute_ai_output sends
+        without blocking.
+        """
+        # Imported here so the blocking modes never load asyncio
+        from .async_utils import AsyncListener, AsyncCommander
+        self.async_watcher = AsyncListener(self.game_watcher)
+        await self.async_watcher.open()
+        self.async_commander = AsyncCommander(self.commander)
+        await self.async_commander.open()
+
+    def stop_async(self):
+        """Detach all sockets from the event loop and return to blocking mode."""
+        if self.async_watcher is not None:
+            self.async_watcher.close()
+        if self.async_commander is not None:
+            self.async_commander.close()
+            self.async_commander = None
 
-    def execute_ai_output(self, output: list[str], team_name: str):
+    def game_states(self) -> AsyncIterator[GameState]:
+        """
+        Iterate over game states as they arrive, in asyncio mode.
+        
+        Returns:
+            Async iterator of game states
+        """
+        if self.tracker is None:
+            return self.async_watcher
+        return self._tracked_game_states()
+
+    async def _tracked_game_states(self) -> AsyncIterator[GameState]:
+        """Iterate over game states filtered by the tracker."""
+        async for game_state in self.async_watcher:
+            yield self.tracker.update(game_state)
+
+    def execute_ai_output(self, output: CommandBatch | list[str], team_name: str,
+                          count: int = 0):
         """
         Execute AI-generated commands by sending them to the appropriate targets.
         
         Args:
-            output: List of command strings from the AI system
+            output: CommandBatch or list of command strings from the AI system
             team_name: Name of the team executing the commands
+            count: GameState.count the commands were decided on, carried by
+                binary robot packets
         """
-        if self.environment in ["sim-only", "sim-mixed"]:
+        commander = self.async_commander or self.commander
+        profiler = self.profiler
+        if uses(self.environment, "simulator"):
+            start = profiler.clock() if profiler is not None else 0
             messages = self.serializer.sim_serialize(output)
-            self.commander.send_to_sim(team_name, messages)
+            if profiler is not None:
+                start = profiler.record("serialize", start, team_name)
+            if commander is not None:
+                commander.send_to_sim(team_name, messages)
+                if self.synch:
+                    commander.send_done(team_name)
+                if profiler is not None:
+                    profiler.record("send", start, team_name)
 
-        if self.environment != "sim-only":
-            messages = self.serializer.robot_serialize(output)
-            self.commander.send_to_robots(team_name, messages)
+        if uses(self.environment, "robots"):
+            start = profiler.clock() if profiler is not None else 0
+            if self.robot_protocol == "binary":
+                sequence = self.robot_sequences[team_name] + 1
+                self.robot_sequences[team_name] = sequence
+                messages = self.serializer.robot_serialize_binary(output, sequence, count)
+            else:
+                messages = self.serializer.robot_serialize(output)
+            if profiler is not None:
+                start = profiler.record("serialize", start, team_name)
+            if commander is not None:
+                commander.send_to_robots(team_name, messages)
+                if profiler is not None:
+                    profiler.record("send", start, team_name)
 
     def disconnect_from_sim(self):
         """Cleanly disconnect from simulator connections."""
-        self.commander.disconnect_from_sim()
-        self.game_watcher.disconnect_from_sim()
+        self.stop_receiver()
+        if self.commander is not None:
+            self.commander.disconnect_from_sim()
+            self.game_watcher.disconnect_from_sim()
+
+    def close(self):
+        """Stop receiving and close any match log being recorded or replayed."""
+        self.stop_receiver()
+        self.game_watcher.close()
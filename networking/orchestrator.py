@@ -0,0 +1,243 @@
+"""
+Runs many independent simulated matches in parallel to evaluate strategies.
+
+Every match gets its own pair of simulator ports and runs in its own worker
+process, with its own Networker and strategy instances, so matches share
+nothing and evaluation scales with the number of cores. By default each
+match also starts a FakeServer on its ports inside its worker; with
+--external the matches connect to servers already listening there, such as
+one rcssserver per port pair.
+
+Match i uses client port base_port + 2 * i and trainer port
+base_port + 2 * i + 1:
+
+    python -m networking.orchestrator --matches 8 --cycles 300 --step 0.01
+
+With --synch the servers run in synchronous mode and every match advances as
+fast as its teams decide.
+
+The home team plays on the left in even matches and on the right in odd
+ones, since the client formation is not symmetric: the left goalie starts on
+the ball line and the right one 5 m off it. Each match reports its score,
+taken from the fake server, and the mean x of the ball over the decided game
+states from the home team's side, positive when play was mostly in the away
+team's half. Matches on external servers only report the ball x.
+"""
+
+import argparse
+import importlib
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_utils import TeamInfo, SIM_TIMESTEP
+from .fake_server import FakeServer
+from .networker import Networker
+from .socket_utils import LOCALHOST_IP
+
+TEAM_NAMES = ("TritonBots", "TeamB")
+BASE_PORT = 6100
+# Seconds of silence from a server after which a match is given up
+MATCH_TIMEOUT = 5.0
+
+MatchConfig = namedtuple("MatchConfig", [
+    "index", "host", "client_port", "trainer_port", "strategies", "n_players",
+    "cycles", "step", "fake_server", "synch", "home_side"])
+MatchResult = namedtuple("MatchResult", [
+    "index", "client_port", "decided", "last_cycle", "skipped", "commands",
+    "elapsed", "error", "goals", "ball_x", "home_side"])
+
+
+def load_strategy(module: str) -> type:
+    """
+    Import a strategy's SoccerAI class.
+
+    Args:
+        module: Module path of the strategy, e.g. "ai_interface.naive"
+
+    Returns:
+        The module's SoccerAI class
+    """
+    return importlib.import_module(module).SoccerAI
+
+
+def make_configs(n_matches: int, strategies: tuple, n_players: int, cycles: int,
+                 step: float = SIM_TIMESTEP, fake_server: bool = True, synch: bool = False,
+                 host: str = LOCALHOST_IP, base_port: int = BASE_PORT) -> list[MatchConfig]:
+    """
+    Configure matches on consecutive port pairs, with the home team on
+    alternating sides.
+
+    Args:
+        n_matches: Number of matches
+        strategies: Strategy modules of the home and away teams
+        n_players: Players per team
+        cycles: Server cycles per match
+        step: Seconds per cycle of the fake servers
+        fake_server: Start a FakeServer for every match
+        synch: Run the servers in synchronous mode
+        host: Host of the servers
+        base_port: Client port of the first match
+
+    Returns:
+        MatchConfig of every match
+    """
+    return [MatchConfig(i, host, base_port + 2 * i, base_port + 2 * i + 1, tuple(strategies),
+                        n_players, cycles, step, fake_server, synch, "lr"[i % 2])
+            for i in range(n_matches)]
+
+
+def play_match(config: MatchConfig) -> MatchResult:
+    """
+    Play one match until the server reaches config.cycles.
+
+    Both teams are decided in this process, each by its own strategy
+    instance, on the newest frame as in the main loop, or on every frame in
+    synchronous mode.
+
+    Args:
+        config: Match to play
+
+    Returns:
+        MatchResult of the match; error holds the message if it failed
+    """
+    client_addr = (config.host, config.client_port)
+    trainer_addr = (config.host, config.trainer_port)
+    server = None
+    if config.fake_server:
+        server = FakeServer(config.n_players, config.step, client_addr, trainer_addr,
+                            config.synch)
+        server.start()
+
+    start = time.perf_counter()
+    decided, last_cycle, skipped, error = 0, 0, 0, None
+    ball_x = 0.0    # sum over the decided game states, in the left side's frame
+    networker = None
+    try:
+        strategies = [load_strategy(module)() for module in config.strategies]
+        # The first team to connect gets the left side
+        order = TEAM_NAMES if config.home_side == "l" else TEAM_NAMES[::-1]
+        team_infos = [TeamInfo(name, config.n_players) for name in order]
+        networker = Networker(team_infos, "sim-only", sim_addr=client_addr,
+                              trainer_addr=trainer_addr)
+        if config.synch:
+            networker.set_synch_mode()
+        else:
+            networker.start_receiver()
+        last_frame = time.monotonic()
+        while last_cycle < config.cycles:
+            game_state = networker.get_game_state()
+            if game_state is None:
+                if time.monotonic() - last_frame > MATCH_TIMEOUT:
+                    raise Exception(f"No game state from {trainer_addr} "
+                                    f"for {MATCH_TIMEOUT} seconds")
+                if config.synch and decided:
+                    networker.resend_done()
+                continue
+            last_frame = time.monotonic()
+            decided += 1
+            last_cycle = game_state.count
+            ball_x += float(game_state.ball[0])
+            for strategy, team_name in zip(strategies, TEAM_NAMES):
+                ai_output = strategy.decide_action(game_state, team_name)
+                networker.execute_ai_output(strategy.translate_ai_output(ai_output),
+                                            team_name, game_state.count)
+    except Exception as e:
+        error = str(e)
+    finally:
+        elapsed = time.perf_counter() - start
+        if networker is not None:
+            skipped = networker.frames_skipped
+            networker.disconnect_from_sim()
+            networker.close()
+        commands, goals, home = 0, None, config.home_side
+        if server is not None:
+            server.stop()
+            commands = server.n_commands
+            away = "l" if home == "r" else "r"
+            goals = (server.score[home], server.score[away])
+        # The left side attacks +x
+        ball_x *= (1.0 if home == "l" else -1.0) / max(decided, 1)
+    return MatchResult(config.index, config.client_port, decided, last_cycle, skipped,
+                       commands, elapsed, error, goals, ball_x, home)
+
+
+def run_matches(configs: list[MatchConfig], workers: int | None = None
+                ) -> tuple[list[MatchResult], float]:
+    """
+    Play matches in parallel worker processes.
+
+    Args:
+        configs: Matches to play; concurrently running matches must not
+            share ports
+        workers: Number of matches played at once, None for one per core
+
+    Returns:
+        Tuple of (results in config order, wall seconds for all matches)
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(workers, len(configs))) as pool:
+        results = list(pool.map(play_match, configs))
+    return results, time.perf_counter() - start
+
+
+def report(results: list[MatchResult], elapsed: float) -> str:
+    """Summarize per-match results, the home team's record and the aggregate throughput."""
+    lines = []
+    for result in results:
+        status = f"failed: {result.error}" if result.error else "ok"
+        score = "" if result.goals is None else f"score {result.goals[0]}-{result.goals[1]}, "
+        side = "left" if result.home_side == "l" else "right"
+        lines.append(f"match {result.index} (port {result.client_port}, home {side}): "
+                     f"{result.decided} cycles decided up to cycle {result.last_cycle}, "
+                     f"{result.skipped} skipped, {result.commands} commands, "
+                     f"{score}ball x {result.ball_x:+.1f}, {result.elapsed:.2f} s, {status}")
+    finished = [result for result in results if result.error is None]
+    decided = sum(result.decided for result in finished)
+    lines.append(f"{len(finished)}/{len(results)} matches in {elapsed:.2f} s: "
+                 f"{len(finished) / elapsed:.2f} matches/s, {decided / elapsed:.0f} cycles/s")
+    if finished:
+        # Weighted by cycles decided, so short matches count less
+        ball_x = sum(result.ball_x * result.decided for result in finished) / max(decided, 1)
+        outcome = f"{TEAM_NAMES[0]} vs {TEAM_NAMES[1]}: "
+        scored = [result.goals for result in finished if result.goals is not None]
+        if scored:
+            wins = sum(home > away for home, away in scored)
+            draws = sum(home == away for home, away in scored)
+            outcome += (f"{wins}-{draws}-{len(scored) - wins - draws} (W-D-L), goals "
+                        f"{sum(home for home, _ in scored)}-{sum(away for _, away in scored)}, ")
+        lines.append(outcome + f"mean ball x {ball_x:+.1f}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """Play matches as configured on the command line and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--matches", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="matches played at once (default: one per core)")
+    parser.add_argument("--cycles", type=int, default=300, help="server cycles per match")
+    parser.add_argument("--players", type=int, default=11, help="players per team")
+    parser.add_argument("--step", type=float, default=SIM_TIMESTEP,
+                        help="seconds per cycle of the fake servers")
+    parser.add_argument("--strategies", type=str, nargs=2, default=["ai_interface.naive"] * 2,
+                        metavar=("HOME", "AWAY"), help="strategy modules of both teams")
+    parser.add_argument("--host", type=str, default=LOCALHOST_IP)
+    parser.add_argument("--base-port", type=int, default=BASE_PORT)
+    parser.add_argument("--external", action="store_true",
+                        help="connect to servers already running on the match ports "
+                             "instead of starting fake servers")
+    parser.add_argument("--synch", action="store_true",
+                        help="run the servers in synchronous mode, as fast as the teams decide")
+    args = parser.parse_args()
+
+    configs = make_configs(args.matches, args.strategies, args.players, args.cycles,
+                           args.step, not args.external, args.synch, args.host, args.base_port)
+    results, elapsed = run_matches(configs, args.workers)
+    print(report(results, elapsed), end="")
+
+
+if __name__ == "__main__":
+    main()
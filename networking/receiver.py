@@ -0,0 +1,91 @@
+"""
+Background game state receiver that always serves the freshest frame.
+
+When deciding takes longer than one cycle, datagrams queue up on the listener
+socket and handing them out in order makes the AI act on older and older
+positions. The receiver here drains the socket continuously in its own thread
+and keeps only the newest game state in a single slot.
+"""
+
+import threading
+from .data_utils import GameState
+from .socket_utils import Listener
+
+
+class LatestFrameReceiver:
+    """Receives game states in a background thread, latest frame wins."""
+    def __init__(self, listener: Listener):
+        """
+        Initialize the receiver.
+
+        Args:
+            listener: Connected listener to receive game states from
+        """
+        self.listener = listener
+        self.frames_received = 0
+        self.frames_skipped = 0    # superseded before they were consumed
+
+        self.finished = False    # the source ran out of frames
+        self._slot = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start receiving in a background thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="receiver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread and wait for it to exit."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Drain the listener and publish each newest game state."""
+        while self._running:
+            try:
+                game_state, skipped = self.listener.watch_latest()
+            except EOFError:
+                with self._condition:
+                    self.finished = True
+                    self._condition.notify()
+                return
+
+            with self._condition:
+                self.frames_received += skipped
+                self.frames_skipped += skipped
+                if game_state is None:
+                    continue
+
+                self.frames_received += 1
+                if self._slot is not None:
+                    self.frames_skipped += 1
+                self._slot = game_state
+                self._condition.notify()
+
+    def get(self, timeout: float | None = None) -> GameState:
+        """
+        Take the newest game state that has not been handed out yet.
+
+        Args:
+            timeout: Seconds to wait for a new frame, or None to wait forever
+
+        Returns:
+            Newest game state, or None if no new frame arrived in time
+
+        Raises:
+            EOFError: When the source ran out of frames, e.g. a replayed
+                match log ended
+        """
+        with self._condition:
+            if self._slot is None:
+                self._condition.wait_for(
+                    lambda: self._slot is not None or self.finished, timeout)
+            if self._slot is None and self.finished:
+                raise EOFError("No more game states")
+            game_state, self._slot = self._slot, None
+        return game_state
@@ -0,0 +1,129 @@
+"""
+Binary match logs of raw game state datagrams.
+
+A log starts with a header naming the source ("simulator" or "camera"),
+followed by one record per datagram: the receive timestamp, the payload length
+and the raw payload (a see_global message or an SSL wrapper packet). Logs are
+written by MatchRecorder while playing and read back through a memory map by
+MatchLog, so matches can be replayed without a server or vision feed.
+"""
+
+import mmap
+import struct
+import time
+
+LOG_MAGIC = b"RCAILOG1"
+LOG_SOURCES = ["simulator", "camera"]
+# magic, source index
+HEADER = struct.Struct("<8sB")
+# receive timestamp (seconds since the epoch), payload length
+RECORD = struct.Struct("<dI")
+
+
+class MatchRecorder:
+    """Appends raw game state datagrams to a binary match log."""
+    def __init__(self, path: str, source: str):
+        """
+        Create the log file and write its header.
+
+        Args:
+            path: File to write the log to
+            source: "simulator" or "camera"
+        """
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(LOG_MAGIC, LOG_SOURCES.index(source)))
+        self.n_records = 0
+
+    def record(self, data: bytes, timestamp: float | None = None):
+        """
+        Append one datagram.
+
+        Args:
+            data: Raw datagram payload
+            timestamp: Receive time, or now if None
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        self.file.write(RECORD.pack(timestamp, len(data)))
+        self.file.write(data)
+        self.n_records += 1
+
+    def close(self):
+        """Flush and close the log file."""
+        self.file.close()
+
+
+class MatchLog:
+    """Reads a binary match log through a memory map."""
+    def __init__(self, path: str, speed: float = 1.0):
+        """
+        Open a match log for replay.
+
+        Args:
+            path: File to read the log from
+            speed: Replay speed relative to the recording, or 0 to replay
+                as fast as possible
+        """
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, source = HEADER.unpack_from(self.map)
+        if magic != LOG_MAGIC:
+            raise Exception(f"Not a match log: {path}")
+        self.source = LOG_SOURCES[source]
+        self.speed = speed
+        self.offset = HEADER.size
+
+        self._start = None    # (recorded time, replay time) of the first record
+
+    def _peek(self, offset: int) -> tuple:
+        """Return (timestamp, payload start, payload end) of the record at offset."""
+        timestamp, length = RECORD.unpack_from(self.map, offset)
+        start = offset + RECORD.size
+        return timestamp, start, start + length
+
+    def next_record(self) -> tuple[float, bytes]:
+        """
+        Return the next record, waiting until it is due at the replay speed.
+
+        Raises:
+            EOFError: When the end of the log is reached
+        """
+        if self.offset >= len(self.map):
+            raise EOFError("End of match log")
+        timestamp, start, end = self._peek(self.offset)
+        self.offset = end
+
+        if self.speed > 0:
+            now = time.monotonic()
+            if self._start is None:
+                self._start = (timestamp, now)
+            due = self._start[1] + (timestamp - self._start[0]) / self.speed
+            if due > now:
+                time.sleep(due - now)
+        return timestamp, self.map[start:end]
+
+    def n_due(self) -> int:
+        """
+        Count records after the current one whose replay time has already
+        passed, as if they were queued on a socket. Always 0 when replaying
+        as fast as possible.
+        """
+        if self.speed <= 0 or self._start is None:
+            return 0
+        now = time.monotonic()
+        n, offset = 0, self.offset
+        while offset < len(self.map):
+            timestamp, _, offset = self._peek(offset)
+            if self._start[1] + (timestamp - self._start[0]) / self.speed > now:
+                break
+            n += 1
+        return n
+
+    def __iter__(self):
+        while self.offset < len(self.map):
+            yield self.next_record()
+
+    def close(self):
+        """Unmap and close the log file."""
+        self.map.close()
+        self.file.close()
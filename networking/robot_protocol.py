@@ -0,0 +1,84 @@
+"""
+Compact binary command packets for physical robots.
+
+One datagram carries the commands of a whole team in a fixed layout, all
+little-endian:
+
+    header (12 bytes)
+        magic       2 bytes   b"RC"
+        version     uint8     ROBOT_PROTOCOL_VERSION
+        n_slots     uint8     number of command slots that follow
+        sequence    uint32    per-team packet counter, wraps at 2**32
+        count       uint32    GameState.count the commands were decided on
+    slot (9 bytes each, slot i is robot i in team order)
+        kind        uint8     0 DONE, 1 FAILED, 2 DASH, 3 TURN, 4 KICK, 5 MOVE
+        a           float32   first argument (power for DASH and KICK,
+                              angle for TURN, x for MOVE)
+        b           float32   second argument (direction for DASH and KICK,
+                              y for MOVE, unused for TURN)
+
+A full team of 16 robots fits in 156 bytes. Arguments use the units of the
+text protocol. Robots should drop packets whose sequence number is not newer
+than the last one they executed, since multicast may reorder datagrams.
+decode_robot_packet is the reference decoder for the robot firmware.
+"""
+
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+ROBOT_PROTOCOL_MAGIC = b"RC"
+ROBOT_PROTOCOL_VERSION = 1
+# magic, version, number of slots, sequence number, cycle count
+ROBOT_HEADER = struct.Struct("<2sBBII")
+# command kind, two arguments
+ROBOT_SLOT = struct.Struct("<Bff")
+ROBOT_SLOT_DTYPE = np.dtype([("kind", "u1"), ("a", "<f4"), ("b", "<f4")])
+
+RobotPacket = namedtuple("RobotPacket", ["sequence", "count", "commands"])
+
+
+def encode_robot_packet(codes: np.ndarray, args: np.ndarray, sequence: int,
+                        count: int) -> bytes:
+    """
+    Encode a team's commands as one binary packet.
+
+    Args:
+        codes: (N,) command kinds, one per robot in team order
+        args: (N, 2) command arguments
+        sequence: Packet sequence number of the team
+        count: GameState.count the commands were decided on
+
+    Returns:
+        Packet bytes
+    """
+    args = np.asarray(args)
+    slots = np.empty(len(codes), ROBOT_SLOT_DTYPE)
+    slots["kind"] = codes
+    slots["a"] = args[:, 0]
+    slots["b"] = args[:, 1]
+    header = ROBOT_HEADER.pack(ROBOT_PROTOCOL_MAGIC, ROBOT_PROTOCOL_VERSION, len(codes),
+                               sequence & 0xFFFFFFFF, count & 0xFFFFFFFF)
+    return header + slots.tobytes()
+
+
+def decode_robot_packet(data: bytes) -> RobotPacket:
+    """
+    Decode a binary packet, using only the struct module.
+
+    Args:
+        data: Packet bytes
+
+    Returns:
+        RobotPacket with the sequence number, cycle count and a list of
+        (kind, a, b) commands, one per robot in team order
+    """
+    magic, version, n_slots, sequence, count = ROBOT_HEADER.unpack_from(data)
+    if magic != ROBOT_PROTOCOL_MAGIC or version != ROBOT_PROTOCOL_VERSION:
+        raise Exception(f"Not a version {ROBOT_PROTOCOL_VERSION} robot packet: {data[:4]}")
+    end = ROBOT_HEADER.size + n_slots * ROBOT_SLOT.size
+    if len(data) < end:
+        raise Exception(f"Truncated robot packet: {len(data)} of {end} bytes")
+    commands = list(ROBOT_SLOT.iter_unpack(data[ROBOT_HEADER.size:end]))
+    return RobotPacket(sequence, count, commands)
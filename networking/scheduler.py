@@ -0,0 +1,138 @@
+"""
+Deadline-aware scheduling of decisions against the server cycle.
+
+The simulator runs one cycle every SIM_TIMESTEP seconds and executes the
+commands that arrive within a cycle at its end. CycleScheduler tracks the
+cycle phase from the cycle number and receive time of every game state,
+estimates when the commands for a game state must be sent to land in its
+cycle, and decides per team what to send: the fresh decision if it is ready
+in time, otherwise the last decision as a cheap fallback. Nothing is sent
+once a deadline has passed, since it would land in the next cycle.
+"""
+
+import time
+from collections import deque
+
+from .data_utils import GameState, SIM_TIMESTEP
+
+# Time reserved before the end of a cycle for serializing and sending
+SEND_MARGIN = 0.01    # seconds
+# Number of recent frames the cycle phase is estimated from
+PHASE_WINDOW = 50
+
+
+class CycleScheduler:
+    """Tracks server cycle deadlines and picks what each team sends."""
+    def __init__(self, step: float = SIM_TIMESTEP, send_margin: float = SEND_MARGIN):
+        """
+        Initialize the scheduler.
+
+        Args:
+            step: Seconds per server cycle
+            send_margin: Seconds before the end of a cycle by which commands
+                must be handed to the network
+        """
+        self.step = step
+        self.send_margin = send_margin
+        self._offsets = deque(maxlen=PHASE_WINDOW)    # receive time - count * step
+        self._last_count = None
+        self.fallbacks = {}    # team -> (count, output) of its newest decision
+        self.on_time = {}    # team -> cycles sent with a fresh decision
+        self.late = {}    # team -> cycles without a decision in time, fallback if possible
+        self.missed = {}    # team -> cycles in which nothing could be sent
+
+    def observe(self, game_state: GameState) -> float:
+        """
+        Update the cycle phase estimate with a new game state.
+
+        Frames are delayed by a varying amount after their cycle starts, so
+        the cycle start is estimated from the least delayed recent frame.
+
+        Args:
+            game_state: Newly received game state
+
+        Returns:
+            Deadline (time.time() seconds) for sending the state's commands
+        """
+        count = game_state.count
+        if self._last_count is not None and count < self._last_count:
+            self._offsets.clear()    # the server restarted
+        self._last_count = count
+        self._offsets.append(game_state.timestamp - count * self.step)
+        return self.deadline(count)
+
+    def deadline(self, count: int) -> float:
+        """Deadline (time.time() seconds) for sending the commands of a cycle."""
+        return min(self._offsets) + (count + 1) * self.step - self.send_margin
+
+    def remaining(self, deadline: float) -> float:
+        """Seconds left until a deadline, never negative."""
+        return max(deadline - time.time(), 0.0)
+
+    def budget(self, game_state: GameState) -> float:
+        """
+        Seconds a strategy has left to decide on an observed game state.
+
+        Args:
+            game_state: Game state being decided on
+
+        Returns:
+            Time budget in seconds, 0 if the deadline has passed
+        """
+        return self.remaining(self.deadline(game_state.count))
+
+    def completed(self, team: str, count: int, output):
+        """
+        Remember a finished decision as the team's fallback, even if it
+        finished too late to be sent.
+
+        Args:
+            team: Team the decision is for
+            count: GameState.count it was decided on
+            output: Translated AI output
+        """
+        previous = self.fallbacks.get(team)
+        if previous is None or previous[0] <= count:
+            self.fallbacks[team] = (count, output)
+
+    def resolve(self, team: str, count: int, output, deadline: float):
+        """
+        Pick what a team sends for a cycle.
+
+        Args:
+            team: Team to send for
+            count: GameState.count of the cycle
+            output: Fresh decision, or None if it was not ready in time
+            deadline: Deadline returned by observe
+
+        Returns:
+            Output to send now, or None to send nothing
+        """
+        if output is not None:
+            self.completed(team, count, output)
+        # The margin before the end of the cycle is reserved for sending
+        if time.time() > deadline + self.send_margin:
+            self.late[team] = self.late.get(team, 0) + 1
+            self.missed[team] = self.missed.get(team, 0) + 1
+            return None
+        if output is not None:
+            self.on_time[team] = self.on_time.get(team, 0) + 1
+            return output
+
+        self.late[team] = self.late.get(team, 0) + 1
+        fallback = self.fallbacks.get(team)
+        if fallback is None:
+            self.missed[team] = self.missed.get(team, 0) + 1
+            return None
+        return fallback[1]
+
+    def report(self) -> str:
+        """Summarize on-time, late and missed cycles per team."""
+        lines = []
+        for team in sorted(set(self.on_time) | set(self.late) | set(self.missed)):
+            on_time = self.on_time.get(team, 0)
+            late = self.late.get(team, 0)
+            missed = self.missed.get(team, 0)
+            lines.append(f"{team}: {on_time} cycles on time, {late} late "
+                         f"(no decision by the deadline), {missed} missed (nothing sent)")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,85 @@
+"""
+Game states published through shared memory for strategy worker processes.
+
+The owner creates one shared memory block holding the cycle count, timestamp,
+ball, poses and valid arrays of a GameState and overwrites it every cycle.
+Worker processes attach to the block by name and read the current state from
+it, so game states are never pickled between processes.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .data_utils import GameState, MAX_ROBOTS
+
+
+class SharedGameState:
+    """One GameState slot in a shared memory block."""
+    def __init__(self, team_names: tuple[str, ...], name: str | None = None):
+        """
+        Create a shared memory block, or attach to an existing one.
+
+        Args:
+            team_names: Names of all teams in the game, in GameState order
+            name: Name of the block to attach to, or None to create one
+        """
+        self.team_names = tuple(team_names)
+        n_teams = len(self.team_names)
+        # count, timestamp and whether velocities are set, ball, poses, ball
+        # velocity, velocities, then the valid mask
+        shapes = [(3,), (2,), (n_teams, MAX_ROBOTS, 3), (2,), (n_teams, MAX_ROBOTS, 2)]
+        n_floats = sum(int(np.prod(shape)) for shape in shapes)
+        size = n_floats * 8 + n_teams * MAX_ROBOTS
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+        arrays, offset = [], 0
+        for shape in shapes:
+            arrays.append(np.ndarray(shape, np.float64, self.shm.buf, offset))
+            offset += int(np.prod(shape)) * 8
+        self.header, self.ball, self.poses, self.ball_velocity, self.velocities = arrays
+        self.valid = np.ndarray((n_teams, MAX_ROBOTS), np.bool_, self.shm.buf, offset)
+
+    def publish(self, game_state: GameState):
+        """
+        Overwrite the shared slot with a game state.
+
+        Workers must not be reading the slot while it is written, i.e. the
+        previous state must have been decided on.
+
+        Args:
+            game_state: State to publish
+        """
+        has_velocities = game_state.velocities is not None
+        self.header[:] = (game_state.count, game_state.timestamp, has_velocities)
+        self.ball[:] = game_state.ball
+        self.poses[:] = game_state.poses
+        self.valid[:] = game_state.valid
+        if has_velocities:
+            self.ball_velocity[:] = game_state.ball_velocity
+            self.velocities[:] = game_state.velocities
+
+    def read(self) -> GameState:
+        """Copy the published game state out of shared memory."""
+        count, timestamp, has_velocities = self.header.tolist()
+        game_state = GameState(int(count), timestamp, self.ball.copy(), self.poses.copy(),
+                               self.valid.copy(), self.team_names)
+        if has_velocities:
+            game_state = game_state._replace(ball_velocity=self.ball_velocity.copy(),
+                                             velocities=self.velocities.copy())
+        return game_state
+
+    def close(self):
+        """Detach from the block, and remove it if this is the owner."""
+        # Views into the buffer must be released before it can be closed
+        self.header = self.ball = self.poses = self.valid = None
+        self.ball_velocity = self.velocities = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -8,44 +8,125 @@ and commanding both simulated and physical robots through various network protoc
 import re
 import random
 import time
+import select
 import socket
-import threading
-import sslclient
-from .data_utils import GameState, TeamInfo, Deserializer
+from concurrent.futures import ThreadPoolExecutor
+from .backends import load_ssl_vision, uses
+from .data_utils import GameState, TeamInfo, Deserializer, SIM_TIMESTEP
+from .recording import MatchRecorder, MatchLog
 
-# Network constants for listening to simulator data
-BUFFER_SIZE = 1536
+# Network constants for listening to simulator data. Game state datagrams
+# may be up to rcssserver's maximum message size; an 11v11 see_global is
+# about 1.6 KB and an SSL vision packet a few hundred bytes.
+BUFFER_SIZE = 8192
 LOCALHOST_IP = "127.0.0.1"
 SIM_CLIENT_ADDR = (LOCALHOST_IP, 6000)
 SIM_TRAINER_ADDR = (LOCALHOST_IP, 6001)
 INIT_PATTERN = r"\(init ([lr]) (1[0-1]|[1-9]) before_kick_off\)"
+CLIENT_BUFFER_SIZE = 8192    # fits server_param and player_type messages
+INIT_TIMEOUT = 2.0    # seconds to wait for the reply to a client init
 
 # Multicast settings for real robots
 COMMAND_IP = "239.42.42.42"
 COMMAND_PORT = 10000
 
+class ReceiveBuffer:
+    """
+    Preallocated buffers game state datagrams are received into.
+
+    Datagrams are received with recvfrom_into and handed out as memoryviews
+    of the buffer, so receiving allocates no payload copy. Two buffers are
+    used in turn, and only datagrams actually handed out claim a buffer, so
+    a view stays valid until the second datagram handed out after it, long
+    enough to parse one datagram while draining the next.
+    """
+    def __init__(self, size: int = BUFFER_SIZE):
+        """
+        Allocate the buffers.
+
+        Args:
+            size: Largest datagram accepted, in bytes
+        """
+        self.size = size
+        # One spare byte tells a datagram of exactly size bytes from a
+        # longer one the kernel truncated
+        self._views = [memoryview(bytearray(size + 1)) for _ in range(2)]
+        self._current = 0
+        self.truncated = 0    # datagrams dropped for being larger than size
+
+    def receive(self, sock: socket.socket, sender: tuple | None = None
+                ) -> tuple[memoryview | None, tuple]:
+        """
+        Receive the next datagram into the buffer not handed out last.
+
+        Args:
+            sock: Socket to receive from
+            sender: Address datagrams must come from, or None for any
+
+        Returns:
+            Tuple of (view of the datagram payload, or None if it was
+            truncated or came from another address, sender address). The
+            buffer of a datagram that is not handed out is reused by the
+            next receive.
+
+        Raises:
+            socket.timeout: If nothing arrived within the socket timeout
+        """
+        view = self._views[self._current ^ 1]
+        (n_bytes, address) = sock.recvfrom_into(view)
+        if n_bytes > self.size:
+            self.truncated += 1
+            return None, address
+        if sender is not None and address != sender:
+            return None, address
+        self._current ^= 1
+        return view[:n_bytes], address
+
+
 class Listener:
-    """Listens for game state updates from simulators or cameras."""
-    def __init__(self, team_infos: list[TeamInfo], environment: str):
+    """Listens for game state updates from simulators, cameras or match logs."""
+    def __init__(self, team_infos: list[TeamInfo], environment: str,
+                 record_path: str | None = None, replay_path: str | None = None,
+                 replay_speed: float = 1.0, trainer_addr: tuple = SIM_TRAINER_ADDR):
         """
         Initialize listener for the specified environment.
         
         Args:
             team_infos: List of team information including names and player counts
             environment: Type of environment to listen to
+            record_path: File to record every received datagram to, if any
+            replay_path: Match log to replay instead of listening to the network
+            replay_speed: Replay speed relative to the recording, 0 for as
+                fast as possible
+            trainer_addr: Simulator trainer address to get game states from
         """
         self.parser = Deserializer(team_infos)
+        self.recorder = None
+        self.replay = None
+        self.profiler = None    # CycleProfiler timing receive and parse
+        self.wrapper_packet = None    # SSL_WrapperPacket, loaded for camera sources
+        self.buffer = ReceiveBuffer()
 
-        if environment in ["sim-only", "sim-mixed"]:
+        if replay_path is not None:
+            self.replay = MatchLog(replay_path, replay_speed)
+            self.source = self.replay.source
+            if self.source == "camera":
+                _, self.wrapper_packet = load_ssl_vision()
+        elif uses(environment, "simulator"):
             self.source = "simulator"
-            self.addr = SIM_TRAINER_ADDR
+            self.addr = trainer_addr
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.sock.settimeout(0.2)    # Non-blocking with timeout
             self.connect_to_sim()
         else:
             self.source = "camera"
+            sslclient, self.wrapper_packet = load_ssl_vision()
             self.vision_client = sslclient.client()
             self.vision_client.connect()
+            self.vision_client.sock.settimeout(0.2)    # Non-blocking with timeout
+
+        if record_path is not None:
+            self.recorder = MatchRecorder(record_path, self.source)
 
     def watch_game(self) -> GameState:
         """
@@ -54,20 +135,141 @@ class Listener:
         Returns:
             Current game state or None if no valid data received
         """
+        try:
+            data = self.receive()
+        except socket.timeout:
+            return None
+        if data is None:
+            return None
+        received_ns = self.profiler.clock() if self.profiler is not None else 0
+        return self.deserialize_timed(data, received_ns)
+
+    def watch_latest(self) -> tuple[GameState, int]:
+        """
+        Wait for game data, then drain every datagram already queued on the
+        socket and decide only on the newest one.
+        
+        Returns:
+            Tuple of (newest game state or None, number of superseded
+            datagrams that were skipped without parsing)
+        """
+        try:
+            latest = self.receive()
+        except socket.timeout:
+            return None, 0
+        received_ns = self.profiler.clock() if self.profiler is not None else 0
+
+        skipped = 0
+        while self.pending():
+            data = self.receive()
+            if data is None:
+                continue
+            if latest is not None:
+                self.supersede(latest)
+                skipped += 1
+            latest = data
+
+        if latest is None:
+            return None, skipped
+        return self.deserialize_timed(latest, received_ns), skipped
+
+    def receive(self) -> bytes | memoryview:
+        """
+        Receive the next raw game state datagram, recording it if enabled.
+
+        Network datagrams are returned as views of the receive buffer, which
+        stay valid until the second receive after this one.
+        
+        Returns:
+            Datagram payload, or None if it came from an unexpected address
+            or was too large for the buffer
+
+        Raises:
+            socket.timeout: If nothing arrived within the socket timeout
+            EOFError: At the end of a replayed match log
+        """
+        if self.replay is not None:
+            return self.replay.next_record()[1]
+
+        sender = self.addr if self.source == "simulator" else None
+        (data, address) = self.buffer.receive(self.game_socket, sender)
+        if data is None:
+            return None
+        if self.recorder is not None:
+            self.recorder.record(data)
+        return data
+
+    def pending(self) -> bool:
+        """Whether another game state datagram is already waiting."""
+        if self.replay is not None:
+            return self.replay.n_due() > 0
+        return bool(select.select([self.game_socket], [], [], 0)[0])
+
+    def supersede(self, data: bytes | memoryview):
+        """
+        Handle a datagram that a newer one superseded before it was parsed.
+
+        Simulator frames are simply dropped. A camera packet only covers its
+        own camera's part of the field, so it is still merged into the
+        pending fused frame.
+
+        Args:
+            data: Raw bytes of the superseded datagram
+        """
+        if self.source == "camera":
+            self.deserialize(data)
+
+    def deserialize_timed(self, data: bytes | memoryview, received_ns: int) -> GameState:
+        """
+        Parse a raw game state datagram, timing receive and parse stages if
+        a profiler is attached.
+
+        The receive stage runs from received_ns, when the first datagram was
+        taken off the socket, until parsing starts; it covers draining
+        superseded datagrams and recording.
+        
+        Args:
+            data: Raw bytes from the simulator or the SSL vision multicast
+            received_ns: Profiler clock when the datagram was received
+            
+        Returns:
+            Parsed game state or None if the datagram holds no game state
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return self.deserialize(data)
+
+        start = profiler.record("receive", received_ns)
+        game_state = self.deserialize(data)
+        profiler.record("parse", start)
+        if game_state is not None:
+            profiler.frame_received(game_state.count, received_ns)
+        return game_state
+
+    def deserialize(self, data: bytes | memoryview) -> GameState:
+        """
+        Parse a raw game state datagram.
+        
+        Args:
+            data: Raw bytes from the simulator or the SSL vision multicast
+            
+        Returns:
+            Parsed game state or None if the datagram holds no game state
+        """
         if self.source == "simulator":
-            (data, address) = self.sock.recvfrom(BUFFER_SIZE)
-            if address == self.addr:
-                game_state = self.parser.sim_deserialize(data)
-                return game_state
-            else:
-                return None
-        else:
-            data = self.vision_client.receive()
-            if data.HasField("detection"):
-                game_state = self.parser.cam_deserialize(data.detection)
-                return game_state
-            else:
-                return None
+            return self.parser.sim_deserialize(data)
+
+        packet = self.wrapper_packet.FromString(data)
+        if packet.HasField("detection"):
+            return self.parser.cam_deserialize(packet.detection)
+        return None
+
+    @property
+    def game_socket(self) -> socket.socket:
+        """Socket game state datagrams arrive on."""
+        if self.source == "simulator":
+            return self.sock
+        return self.vision_client.sock
 
     def connect_to_sim(self):
         """Establish connection to simulator and initialize monitoring."""
@@ -97,10 +299,18 @@ class Listener:
         time.sleep(0.1)
         self.sock.close()
 
+    def close(self):
+        """Close the match log being recorded or replayed, if any."""
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay is not None:
+            self.replay.close()
+
 
 class Client:
     """Represents a single robot client connection to the simulator."""
-    def __init__(self, teamname: str, side: str = "left", first: bool = False):
+    def __init__(self, teamname: str, side: str = "left", first: bool = False,
+                 client_addr: tuple = SIM_CLIENT_ADDR):
         """
         Initialize a client connection for a single robot.
         
@@ -108,11 +318,12 @@ class Client:
             teamname: Name of the team this robot belongs to
             side: Which side of field ("left" or "right")
             first: Whether this is the first robot
+            client_addr: Simulator address players connect to
         """
         self.teamname = teamname
         self.init_pose = self.get_init_pose(first, side)
 
-        self.addr = SIM_CLIENT_ADDR
+        self.addr = client_addr
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.connect_to_sim()
 
@@ -150,9 +361,12 @@ class Client:
         turn_args = f"{self.init_pose[2]}".encode()
 
         # Initialize the connection
-        time.sleep(0.1)
+        self.sock.settimeout(INIT_TIMEOUT)
         self.send_command(b"(init %b)\0" % init_args)
-        (data, address) = self.sock.recvfrom(64)
+        try:
+            (data, address) = self.sock.recvfrom(64)
+        except socket.timeout:
+            raise Exception(f"No response to init from {self.addr}")
         if m := re.search(INIT_PATTERN, data.decode()):
             self.side = m.group(1)
             self.id = int(m.group(2))
@@ -161,13 +375,31 @@ class Client:
             raise Exception(f"Unexpected response: {data} from {address}")
 
         # Send initial position
-        time.sleep(0.1)
         self.send_command(b"(move %b)\0" % move_args)
 
-        # Send initial rotation
-        time.sleep(0.1)
+        # Send initial rotation once the server has started a new cycle, since
+        # it accepts only one of move and turn per cycle
+        self.wait_for_next_cycle()
         self.send_command(b"(turn %b)\0" % turn_args)
 
+    def wait_for_next_cycle(self):
+        """
+        Wait until the server sends this player's next sense_body message,
+        which it does at the start of every cycle.
+
+        Gives up after two simulator timesteps.
+        """
+        deadline = time.monotonic() + 2 * SIM_TIMESTEP
+        while (remaining := deadline - time.monotonic()) > 0:
+            self.sock.settimeout(remaining)
+            try:
+                (data, address) = self.sock.recvfrom(CLIENT_BUFFER_SIZE)
+            except socket.timeout:
+                break
+            if address == self.addr and data.startswith(b"(sense_body "):
+                break
+        self.sock.settimeout(None)
+
     def disconnect_from_sim(self):
         """Disconnect from simulator and close socket."""
         self.send_command(b"(bye)\0")
@@ -176,22 +408,25 @@ class Client:
 
 class Commander:
     """Manages command sending to both simulated and physical robots."""
-    def __init__(self, team_infos: list[TeamInfo], environment: str):
+    def __init__(self, team_infos: list[TeamInfo], environment: str,
+                 client_addr: tuple = SIM_CLIENT_ADDR):
         """
         Initialize commander for the given teams and environment.
         
         Args:
             team_infos: Information about teams to command
             environment: Type of environment for command routing
+            client_addr: Simulator address players connect to
         """
         self.team_infos = team_infos
         self.environment = environment
+        self.client_addr = client_addr
 
-        if environment in ["sim-only", "sim-mixed"]:
+        if uses(environment, "simulator"):
             self.create_sim_clients()
 
         self.socks, self.addrs = {}, {}
-        if environment != "sim-only":
+        if uses(environment, "robots"):
             for i, team_info in enumerate(team_infos):
                 teamname = team_info.name
                 port_num = COMMAND_PORT + (i * 1000)
@@ -199,34 +434,65 @@ class Commander:
                 self.addrs[teamname] = (COMMAND_IP, port_num)
 
     def create_sim_clients(self):
-        """Create simulator client connections for all teams and robots."""
+        """
+        Create simulator client connections for all teams and robots.
+
+        The first client of each team connects first, in team order, so the
+        first team gets the left side and each first client gets uniform
+        number 1. The remaining clients then connect concurrently, and each
+        team's clients are ordered by uniform number.
+        """
         self.sim_clients = {}
+        sides = {}
         for team_info, side in zip(self.team_infos, ["left", "right"]):
-            self.sim_clients[team_info.name] = [None] * team_info.n_players
-            # Populate clients for each team
-            for i in range(team_info.n_players):
-                client = Client(team_info.name, side, i == 0)
-                self.sim_clients[team_info.name][i] = client
+            sides[team_info.name] = side
+            self.sim_clients[team_info.name] = [
+                Client(team_info.name, side, True, self.client_addr)]
+
+        n_rest = sum(team_info.n_players - 1 for team_info in self.team_infos)
+        with ThreadPoolExecutor(max_workers=max(n_rest, 1)) as pool:
+            futures = {
+                team_info.name: [
+                    pool.submit(Client, team_info.name, sides[team_info.name], False,
+                                self.client_addr)
+                    for _ in range(team_info.n_players - 1)
+                ]
+                for team_info in self.team_infos
+            }
+            for teamname, team_futures in futures.items():
+                clients = self.sim_clients[teamname]
+                clients.extend(future.result() for future in team_futures)
+                clients.sort(key=lambda client: client.id)
 
     def send_to_sim(self, teamname: str, commands: list[bytes]):
         """
-        Send commands to simulated robots using threading.
+        Send commands to simulated robots.
+
+        Each send is a single non-blocking UDP sendto, so the commands are
+        sent in turn from the calling thread.
         
         Args:
             teamname: Name of team to send commands to
             commands: List of command bytes for each robot
         """
-        threads = []
         for (client, command) in zip(self.sim_clients[teamname], commands):
-            if command is None:
-                continue
-            args = (command,)
-            thread = threading.Thread(target=client.send_command, args=args)
-            thread.start()
-            threads.append(thread)
+            if command is not None:
+                client.send_command(command)
+
+    def send_done(self, teamname: str):
+        """
+        Tell a simulator in synchronous mode that a team is done with the
+        current cycle, after its commands were sent.
+
+        The server advances to the next cycle once every player has sent
+        (done), so a team's commands always land in the cycle they were
+        decided for.
         
-        for thread in threads:
-            thread.join()
+        Args:
+            teamname: Name of the team that finished the cycle
+        """
+        for client in self.sim_clients[teamname]:
+            client.send_command(b"(done)\0")
 
     def send_to_robots(self, teamname: str, command: bytes):
         """
@@ -240,8 +506,7 @@ class Commander:
         sock.sendto(command, addr)
 
     def disconnect_from_sim(self):
-        """Disconnect all simulator clients."""
+        """Disconnect all simulator clients at once."""
         for team_clients in self.sim_clients.values():
             for client in team_clients:
-                time.sleep(0.1)
                 client.disconnect_from_sim()
@@ -0,0 +1,130 @@
+"""
+Sampled game state logging off the control loop.
+
+GameStateLogger replaces printing every game state from the main loop. The
+loop only decides whether a state is sampled and appends it to a bounded
+ring buffer; a background thread formats the buffered states as compact
+lines and writes them out. When the writer falls behind, the oldest
+buffered states are overwritten instead of the loop waiting, and the
+number of states dropped that way is reported.
+
+Each line holds the cycle count, the timestamp, the ball and every valid
+robot as id:x,y,theta per team:
+
+    1234 1700000000.123 ball 1.20 -3.40 | TritonBots 1:-9.50,0.00,0 2:... | TeamB ...
+"""
+
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+
+from .data_utils import GameState
+
+# Game states buffered for the writer before the oldest are dropped
+LOG_CAPACITY = 1024
+# Seconds the writer sleeps between draining the buffer
+FLUSH_INTERVAL = 0.1
+
+
+def format_game_state(game_state: GameState) -> str:
+    """
+    Format a game state as one compact log line.
+
+    Args:
+        game_state: Game state to format
+
+    Returns:
+        Line without the trailing newline
+    """
+    bx, by = game_state.ball.tolist()
+    parts = [f"{game_state.count} {game_state.timestamp:.3f} ball {bx:.2f} {by:.2f}"]
+    for teamname, poses, valid in zip(game_state.team_names, game_state.poses.tolist(),
+                                      game_state.valid.tolist()):
+        robots = " ".join(f"{i}:{x:.2f},{y:.2f},{theta:.0f}"
+                          for i, (x, y, theta) in enumerate(poses) if valid[i])
+        parts.append(f"{teamname} {robots}")
+    return " | ".join(parts)
+
+
+class GameStateLogger:
+    """Writes sampled game states from a background thread."""
+    def __init__(self, path: str | None = None, every: int = 1,
+                 on_change: bool = False, capacity: int = LOG_CAPACITY):
+        """
+        Initialize the logger and start its writer thread.
+
+        Args:
+            path: File to write the log to, None for stdout
+            every: Log only game states whose count is a multiple of every
+            on_change: Also skip sampled game states whose ball and robot
+                poses equal those of the last logged one
+            capacity: Game states buffered before the oldest are dropped
+        """
+        self.stream = sys.stdout if path is None else open(path, "w")
+        self.every = every
+        self.on_change = on_change
+        self.logged = 0     # game states passed to the writer
+        self.written = 0    # lines written
+        self._last = None    # last logged game state, for on_change
+        self._buffer = deque(maxlen=capacity)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="state-log", daemon=True)
+        self._thread.start()
+
+    def log(self, game_state: GameState):
+        """
+        Log a game state if it is sampled.
+
+        Never blocks: the state is only appended to the ring buffer, so a
+        full buffer drops its oldest state.
+
+        Args:
+            game_state: Game state the loop is about to decide on
+        """
+        if game_state.count % self.every:
+            return
+        if self.on_change:
+            last = self._last
+            if (last is not None and np.array_equal(game_state.valid, last.valid)
+                    and np.array_equal(game_state.ball, last.ball, equal_nan=True)
+                    and np.array_equal(game_state.poses, last.poses, equal_nan=True)):
+                return
+            self._last = game_state
+        self.logged += 1
+        self._buffer.append(game_state)
+
+    @property
+    def dropped(self) -> int:
+        """Number of logged game states overwritten before they were written."""
+        return self.logged - self.written - len(self._buffer)
+
+    def _run(self):
+        """Write buffered game states until closed."""
+        while not self._stopped.wait(FLUSH_INTERVAL):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        """Format and write every buffered game state."""
+        buffer = self._buffer
+        lines = []
+        while buffer:    # the only consumer, so popleft cannot fail
+            lines.append(format_game_state(buffer.popleft()))
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.written += len(lines)
+
+    def close(self):
+        """Write the remaining game states, stop the writer thread and close the file."""
+        self._stopped.set()
+        self._thread.join()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+    def report(self) -> str:
+        """Summary of the game states logged, written and dropped."""
+        return (f"Logged {self.logged} game states, wrote {self.written}, "
+                f"dropped {self.dropped}.\n")
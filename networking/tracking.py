@@ -0,0 +1,148 @@
+"""
+Vectorized state estimation for robots and the ball.
+
+StateTracker runs one constant-velocity Kalman filter per robot slot and one
+for the ball, all updated at once with NumPy. It estimates velocities and
+predicts positions at the time the commands decided on a frame take effect,
+so strategies do not act on positions that are a whole pipeline latency old.
+
+x and y are filtered independently with the same model, so both axes of an
+object share one 2x2 (position, velocity) covariance. Robot headings are
+passed through unfiltered.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+from .data_utils import GameState, MAX_ROBOTS, SIM_TIMESTEP
+
+# Noise of measured positions and of unmodelled accelerations, in meters
+POSITION_NOISE = 0.01
+ACCELERATION_NOISE = 5.0    # per second squared
+# Initial velocity uncertainty of newly seen objects, in meters per second
+INITIAL_VELOCITY_NOISE = 5.0
+# Objects unseen for longer than this are dropped and restarted when seen
+MAX_COAST = 0.2    # seconds
+# Number of recent frames the frame clock offset is estimated from
+OFFSET_WINDOW = 50
+
+
+class StateTracker:
+    """Tracks positions and velocities of every robot slot and the ball."""
+    def __init__(self, team_names: tuple[str, ...], lookahead: float = SIM_TIMESTEP,
+                 scale: float = 1.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            team_names: Names of all teams, in GameState order
+            lookahead: Seconds from handing a game state to the strategy
+                until its commands take effect
+            scale: Field units per meter, 1 for the simulator and 1000 for
+                SSL vision millimeters
+        """
+        self.team_names = tuple(team_names)
+        self.lookahead = lookahead
+        n = len(self.team_names) * MAX_ROBOTS + 1    # robots, then the ball
+        self.position_variance = (POSITION_NOISE * scale) ** 2
+        self.acceleration_variance = (ACCELERATION_NOISE * scale) ** 2
+        self.initial_velocity_variance = (INITIAL_VELOCITY_NOISE * scale) ** 2
+
+        self.position = np.zeros((n, 2))
+        self.velocity = np.zeros((n, 2))
+        # Shared covariance of both axes: var(p), cov(p, v), var(v)
+        self.p00 = np.zeros(n)
+        self.p01 = np.zeros(n)
+        self.p11 = np.zeros(n)
+        self.tracked = np.zeros(n, dtype=bool)
+        self.last_seen = np.zeros(n)
+        self.headings = np.zeros((len(self.team_names), MAX_ROBOTS))
+        self.time = None    # frame timestamp of the current estimate
+        self._offsets = deque(maxlen=OFFSET_WINDOW)    # receive time - timestamp
+
+    def update(self, game_state: GameState, now: float | None = None) -> GameState:
+        """
+        Filter a new frame and predict where everything is when its commands
+        take effect.
+
+        Args:
+            game_state: Newly received game state
+            now: Current time.time(), or None to read the clock
+
+        Returns:
+            Game state with predicted ball and robot positions, velocities
+            and robots unseen for up to MAX_COAST marked valid
+        """
+        if now is None:
+            now = time.time()
+        t = game_state.timestamp
+        n_robots = game_state.valid.size
+        measured = np.empty_like(self.position)
+        measured[:n_robots] = game_state.poses[..., :2].reshape(-1, 2)
+        measured[n_robots] = game_state.ball
+        seen = np.empty(len(measured), dtype=bool)
+        seen[:n_robots] = game_state.valid.reshape(-1)
+        seen[n_robots] = not np.isnan(game_state.ball[0])
+
+        if self.time is not None and t > self.time:
+            self._predict(t - self.time)
+        self.time = t if self.time is None else max(t, self.time)
+        self._correct(measured, seen, t)
+
+        # Frame timestamps may come from another clock (SSL vision t_sent),
+        # so the frame's age is measured against its least delayed peers
+        self._offsets.append(now - t)
+        age = (now - t) - min(self._offsets)
+        horizon = age + self.lookahead
+
+        coasting = self.tracked & (t - self.last_seen <= MAX_COAST)
+        predicted = self.position + self.velocity * horizon
+        predicted[~coasting] = np.nan
+        velocity = np.where(coasting[:, None], self.velocity, np.nan)
+
+        n_teams = len(self.team_names)
+        # Headings of coasting robots are the last ones seen
+        self.headings[game_state.valid] = game_state.poses[..., 2][game_state.valid]
+        poses = np.empty_like(game_state.poses)
+        poses[..., :2] = predicted[:n_robots].reshape(n_teams, MAX_ROBOTS, 2)
+        poses[..., 2] = self.headings
+        valid = coasting[:n_robots].reshape(n_teams, MAX_ROBOTS)
+        return game_state._replace(
+            ball=predicted[n_robots].copy(), poses=poses, valid=valid,
+            ball_velocity=velocity[n_robots].copy(),
+            velocities=velocity[:n_robots].reshape(n_teams, MAX_ROBOTS, 2))
+
+    def _predict(self, dt: float):
+        """Advance every track by dt seconds under constant velocity."""
+        q = self.acceleration_variance
+        self.position += self.velocity * dt
+        # P = F P F' + Q for F = [[1, dt], [0, 1]] and white acceleration noise
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt ** 4 / 4
+        self.p01 += dt * self.p11 + q * dt ** 3 / 2
+        self.p11 += q * dt ** 2
+
+    def _correct(self, measured: np.ndarray, seen: np.ndarray, t: float):
+        """Fuse the position measurements of the seen objects."""
+        r = self.position_variance
+        # (Re)start tracks of objects seen for the first time or after a gap
+        new = seen & ~(self.tracked & (t - self.last_seen <= MAX_COAST))
+        self.position[new] = measured[new]
+        self.velocity[new] = 0.0
+        self.p00[new] = r
+        self.p01[new] = 0.0
+        self.p11[new] = self.initial_velocity_variance
+        self.tracked |= seen
+        self.last_seen[seen] = t
+
+        update = seen & ~new
+        innovation = measured[update] - self.position[update]
+        p00, p01, p11 = self.p00[update], self.p01[update], self.p11[update]
+        s = p00 + r
+        k0, k1 = p00 / s, p01 / s
+        self.position[update] += k0[:, None] * innovation
+        self.velocity[update] += k1[:, None] * innovation
+        self.p00[update] = (1 - k0) * p00
+        self.p01[update] = (1 - k0) * p01
+        self.p11[update] = p11 - k1 * p01